@@ -0,0 +1,81 @@
+"""On-disk snapshot of the plot and machine catalog.
+
+With CATALOG_SNAPSHOT set to a file path, a starting worker loads the
+snapshot and serves /api/plots and /api/machines from it while the database
+is still being connected and warmed up. The snapshot is rewritten after each
+successful warm-up and at shutdown, so it lags the database by at most one
+worker lifetime; plot availability in it may be slightly stale. On
+platforms with an ephemeral filesystem, build it into the image instead:
+
+    cd backend
+    python catalog_snapshot.py data/catalog_snapshot.json
+"""
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+
+def load_snapshot(path):
+    """(plots, machines) from the snapshot file, or None if it is missing or unreadable"""
+    try:
+        with open(path, encoding="utf-8") as snapshot_file:
+            snapshot = json.load(snapshot_file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring catalog snapshot {path}: {e}")
+        return None
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        logger.warning(f"Ignoring catalog snapshot {path}: version {snapshot.get('version')}")
+        return None
+    return snapshot["plots"], snapshot["machines"]
+
+
+def write_snapshot(path, plots, machines):
+    """Write atomically so a worker starting concurrently never reads half a file"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(temporary, "w", encoding="utf-8") as snapshot_file:
+        json.dump(
+            {
+                "version": SNAPSHOT_VERSION,
+                "written_at": datetime.now(timezone.utc).isoformat(),
+                "plots": plots,
+                "machines": machines
+            },
+            snapshot_file,
+            default=str
+        )
+    os.replace(temporary, path)
+
+
+async def snapshot_database(path):
+    """Write a snapshot of the current database catalog, e.g. during a build step"""
+    from repositories import build_repositories
+    repos = build_repositories("mongo", os.environ["MONGO_URL"], os.environ["DB_NAME"])
+    try:
+        plots = await repos.plots.find()
+        machines = await repos.machines.find()
+    finally:
+        repos.close()
+    write_snapshot(path, plots, machines)
+    return len(plots), len(machines)
+
+
+if __name__ == "__main__":
+    import asyncio
+    import sys
+    from dotenv import load_dotenv
+    load_dotenv(Path(__file__).parent / ".env")
+    target = sys.argv[1] if len(sys.argv) > 1 else os.environ.get("CATALOG_SNAPSHOT")
+    if not target:
+        sys.exit("usage: python catalog_snapshot.py PATH (or set CATALOG_SNAPSHOT)")
+    plot_count, machine_count = asyncio.run(snapshot_database(target))
+    print(f"{target}: {plot_count} plots, {machine_count} machines")
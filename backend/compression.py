@@ -0,0 +1,139 @@
+"""Response compression.
+
+CompressionMiddleware compresses responses of at least `minimum_size` bytes
+with the best encoding the client accepts (brotli if the optional `brotli`
+package is installed, otherwise gzip). Only complete responses are
+compressed; streamed ones (Server-Sent Events) pass through unchanged, as
+do responses that already carry a Content-Encoding. Every other response of
+a compressible type gets Vary: Accept-Encoding, also when it was too small
+or the client accepts no encoding, so caches keep the variants apart.
+
+PrecompressedPayload holds a constant JSON payload serialized and compressed
+once at the highest levels, so serving it costs no compression CPU.
+"""
+import gzip
+import hashlib
+import json
+from fastapi.encoders import jsonable_encoder
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip only
+    brotli = None
+
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+COMPRESSIBLE_TYPES = (
+    "text/", "application/json", "application/javascript", "application/xml", "image/svg+xml", "application/manifest+json"
+)
+
+
+def choose_encoding(accept_encoding, available=ENCODINGS):
+    """Preferred encoding from an Accept-Encoding header, or None for identity"""
+    weights = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+    candidates = [
+        (weights.get(encoding, weights.get("*", 0.0)), -index, encoding)
+        for index, encoding in enumerate(available)
+    ]
+    weight, _, encoding = max(candidates, default=(0.0, 0, None))
+    return encoding if weight > 0 else None
+
+
+def compress(body, encoding, level=None):
+    """Compress with the given encoding; level None means a fast level suitable per request"""
+    if encoding == "br":
+        return brotli.compress(body, quality=4 if level is None else level)
+    return gzip.compress(body, compresslevel=6 if level is None else level, mtime=0)
+
+
+def compress_best(body, encoding):
+    return compress(body, encoding, 11 if encoding == "br" else 9)
+
+
+def is_compressible(content_type):
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size=1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        start_message = None
+        passthrough = False
+
+        async def compressing_send(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            body = message.get("body", b"")
+            could_compress = not (
+                message.get("more_body", False)
+                or "content-encoding" in headers
+                or not is_compressible(headers.get("content-type", ""))
+            )
+            if could_compress:
+                headers.add_vary_header("Accept-Encoding")
+            if not could_compress or encoding is None or len(body) < self.minimum_size:
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, compressing_send)
+
+
+class PrecompressedPayload:
+    """A constant JSON response, serialized and compressed once"""
+
+    def __init__(self, content, max_age=3600):
+        body = json.dumps(jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.variants = {None: body}
+        for encoding in ENCODINGS:
+            self.variants[encoding] = compress_best(body, encoding)
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self.max_age = max_age
+
+    def sizes(self):
+        return {encoding or "identity": len(body) for encoding, body in self.variants.items()}
+
+    def response(self, request):
+        headers = {
+            "ETag": self.etag,
+            "Cache-Control": f"public, max-age={self.max_age}",
+            "Vary": "Accept-Encoding"
+        }
+        if request.headers.get("if-none-match") == self.etag:
+            return Response(status_code=304, headers=headers)
+        encoding = choose_encoding(request.headers.get("accept-encoding"))
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        return Response(self.variants[encoding], media_type="application/json", headers=headers)
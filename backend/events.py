@@ -0,0 +1,127 @@
+"""Event bus feeding the Server-Sent Events streams.
+
+Handlers publish order status changes and new advisories to topics such as
+"order:<id>" and "customer:<email>"; every open SSE connection owns a bounded
+queue subscribed to one topic. Publishing never blocks a request handler: a
+subscriber that falls behind loses its oldest events instead.
+
+A client may stream from one worker while another worker handles the write.
+With MongoDB, relay_events shares the events between workers: each worker
+flushes what it published to the events collection and polls it for the
+events of the others. Without it (the memory backend) streams only see
+events of their own process, so SSE needs a single worker there.
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from fastapi.encoders import jsonable_encoder
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# Relayed events are kept this long (TTL index), well beyond the polling lag
+EVENT_RETENTION_SECONDS = 300
+# Events are re-read for this long, so inserts that become visible late or
+# carry a slightly skewed clock are still delivered (once)
+EVENT_RELAY_LAG_SECONDS = 5
+
+
+def order_topic(order_id):
+    return f"order:{order_id}"
+
+
+def customer_topic(user_email):
+    return f"customer:{user_email.lower()}"
+
+
+def format_sse(event):
+    """Encode an event dict as one SSE message"""
+    return f"event: {event['type']}\ndata: {json.dumps(jsonable_encoder(event))}\n\n"
+
+
+class EventBus:
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._subscribers = defaultdict(set)
+        self.worker_id = None
+        self.outbox = None  # Events for the other workers, while relaying
+        self.relayed = 0
+
+    def subscribe(self, topic):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[topic].add(queue)
+        return queue
+
+    def unsubscribe(self, topic, queue):
+        subscribers = self._subscribers.get(topic)
+        if subscribers is not None:
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[topic]
+
+    def publish(self, topics, event):
+        self.deliver(topics, event)
+        if self.outbox is not None:
+            self.outbox.append((list(topics), event))
+
+    def deliver(self, topics, event):
+        """Hand an event to the subscribers in this process"""
+        for topic in topics:
+            for queue in self._subscribers.get(topic, ()):
+                if queue.full():
+                    queue.get_nowait()  # Drop the oldest event for slow consumers
+                queue.put_nowait(event)
+
+    def subscriber_count(self):
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+
+async def _flush_outbox(collection, bus):
+    outbox, bus.outbox = bus.outbox, []
+    if not outbox:
+        return
+    now = datetime.utcnow()
+    try:
+        await collection.insert_many([
+            {"_id": str(uuid.uuid4()), "worker": bus.worker_id, "topics": topics, "event": jsonable_encoder(event), "created_at": now}
+            for topics, event in outbox
+        ])
+    except PyMongoError as e:
+        logger.warning(f"Could not relay {len(outbox)} events: {e}")
+
+
+async def relay_events(collection, bus, interval=0.5):
+    """Exchange events with the other workers through the events collection until cancelled"""
+    bus.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    bus.outbox = []
+    not_before = datetime.utcnow()
+    seen = {}  # Event id -> created_at, for events still inside the lag
+    while True:
+        await asyncio.sleep(interval)
+        await _flush_outbox(collection, bus)
+        now = datetime.utcnow()
+        if not bus.subscriber_count():
+            # Nobody listens here: skip the query, and don't replay older events to later subscribers
+            not_before = now
+            seen.clear()
+            continue
+        since = max(not_before, now - timedelta(seconds=EVENT_RELAY_LAG_SECONDS))
+        try:
+            async for document in collection.find(
+                {"created_at": {"$gte": since}, "worker": {"$ne": bus.worker_id}},
+                {"topics": 1, "event": 1, "created_at": 1}
+            ):
+                if document["_id"] in seen:
+                    continue
+                seen[document["_id"]] = document["created_at"]
+                bus.relayed += 1
+                bus.deliver(document["topics"], document["event"])
+        except PyMongoError as e:
+            logger.warning(f"Polling the event relay failed: {e}")
+            continue
+        seen = {event_id: created_at for event_id, created_at in seen.items() if created_at >= since}
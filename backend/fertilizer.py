@@ -0,0 +1,244 @@
+"""Compiled fertilizer table.
+
+FERTILIZER_SPECS is validated and compiled once at import into per-fertilizer
+coefficient arrays (kg N, kg S and EUR per unit of product), so pricing a
+nitrogen requirement is a division and a multiplication over arrays instead
+of string-keyed branching per request. An inconsistent spec raises
+ValueError at import, i.e. the server refuses to start.
+
+optimize_mix finds the cheapest combination of products covering a nitrogen
+and optional sulphur requirement within per-product caps.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import combinations, product
+import numpy as np
+from reference_data import FertilizerType, FERTILIZER_SPECS, FERTILIZER_MAX_AMOUNTS_250M2
+
+# category -> price key -> unit of the product amount
+PRICE_UNITS = {
+    "mineral": {"price_per_ton": "kg"},
+    "organic": {"price_per_m3": "m³", "price_per_ton": "t"},
+    "none": {"price_per_unit": ""}
+}
+
+
+@dataclass(frozen=True)
+class FertilizerTable:
+    types: list
+    names: list
+    units: list
+    categories: list
+    organic: np.ndarray
+    kg_n_per_unit: np.ndarray
+    kg_s_per_unit: np.ndarray
+    eur_per_unit: np.ndarray
+
+    def index(self, fertilizer_type):
+        return self.types.index(fertilizer_type)
+
+    def price(self, n_requirements_kg):
+        """Product amounts and costs for each nitrogen requirement, shape (requirements, fertilizers)"""
+        n_requirements_kg = np.asarray(n_requirements_kg, dtype=float)
+        supplies_n = self.kg_n_per_unit > 0
+        amounts = np.divide(
+            n_requirements_kg[:, None],
+            self.kg_n_per_unit,
+            out=np.zeros((n_requirements_kg.size, len(self.types))),
+            where=supplies_n
+        )
+        return amounts, amounts * self.eur_per_unit
+
+    def options(self, amounts, costs):
+        """Format one row of price() like the fertilizer_options API response"""
+        return [
+            {
+                "fertilizer_type": fertilizer_type,
+                "name": self.names[index],
+                "required_amount": round(float(amounts[index]), 2),
+                "unit": self.units[index],
+                "cost": round(float(costs[index]), 2),
+                "organic": bool(self.organic[index])
+            }
+            for index, fertilizer_type in enumerate(self.types)
+        ]
+
+
+def _validate(fertilizer_type, specs):
+    category = specs.get("category")
+    if category not in PRICE_UNITS:
+        raise ValueError(f"{fertilizer_type.value}: unknown category {category!r}")
+    price_keys = [key for key in ("price_per_ton", "price_per_m3", "price_per_unit") if key in specs]
+    if len(price_keys) != 1 or price_keys[0] not in PRICE_UNITS[category]:
+        raise ValueError(f"{fertilizer_type.value}: {category} fertilizer needs exactly one of {sorted(PRICE_UNITS[category])}")
+    price = specs[price_keys[0]]
+    if price < 0:
+        raise ValueError(f"{fertilizer_type.value}: negative price")
+    if specs.get("organic") != (category == "organic"):
+        raise ValueError(f"{fertilizer_type.value}: organic flag does not match category {category!r}")
+    if category == "none":
+        if specs["n_content"] != 0 or specs["s_content"] != 0:
+            raise ValueError(f"{fertilizer_type.value}: 'none' category must not supply nutrients")
+    elif not specs["n_content"] > 0 or specs["s_content"] < 0:
+        raise ValueError(f"{fertilizer_type.value}: nutrient contents must be n > 0 and s >= 0")
+    return price_keys[0], price
+
+
+def compile_fertilizer_specs(specs=FERTILIZER_SPECS):
+    if set(specs) != set(FertilizerType):
+        raise ValueError("FERTILIZER_SPECS must define every FertilizerType exactly once")
+
+    types, names, units, categories = [], [], [], []
+    organic, kg_n, kg_s, eur = [], [], [], []
+    for fertilizer_type in FertilizerType:
+        fertilizer_specs = specs[fertilizer_type]
+        price_key, price = _validate(fertilizer_type, fertilizer_specs)
+        category = fertilizer_specs["category"]
+
+        if category == "mineral":
+            # Contents are % of product mass (kg per 100 kg), price per ton
+            n_per_unit = fertilizer_specs["n_content"] / 100
+            s_per_unit = fertilizer_specs["s_content"] / 100
+            price_per_unit = price / 1000
+        else:
+            # Organic contents are % (n_content * 10 kg per m³ or t)
+            n_per_unit = fertilizer_specs["n_content"] * 10
+            s_per_unit = fertilizer_specs["s_content"] * 10
+            price_per_unit = price
+
+        types.append(fertilizer_type)
+        names.append(fertilizer_specs["name"])
+        units.append(PRICE_UNITS[category][price_key])
+        categories.append(category)
+        organic.append(fertilizer_specs["organic"])
+        kg_n.append(n_per_unit)
+        kg_s.append(s_per_unit)
+        eur.append(price_per_unit)
+
+    return FertilizerTable(
+        types=types,
+        names=names,
+        units=units,
+        categories=categories,
+        organic=np.array(organic, dtype=bool),
+        kg_n_per_unit=np.array(kg_n, dtype=float),
+        kg_s_per_unit=np.array(kg_s, dtype=float),
+        eur_per_unit=np.array(eur, dtype=float)
+    )
+
+
+FERTILIZER_TABLE = compile_fertilizer_specs()
+
+
+def applied_nitrogen_kg(fertilizer_type, amount):
+    """kg N supplied by an amount of product (in the product's unit)"""
+    return float(FERTILIZER_TABLE.kg_n_per_unit[FERTILIZER_TABLE.index(fertilizer_type)] * amount)
+
+
+def cost_per_kg_n():
+    """EUR per kg of applied nitrogen for each fertilizer (0 where no N is supplied)"""
+    table = FERTILIZER_TABLE
+    return np.divide(
+        table.eur_per_unit,
+        table.kg_n_per_unit,
+        out=np.zeros(len(table.types)),
+        where=table.kg_n_per_unit > 0
+    )
+
+
+def _solve_basic(supply, residual, tight, basic):
+    """Solve the 1x1 or 2x2 system supply[tight][basic] · x = residual[tight]"""
+    if len(tight) == 1:
+        coefficient = supply[tight[0]][basic[0]]
+        return None if coefficient == 0 else [residual[tight[0]] / coefficient]
+    (a, b), (c, d) = [[supply[row][column] for column in basic] for row in tight]
+    determinant = a * d - b * c
+    if abs(determinant) < 1e-12:
+        return None
+    r0, r1 = residual[tight[0]], residual[tight[1]]
+    return [(r0 * d - b * r1) / determinant, (a * r1 - c * r0) / determinant]
+
+
+def _solve_mix(costs, supply, need, caps):
+    """Exact least-cost solution of min costs·x s.t. supply·x >= need, 0 <= x <= caps.
+
+    With one nutrient row per constraint (N and optionally S) the problem is
+    tiny, so all vertices are enumerated: every variable sits at a bound except
+    for at most one basic variable per tight constraint. Plain floats are used
+    because the systems are at most 2x2.
+    """
+    products = len(costs)
+    rows = len(need)
+    best_cost, best_x = float("inf"), None
+    for tight_count in range(rows + 1):
+        for tight in combinations(range(rows), tight_count):
+            for basic in combinations(range(products), tight_count):
+                others = [j for j in range(products) if j not in basic]
+                # Uncapped products can only sit at their lower bound
+                choices = [(0.0, caps[j]) if caps[j] != float("inf") else (0.0,) for j in others]
+                for bounds in product(*choices):
+                    x = [0.0] * products
+                    for j, value in zip(others, bounds):
+                        x[j] = value
+                    if tight_count:
+                        residual = [need[row] - sum(supply[row][j] * x[j] for j in others) for row in range(rows)]
+                        x_basic = _solve_basic(supply, residual, tight, basic)
+                        if x_basic is None or any(
+                            value < -1e-9 or value > caps[j] + 1e-9 for j, value in zip(basic, x_basic)
+                        ):
+                            continue
+                        for j, value in zip(basic, x_basic):
+                            x[j] = max(value, 0.0)
+                    if all(sum(supply[row][j] * x[j] for j in range(products)) >= need[row] - 1e-9 for row in range(rows)):
+                        cost = sum(costs[j] * x[j] for j in range(products))
+                        if cost < best_cost - 1e-12:
+                            best_cost, best_x = cost, x
+    return None if best_x is None else np.array(best_x)
+
+
+@lru_cache(maxsize=4096)
+def optimize_mix(n_requirement_kg, s_requirement_kg=0.0, organic_only=False, max_amounts=()):
+    """Cheapest combination of fertilizers covering the N (and S) requirement.
+
+    max_amounts is a tuple of (fertilizer_type, max amount) pairs overriding
+    FERTILIZER_MAX_AMOUNTS_250M2. Returns None if the caps make the
+    requirement impossible to cover.
+    """
+    table = FERTILIZER_TABLE
+    caps_by_type = dict(FERTILIZER_MAX_AMOUNTS_250M2)
+    caps_by_type.update(dict(max_amounts))
+    usable = [
+        index for index, category in enumerate(table.categories)
+        if category != "none" and (not organic_only or table.organic[index])
+    ]
+
+    costs = table.eur_per_unit[usable]
+    supply = np.vstack([table.kg_n_per_unit[usable], table.kg_s_per_unit[usable]])
+    need = np.array([n_requirement_kg, s_requirement_kg], dtype=float)
+    if s_requirement_kg <= 0:
+        supply, need = supply[:1], need[:1]
+    caps = np.array([caps_by_type.get(table.types[index], np.inf) for index in usable], dtype=float)
+
+    x = _solve_mix(costs.tolist(), supply.tolist(), need.tolist(), caps.tolist())
+    if x is None:
+        return None
+
+    mix = []
+    for position, index in enumerate(usable):
+        if x[position] <= 1e-9:
+            continue
+        mix.append({
+            "fertilizer_type": table.types[index],
+            "name": table.names[index],
+            "amount": round(float(x[position]), 2),
+            "unit": table.units[index],
+            "cost": round(float(x[position] * table.eur_per_unit[index]), 2),
+            "n_kg": round(float(x[position] * table.kg_n_per_unit[index]), 2),
+            "s_kg": round(float(x[position] * table.kg_s_per_unit[index]), 2)
+        })
+    return {
+        "total_cost": round(float(costs @ x), 2),
+        "n_supplied_kg": round(float(table.kg_n_per_unit[usable] @ x), 2),
+        "s_supplied_kg": round(float(table.kg_s_per_unit[usable] @ x), 2),
+        "mix": mix
+    }
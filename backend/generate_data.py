@@ -0,0 +1,431 @@
+"""Synthetic dataset generator for load tests and benchmarks.
+
+Creates thousands of plots across locations and soil types, hundreds of
+machines derived from the fixture machines, and hundreds of thousands of
+orders with payment data and advisories. Categorical fields follow the
+weights below; orders are priced with the pricing engine so that costs,
+yields and profits are consistent with what the API would compute.
+
+Like in the app, a plot has at most one order that is not completed (the
+current season). Once every plot has one, further orders drawn as open
+become completed orders instead, so with many more orders than plots the
+share of completed orders is higher than ORDER_STATUS_WEIGHTS says.
+Completed orders of a plot lie in distinct earlier seasons.
+
+Documents are generated in batches and written with insert_many, with up to
+--concurrency batches in flight at once:
+
+    cd backend
+    python generate_data.py --plots 5000 --machines 300 --orders 200000
+
+Connection settings (MONGO_URL, DB_NAME) are read from the environment or
+backend/.env like the server. Existing plots, machines, orders and
+advisories are dropped first unless --keep is given.
+"""
+import asyncio
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+import numpy as np
+import typer
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from reference_data import (
+    SoilType, CropType, FertilizerType, CultivationMethod, WorkingStep, OrderStatus, PaymentStatus, HarvestOption,
+    N_REQUIREMENTS, calculate_yield_by_soil_points
+)
+from fertilizer import FERTILIZER_TABLE, applied_nitrogen_kg
+from pricing import quote
+from scenarios import fertilizer_application
+from seeding import load_fixtures
+
+ROOT_DIR = Path(__file__).parent
+
+LOCATIONS = [
+    "39291 Grabow", "39288 Burg", "39307 Genthin", "39326 Wolmirstedt", "39343 Haldensleben",
+    "39356 Weferlingen", "39387 Oschersleben", "39418 Staßfurt", "39435 Egeln", "39517 Tangerhütte",
+    "39576 Stendal", "39606 Osterburg", "39624 Kalbe", "39638 Gardelegen", "06406 Bernburg",
+    "06449 Aschersleben", "06618 Naumburg", "14913 Jüterbog", "14943 Luckenwalde", "16928 Pritzwalk"
+]
+
+# Soil type -> (weight, soil points range)
+SOIL_TYPES = {
+    SoilType.SAND: (0.30, (25, 32)),
+    SoilType.LOAMY_SAND: (0.30, (33, 40)),
+    SoilType.CLAYEY_SAND: (0.20, (38, 45)),
+    SoilType.SANDY_LOAM: (0.20, (44, 56))
+}
+
+CROP_WEIGHTS = {
+    CropType.WINTERWEIZEN: 0.22,
+    CropType.WINTERROGGEN: 0.14,
+    CropType.WINTERGERSTE: 0.12,
+    CropType.WINTERTRITICALE: 0.06,
+    CropType.WINTERRAPS: 0.10,
+    CropType.KHORASAN_WEIZEN: 0.03,
+    CropType.SILOMAIS: 0.12,
+    CropType.ZUCKERRUEBEN: 0.06,
+    CropType.LUZERNE: 0.04,
+    CropType.GRAS: 0.04,
+    CropType.BLUEHMISCHUNG: 0.04,
+    CropType.ERBSEN: 0.03
+}
+
+ORGANIC_SHARE = 0.2
+SHIP_HOME_SHARE = 0.35
+
+ORDER_STATUS_WEIGHTS = {
+    OrderStatus.PENDING: 0.10,
+    OrderStatus.CONFIRMED: 0.10,
+    OrderStatus.IMPLEMENTING: 0.05,
+    OrderStatus.GROWING: 0.15,
+    OrderStatus.HARVEST_READY: 0.05,
+    OrderStatus.COMPLETED: 0.55
+}
+
+# Share of pending orders whose PayPal checkout was started (or failed)
+PENDING_PAYMENT_WEIGHTS = {None: 0.6, PaymentStatus.PENDING: 0.3, PaymentStatus.FAILED: 0.1}
+
+SEASON_DAYS = 365
+
+ADVISORY_TYPES = ["disease", "pest", "fungicide", "insecticide", "general"]
+ADVISORIES_PER_ORDER = 1.5  # Mean of a Poisson distribution, orders past "pending" only
+
+STEPS = [
+    WorkingStep.BODENBEARBEITUNG, WorkingStep.AUSSAAT, WorkingStep.PFLANZENSCHUTZ,
+    WorkingStep.DUENGUNG, WorkingStep.PFLEGE, WorkingStep.ERNTE
+]
+
+app = typer.Typer(add_completion=False)
+
+
+def _choice(rng, weights, size):
+    values = list(weights)
+    probabilities = np.array(list(weights.values()), dtype=float)
+    indices = rng.choice(len(values), size=size, p=probabilities / probabilities.sum())
+    return [values[index] for index in indices]
+
+
+def generate_plots(rng, count, created_at):
+    soil_types = _choice(rng, {soil: weight for soil, (weight, _) in SOIL_TYPES.items()}, count)
+    locations = rng.choice(LOCATIONS, size=count)
+    plots = []
+    for index, (soil_type, location) in enumerate(zip(soil_types, locations)):
+        low, high = SOIL_TYPES[soil_type][1]
+        soil_points = int(rng.integers(low, high + 1))
+        # Same price level as the fixtures: 7.50 EUR at 28 points, 14.00 EUR at 52
+        price = round((7.5 + 0.27 * (soil_points - 28)) * 2) / 2
+        row, number = divmod(index, 99)
+        plots.append({
+            "id": f"synthetic_plot_{index:06d}",
+            "name": f"{chr(ord('A') + row % 26)}{number + 1} - {location.split(' ', 1)[1]} {row // 26 + 1}",
+            "size_m2": 250.0,
+            "length_m": 18.0,
+            "width_m": 13.8,
+            "soil_type": soil_type.value,
+            "soil_points": soil_points,
+            "location": str(location),
+            "description": f"Synthetische Parzelle, {soil_points} Bodenpunkte",
+            "price_per_plot": price,
+            "available": True,
+            "image_url": None,
+            "created_at": created_at
+        })
+    return plots
+
+
+def generate_machines(rng, count, templates):
+    """Variants of the fixture machines with jittered prices"""
+    machines = []
+    for index in range(count):
+        template = templates[index % len(templates)]
+        variant = index // len(templates)
+        machine = {
+            "fertilizer_type": None, "season": None, "treatment_type": None, "crop_specific": None,
+            "image_url": None,
+            **template
+        }
+        if variant:
+            machine["id"] = f"{template['id']}_{variant:03d}"
+            machine["name"] = f"{template['name']} #{variant + 1}"
+            machine["price_per_use"] = round(template["price_per_use"] * float(rng.uniform(0.8, 1.2)), 2)
+        machines.append(machine)
+    return machines
+
+
+class OrderFactory:
+    """Builds priced order documents for random decisions"""
+
+    def __init__(self, rng, plots, machines, now):
+        self.rng = rng
+        # Scalar draws per order are much cheaper with the stdlib generator
+        self.random = random.Random(int(rng.integers(2 ** 32)))
+        self.plots = plots
+        self.now = now
+        self.free_plots = list(range(len(plots)))  # Plots without an open order
+        self.past_seasons = [0] * len(plots)  # Completed orders per plot so far
+        self.price_per_use = {machine["id"]: machine["price_per_use"] for machine in machines}
+        self.machines_by_crop_step = {}
+        for machine in machines:
+            for crop in machine["suitable_for"]:
+                self.machines_by_crop_step.setdefault((crop, machine["working_step"]), []).append(machine)
+        self.supplies_n = [index for index, kg_n in enumerate(FERTILIZER_TABLE.kg_n_per_unit) if kg_n > 0]
+        self.organic_n = [index for index in self.supplies_n if FERTILIZER_TABLE.organic[index]]
+        self.no_fertilizer = FERTILIZER_TABLE.categories.index("none")
+
+    def uuid(self):
+        """Seeded UUID4, so a seed reproduces the same dataset"""
+        return str(uuid.UUID(int=self.random.getrandbits(128), version=4))
+
+    def fertilizer_choice(self, crop, soil_points, organic):
+        n_requirement = calculate_yield_by_soil_points(crop, soil_points) / 1000 * N_REQUIREMENTS.get(crop, 0.0)
+        if n_requirement <= 0:
+            index, amount = self.no_fertilizer, 0.0
+        else:
+            index = self.random.choice(self.organic_n if organic else self.supplies_n)
+            # Customers apply between 70 % and 110 % of the requirement
+            amount = n_requirement * self.random.uniform(0.7, 1.1) / float(FERTILIZER_TABLE.kg_n_per_unit[index])
+        return {
+            "fertilizer_type": FERTILIZER_TABLE.types[index].value,
+            "amount": round(amount, 2),
+            "cost": round(amount * float(FERTILIZER_TABLE.eur_per_unit[index]), 2)
+        }
+
+    def machines(self, crop, fertilizer_type):
+        selected = {}
+        for step in STEPS:
+            candidates = self.machines_by_crop_step.get((crop, step), [])
+            if step == WorkingStep.DUENGUNG:
+                # Spreader matching the fertilizer, none without fertilization
+                application = fertilizer_application(fertilizer_type) if fertilizer_type else None
+                candidates = [machine for machine in candidates if application and machine["fertilizer_type"] == application]
+            # One machine for the main steps and fertilization, zero to two treatments otherwise
+            if step in (WorkingStep.BODENBEARBEITUNG, WorkingStep.AUSSAAT, WorkingStep.DUENGUNG, WorkingStep.ERNTE):
+                count = 1
+            else:
+                count = self.random.randint(0, 2)
+            picked = self.random.sample(candidates, min(count, len(candidates)))
+            selected[step.value] = [machine["id"] for machine in picked]
+        return selected
+
+    def place(self, status):
+        """(plot index, status, created_at): one open order per plot, completed ones in earlier seasons"""
+        if status != OrderStatus.COMPLETED and self.free_plots:
+            slot = self.random.randrange(len(self.free_plots))
+            self.free_plots[slot], self.free_plots[-1] = self.free_plots[-1], self.free_plots[slot]
+            plot_index = self.free_plots.pop()
+            return plot_index, status, self.now - timedelta(days=self.random.uniform(0, SEASON_DAYS))
+        # Season k of a plot starts k seasons back; created in its first half, so seasons do not overlap
+        plot_index = self.random.randrange(len(self.plots))
+        self.past_seasons[plot_index] += 1
+        age = (self.past_seasons[plot_index] + self.random.uniform(0, 0.5)) * SEASON_DAYS
+        return plot_index, OrderStatus.COMPLETED, self.now - timedelta(days=age)
+
+    def batch(self, size, crops, methods, harvest_options, statuses):
+        orders = []
+        for position in range(size):
+            plot_index, status, created_at = self.place(statuses[position])
+            plot = self.plots[plot_index]
+            crop = crops[position]
+            method = methods[position]
+            harvest_option = harvest_options[position]
+
+            choice = self.fertilizer_choice(crop, plot["soil_points"], method == CultivationMethod.BIOLOGISCH)
+            fertilizer_type = FertilizerType(choice["fertilizer_type"])
+            machines = self.machines(crop, fertilizer_type if fertilizer_type != FertilizerType.KEINE_DUENGUNG else None)
+            machine_prices = tuple(sorted(
+                (machine_id, self.price_per_use[machine_id]) for step in machines.values() for machine_id in step
+            ))
+            breakdown = quote(
+                plot["price_per_plot"],
+                plot["soil_points"],
+                crop,
+                choice["cost"],
+                machine_prices,
+                harvest_option,
+                round(applied_nitrogen_kg(choice["fertilizer_type"], choice["amount"]), 3),
+                method
+            )
+
+            customer = self.random.randrange(max(1, len(self.plots) * 4))
+            payment_status = self.payment_status(status)
+            orders.append({
+                "id": self.uuid(),
+                "user_name": f"Kunde {customer}",
+                "user_email": f"kunde{customer}@example.com",
+                "user_phone": None,
+                "plot_id": plot["id"],
+                "farming_decision": {
+                    "cultivation_method": method.value,
+                    "crop_type": crop.value,
+                    "expected_yield_kg": breakdown.expected_yield_kg,
+                    "fertilizer_choice": choice,
+                    "machines": machines,
+                    "harvest_option": harvest_option.value,
+                    "shipping_address": "Musterstraße 1, 12345 Musterstadt" if harvest_option == HarvestOption.SHIP_HOME else None,
+                    "special_harvest": None
+                },
+                "total_cost": breakdown.payment_amount,
+                "expected_yield_kg": breakdown.expected_yield_kg,
+                "expected_market_value": breakdown.expected_market_value,
+                "profit_loss": breakdown.profit_loss,
+                "cart_id": None,
+                "payment_data": None if payment_status is None else {
+                    "paypal_order_id": f"SYNTH{self.random.getrandbits(64):016X}",
+                    "amount": breakdown.payment_amount,
+                    "currency": "EUR",
+                    "status": payment_status.value,
+                    "created_at": created_at
+                },
+                "status": status.value,
+                "notes": None,
+                "created_at": created_at,
+                "updated_at": min(self.now, created_at + timedelta(days=self.random.uniform(0, 30)))
+            })
+        return orders
+
+    def payment_status(self, status):
+        if status == OrderStatus.PENDING:
+            return self.random.choices(list(PENDING_PAYMENT_WEIGHTS), weights=list(PENDING_PAYMENT_WEIGHTS.values()))[0]
+        return PaymentStatus.COMPLETED
+
+    def advisories(self, orders):
+        advisories = []
+        counts = self.rng.poisson(ADVISORIES_PER_ORDER, size=len(orders))
+        for order, count in zip(orders, counts):
+            if order["status"] == OrderStatus.PENDING.value:
+                continue
+            for _ in range(count):
+                advisory_type = self.random.choice(ADVISORY_TYPES)
+                created_at = order["created_at"] + timedelta(days=self.random.uniform(1, 200))
+                advisories.append({
+                    "id": self.uuid(),
+                    "order_id": order["id"],
+                    "message": f"Synthetischer Hinweis ({advisory_type}) für {order['farming_decision']['crop_type']}",
+                    "advisory_type": advisory_type,
+                    "broadcast_id": None,
+                    "rule_id": None,
+                    "created_at": created_at,
+                    "acknowledged": bool(created_at < self.now - timedelta(days=30))
+                })
+        return advisories
+
+
+class BulkLoader:
+    """insert_many batches with a bounded number of concurrent writes"""
+
+    def __init__(self, db, concurrency):
+        self.db = db
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.pending = set()
+        self.inserted = {}
+
+    async def _insert(self, collection, documents):
+        try:
+            await self.db[collection].insert_many(documents, ordered=False)
+            self.inserted[collection] = self.inserted.get(collection, 0) + len(documents)
+        finally:
+            self.semaphore.release()
+
+    async def submit(self, collection, documents):
+        if not documents:
+            return
+        await self.semaphore.acquire()  # Back-pressure: generation waits for a free slot
+        task = asyncio.create_task(self._insert(collection, documents))
+        self.pending.add(task)
+        task.add_done_callback(self.pending.discard)
+
+    async def drain(self):
+        if self.pending:
+            await asyncio.gather(*self.pending)
+
+
+async def generate(plot_count, machine_count, order_count, batch_size, concurrency, seed, keep):
+    load_dotenv(ROOT_DIR / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    rng = np.random.default_rng(seed)
+    now = datetime.utcnow()
+    timings = {}
+
+    try:
+        started = time.perf_counter()
+        if not keep:
+            await asyncio.gather(*(
+                db[collection].delete_many({}) for collection in ("plots", "machines", "orders", "advisories")
+            ))
+        timings["clear"] = time.perf_counter() - started
+
+        loader = BulkLoader(db, concurrency)
+        started = time.perf_counter()
+        plots = generate_plots(rng, plot_count, now)
+        machines = generate_machines(rng, machine_count, load_fixtures()["machines"])
+        for start in range(0, len(plots), batch_size):
+            await loader.submit("plots", plots[start:start + batch_size])
+        await loader.submit("machines", machines)
+        timings["catalog"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        factory = OrderFactory(rng, plots, machines, now)
+        occupied = set()
+        for start in range(0, order_count, batch_size):
+            size = min(batch_size, order_count - start)
+            methods = [
+                CultivationMethod.BIOLOGISCH if organic else CultivationMethod.KONVENTIONELL
+                for organic in rng.random(size) < ORGANIC_SHARE
+            ]
+            harvest_options = [
+                HarvestOption.SHIP_HOME if ship else HarvestOption.SELL_TO_FARMER
+                for ship in rng.random(size) < SHIP_HOME_SHARE
+            ]
+            orders = factory.batch(
+                size,
+                _choice(rng, CROP_WEIGHTS, size),
+                methods,
+                harvest_options,
+                _choice(rng, ORDER_STATUS_WEIGHTS, size)
+            )
+            occupied.update(order["plot_id"] for order in orders if order["status"] != OrderStatus.COMPLETED.value)
+            await loader.submit("orders", orders)
+            advisories = factory.advisories(orders)
+            for advisory_start in range(0, len(advisories), batch_size):
+                await loader.submit("advisories", advisories[advisory_start:advisory_start + batch_size])
+        await loader.drain()
+        timings["orders"] = time.perf_counter() - started
+
+        # Plots with an open order are leased
+        started = time.perf_counter()
+        if occupied:
+            await db.plots.update_many({"id": {"$in": sorted(occupied)}}, {"$set": {"available": False}})
+        timings["availability"] = time.perf_counter() - started
+    finally:
+        client.close()
+
+    return loader.inserted, timings
+
+
+@app.command()
+def main(
+    plots: int = typer.Option(5000, min=1, help="Number of plots"),
+    machines: int = typer.Option(300, min=1, help="Number of machines"),
+    orders: int = typer.Option(200000, min=0, help="Number of orders"),
+    batch_size: int = typer.Option(5000, min=1, help="Documents per insert_many"),
+    concurrency: int = typer.Option(4, min=1, help="insert_many batches in flight"),
+    seed: int = typer.Option(42, help="Random seed"),
+    keep: bool = typer.Option(False, help="Keep existing data instead of dropping it")
+):
+    """Generate a synthetic dataset and bulk-load it into MongoDB"""
+    started = time.perf_counter()
+    inserted, timings = asyncio.run(generate(plots, machines, orders, batch_size, concurrency, seed, keep))
+    for collection, count in inserted.items():
+        typer.echo(f"{collection:<12} {count:>9}")
+    for phase, seconds in timings.items():
+        typer.echo(f"{phase:<12} {seconds:>8.2f} s")
+    typer.echo(f"{'total':<12} {time.perf_counter() - started:>8.2f} s")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,40 @@
+"""Gunicorn settings for multi-process serving with uvicorn workers.
+
+    cd backend
+    gunicorn -c gunicorn.conf.py server:app
+
+The app is imported once in the master (preload_app) before the workers are
+forked, so the immutable reference data (pricing, fertilizer and yield
+tables, the catalog snapshot and the crop recommendations computed from it)
+exists once in memory and is shared copy-on-write. gc.freeze() moves these
+objects out of the collector's reach, otherwise the first collection in each
+worker would write to (and so copy) every page holding them. Database
+connections, the PayPal client and background tasks are created per worker
+in the app's lifespan, after the fork.
+
+WEB_CONCURRENCY sets the number of workers; PRELOAD_APP=0 imports the app in
+every worker instead (for comparison, see memory_report.py). Workers share
+cache invalidation, SSE events and the advisory scheduler through MongoDB;
+DATA_BACKEND=memory keeps all state in one process and needs
+WEB_CONCURRENCY=1.
+"""
+import gc
+import os
+import sys
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = os.environ.get("PRELOAD_APP", "1") == "1"
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+
+
+def when_ready(arbiter):
+    app_module = sys.modules.get("server")
+    if app_module is not None:
+        app_module.preload_shared_state()
+        gc.collect()
+        gc.freeze()
+        arbiter.log.info(f"Preloaded shared state; {gc.get_freeze_count()} objects frozen")
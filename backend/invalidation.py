@@ -0,0 +1,184 @@
+"""Cross-worker cache invalidation.
+
+Every worker keeps its own caches (cached repositories, crop
+recommendations). The InvalidationBus tells them which documents of plots,
+machines and orders changed, as (collection, ids) events where ids=None
+means "anything in the collection". Each event bumps the collection's
+version in the bus.
+
+Writes made by this worker are published synchronously. Writes made by
+other workers arrive from one of two sources:
+
+- change streams on the database (replica sets and sharded clusters).
+  Events carry no document lookup: inserts name their id, updates and
+  deletes only the database _id (or the id, where it is the shard key), so
+  those evict the whole collection.
+- polling the catalog_versions collection, for standalone servers. Each
+  worker appends the ids it wrote to a short per-collection change log
+  there, coalesced once per poll interval outside the request path, and
+  polls that log. Orders are logged as a version only: their writes are
+  frequent and large, and orders are only cached as a whole.
+
+CACHE_INVALIDATION selects the source: "auto" (change streams, falling
+back to polling), "change_streams", "polling" or "off".
+"""
+import asyncio
+import logging
+import os
+import socket
+from pymongo.errors import OperationFailure, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+WATCHED_COLLECTIONS = ("plots", "machines", "orders")
+CHANGE_LOG_LENGTH = 100
+MAX_LOGGED_IDS = 1000  # Larger writes are logged as "anything changed"
+VERSION_ONLY_COLLECTIONS = ("orders",)  # Logged without ids
+CHANGE_STREAMS_UNSUPPORTED = (40573, 20)  # Not a replica set / IllegalOperation
+
+
+class InvalidationBus:
+    def __init__(self):
+        self.worker_id = None  # Set per process once polling starts (the bus may be created before the fork)
+        self.versions = {collection: 0 for collection in WATCHED_COLLECTIONS}
+        self.subscribers = {collection: [] for collection in WATCHED_COLLECTIONS}
+        self.change_log = None
+        self.pending = {}  # Collection -> ids written since the last flush, None for "anything"
+        self.mode = "local"
+        self.received = 0
+
+    def subscribe(self, collection, callback):
+        """Call callback(ids) whenever documents of the collection change"""
+        self.subscribers[collection].append(callback)
+
+    def notify(self, collection, ids=None):
+        if collection not in self.versions:
+            return
+        self.versions[collection] += 1
+        for callback in self.subscribers[collection]:
+            callback(ids)
+
+    async def publish(self, collection, ids=None):
+        """Report a write of this worker: evict locally and queue it for the other workers"""
+        if collection not in self.versions:
+            return
+        self.notify(collection, ids)
+        if self.change_log is None:
+            return
+        if collection in VERSION_ONLY_COLLECTIONS or ids is None:
+            self.pending[collection] = None
+        elif self.pending.setdefault(collection, set()) is not None:
+            self.pending[collection].update(ids)
+            if len(self.pending[collection]) > MAX_LOGGED_IDS:
+                self.pending[collection] = None
+
+    async def flush(self):
+        """Append the writes queued since the last flush to the change log, one entry per collection"""
+        pending, self.pending = self.pending, {}
+        for collection, ids in pending.items():
+            update = {"$inc": {"version": 1}}
+            if collection not in VERSION_ONLY_COLLECTIONS:
+                update["$push"] = {"changes": {
+                    "$each": [{"worker": self.worker_id, "ids": None if ids is None else sorted(ids)}],
+                    "$slice": -CHANGE_LOG_LENGTH
+                }}
+            try:
+                await self.change_log.update_one({"_id": collection}, update, upsert=True)
+            except PyMongoError:
+                logger.exception(f"Could not log the change to {collection}")
+
+    def status(self):
+        return {"mode": self.mode, "versions": dict(self.versions), "received": self.received}
+
+
+async def watch_change_streams(db, bus):
+    """Apply changes of other workers from a database change stream; resumes after errors"""
+    pipeline = [
+        {"$match": {"ns.coll": {"$in": list(WATCHED_COLLECTIONS)}}},
+        # Inserts carry the full document anyway; keep only its id
+        {"$project": {"ns": 1, "documentKey": 1, "fullDocument.id": 1}}
+    ]
+    resume_token = None
+    while True:
+        try:
+            async with db.watch(pipeline, resume_after=resume_token) as stream:
+                bus.mode = "change_streams"
+                async for change in stream:
+                    resume_token = stream.resume_token
+                    bus.received += 1
+                    bus.notify(change["ns"]["coll"], _change_ids(change))
+        except OperationFailure as e:
+            if e.code in CHANGE_STREAMS_UNSUPPORTED:
+                raise
+            # E.g. the resume token fell out of the oplog: start over
+            logger.warning(f"Change stream failed ({e}), restarting")
+            resume_token = None
+        except PyMongoError as e:
+            logger.warning(f"Change stream failed ({e}), restarting")
+        # Events may have been missed while the stream was down
+        if resume_token is None:
+            for collection in WATCHED_COLLECTIONS:
+                bus.notify(collection)
+        await asyncio.sleep(1)
+
+
+def _change_ids(change):
+    """The id a change stream event names, or None if only the database _id is known"""
+    document_id = (change.get("fullDocument") or {}).get("id", change["documentKey"].get("id"))
+    return None if document_id is None else {document_id}
+
+
+def _changed_ids(document, seen_version, worker_id):
+    """IDs changed by other workers since seen_version; None if anything may have changed"""
+    changes = document.get("changes", [])
+    missed = document["version"] - seen_version
+    if missed > len(changes):
+        return None  # The log no longer reaches back far enough
+    ids = set()
+    for change in changes[len(changes) - missed:]:
+        if change["worker"] == worker_id:
+            continue
+        if change["ids"] is None:
+            return None
+        ids.update(change["ids"])
+    return ids
+
+
+async def poll_change_log(change_log, bus, interval):
+    """Apply changes of other workers from the catalog_versions change log"""
+    bus.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    bus.change_log = change_log
+    bus.mode = "polling"
+    seen = {}
+    async for document in change_log.find({"_id": {"$in": list(WATCHED_COLLECTIONS)}}):
+        seen[document["_id"]] = document["version"]
+    while True:
+        await asyncio.sleep(interval)
+        await bus.flush()
+        try:
+            async for document in change_log.find({"_id": {"$in": list(WATCHED_COLLECTIONS)}}):
+                collection = document["_id"]
+                if document["version"] == seen.get(collection, 0):
+                    continue
+                ids = _changed_ids(document, seen.get(collection, 0), bus.worker_id)
+                seen[collection] = document["version"]
+                if ids is None or ids:
+                    bus.received += 1
+                    bus.notify(collection, ids)
+        except PyMongoError as e:
+            logger.warning(f"Polling the change log failed: {e}")
+
+
+async def run_invalidation(db, bus, mode="auto", poll_interval=2.0):
+    """Keep the bus fed from the configured source until cancelled"""
+    if mode == "off":
+        bus.mode = "off"
+        return
+    if mode in ("auto", "change_streams"):
+        try:
+            await watch_change_streams(db, bus)
+        except OperationFailure as e:
+            if mode == "change_streams":
+                raise
+            logger.info(f"Change streams unavailable ({e.code}), polling every {poll_interval} s instead")
+    await poll_change_log(db["catalog_versions"], bus, poll_interval)
@@ -0,0 +1,174 @@
+"""Memory per worker under gunicorn, with and without preloading the app.
+
+Seeds the database, starts gunicorn (gunicorn.conf.py) once with
+PRELOAD_APP=1 and once with PRELOAD_APP=0, waits until the workers answer
+/api/ready, sends a few catalog requests and reads /proc/<pid>/smaps_rollup
+of the master and every worker (Linux only):
+
+    cd backend
+    python memory_report.py --workers 4
+
+The server runs like in production, against MongoDB (MONGO_URL and DB_NAME
+from the environment or backend/.env); the in-memory backend keeps its data
+per process and cannot be seeded from outside. --dataset fixtures (the
+default) merges the fixtures into the database like
+POST /api/initialize-data?reset=false, --dataset generated replaces the
+catalog and orders with a generate_data.py dataset of --plots, --machines
+and --orders, and --dataset existing measures whatever is there. With
+--snapshot a catalog snapshot is written from the seeded database and
+preloaded (CATALOG_SNAPSHOT).
+
+RSS counts shared pages in full for every process; PSS splits them between
+the processes sharing them, so the PSS total is the real footprint of the
+deployment. USS is the memory private to one process.
+"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from enum import Enum
+from pathlib import Path
+import typer
+from dotenv import load_dotenv
+
+ROOT_DIR = Path(__file__).parent
+
+app = typer.Typer(add_completion=False)
+
+
+class Dataset(str, Enum):
+    FIXTURES = "fixtures"
+    GENERATED = "generated"
+    EXISTING = "existing"
+
+FIELDS = ("Rss", "Pss", "Private_Clean", "Private_Dirty")
+
+
+def smaps_rollup(pid):
+    """Memory counters of a process in MiB"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as rollup:
+        for line in rollup:
+            parts = line.split()
+            if parts[0].rstrip(":") in FIELDS:
+                values[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss": values["Rss"],
+        "pss": values["Pss"],
+        "uss": values["Private_Clean"] + values["Private_Dirty"]
+    }
+
+
+def child_pids(parent_pid):
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as stat_file:
+                fields = stat_file.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == parent_pid:
+            children.append(int(entry))
+    return children
+
+
+def get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=2) as response:
+            return response.status
+    except OSError:
+        return None
+
+
+def get_json(url):
+    with urllib.request.urlopen(url, timeout=10) as response:
+        return json.load(response)
+
+
+async def seed_fixtures():
+    """Merge the fixtures into the database, keeping orders and plot availability"""
+    import server
+    try:
+        await server.initialize_sample_data(reset=False)
+        # The workers compute the recommendations themselves
+        server.recommendation_refresh_task.cancel()
+    finally:
+        server.repos.close()
+
+
+def seed(dataset, plots, machines, orders, snapshot=None):
+    if dataset == Dataset.FIXTURES:
+        asyncio.run(seed_fixtures())
+    elif dataset == Dataset.GENERATED:
+        from generate_data import generate
+        asyncio.run(generate(plots, machines, orders, batch_size=5000, concurrency=4, seed=42, keep=False))
+    if snapshot:
+        from catalog_snapshot import snapshot_database
+        asyncio.run(snapshot_database(Path(snapshot).resolve()))
+
+
+def measure(workers, preload, port, snapshot=None, requests=50, timeout=60.0):
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), PRELOAD_APP="1" if preload else "0", PORT=str(port))
+    env.setdefault("ADVISORY_RULES_INTERVAL_MINUTES", "0")
+    if snapshot:
+        env["CATALOG_SNAPSHOT"] = str(Path(snapshot).resolve())
+    master = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "server:app"],
+        cwd=ROOT_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        base_url = f"http://127.0.0.1:{port}/api"
+        deadline = time.monotonic() + timeout
+        while len(child_pids(master.pid)) < workers or get(f"{base_url}/ready") != 200:
+            if time.monotonic() > deadline or master.poll() is not None:
+                raise RuntimeError("gunicorn did not become ready")
+            time.sleep(0.2)
+        catalog = {path: len(get_json(base_url + path)) for path in ("/plots", "/machines")}
+        # Spread some traffic over the workers before measuring
+        for _ in range(requests):
+            for path in ("/ready", "/plots", "/machines"):
+                get(base_url + path)
+        time.sleep(1)
+        return catalog, smaps_rollup(master.pid), [smaps_rollup(pid) for pid in child_pids(master.pid)]
+    finally:
+        master.terminate()
+        master.wait(timeout=30)
+
+
+@app.command()
+def main(
+    workers: int = typer.Option(4, min=1, help="Number of uvicorn workers"),
+    port: int = typer.Option(8765, help="Port to bind the test server to"),
+    snapshot: Path = typer.Option(None, help="Catalog snapshot to write from the database and preload"),
+    requests: int = typer.Option(50, min=0, help="Request rounds before measuring"),
+    dataset: Dataset = typer.Option(Dataset.FIXTURES, help="Data to seed before measuring"),
+    plots: int = typer.Option(5000, min=1, help="Plots of the generated dataset"),
+    machines: int = typer.Option(300, min=1, help="Machines of the generated dataset"),
+    orders: int = typer.Option(200000, min=0, help="Orders of the generated dataset")
+):
+    load_dotenv(ROOT_DIR / ".env")
+    if os.environ.get("DATA_BACKEND", "mongo") != "mongo" or not os.environ.get("MONGO_URL"):
+        raise typer.BadParameter("the report needs MongoDB: set MONGO_URL and DB_NAME and leave DATA_BACKEND unset")
+    seed(dataset, plots, machines, orders, snapshot)
+    typer.echo(f"{'mode':<12} {'RSS/worker':>11} {'PSS/worker':>11} {'USS/worker':>11} {'PSS total':>10}")
+    for preload in (False, True):
+        catalog, master, worker_stats = measure(workers, preload, port, snapshot, requests)
+        average = {key: sum(stats[key] for stats in worker_stats) / len(worker_stats) for key in ("rss", "pss", "uss")}
+        total = master["pss"] + sum(stats["pss"] for stats in worker_stats)
+        typer.echo(
+            f"{'preload' if preload else 'per-worker':<12} {average['rss']:>7.1f} MiB {average['pss']:>7.1f} MiB "
+            f"{average['uss']:>7.1f} MiB {total:>6.1f} MiB"
+        )
+    typer.echo(f"catalog served: {catalog['/plots']} plots, {catalog['/machines']} machines")
+
+
+if __name__ == "__main__":
+    app()
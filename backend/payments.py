@@ -0,0 +1,55 @@
+"""PayPal payment gateway.
+
+The PayPal SDK (and the requests stack under it) is imported and the client is
+built on first use, so workers that never take a payment do not pay for it at
+startup. SDK errors are re-raised as PaymentError.
+"""
+import threading
+
+
+class PaymentError(Exception):
+    pass
+
+
+class PayPalGateway:
+    def __init__(self, client_id, client_secret, environment="sandbox"):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.environment = environment
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._client is not None
+
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from paypalcheckoutsdk.core import SandboxEnvironment, LiveEnvironment, PayPalHttpClient
+                    if self.environment == "sandbox":
+                        environment = SandboxEnvironment(client_id=self.client_id, client_secret=self.client_secret)
+                    else:
+                        environment = LiveEnvironment(client_id=self.client_id, client_secret=self.client_secret)
+                    self._client = PayPalHttpClient(environment)
+        return self._client
+
+    def execute(self, request):
+        from paypalhttp import HttpError
+        try:
+            return self.client().execute(request)
+        except HttpError as e:
+            raise PaymentError(str(e)) from e
+
+    def create_order(self, body):
+        """Create a PayPal order; returns the SDK response"""
+        from paypalcheckoutsdk.orders import OrdersCreateRequest
+        request = OrdersCreateRequest()
+        request.prefer('return=representation')
+        request.request_body(body)
+        return self.execute(request)
+
+    def capture_order(self, paypal_order_id):
+        from paypalcheckoutsdk.orders import OrdersCaptureRequest
+        return self.execute(OrdersCaptureRequest(paypal_order_id))
@@ -0,0 +1,169 @@
+"""Budget-constrained crop portfolio over several plots.
+
+Every plot gets at most one crop × fertilizer × harvest option from the
+scenario sweep (or stays unleased), the sum of payment amounts must fit the
+customer's budget, and the objective is either expected profit or a
+risk-adjusted profit (the approximate P10 of the profit distribution, using
+the crop variability from the risk simulation). This is a multiple-choice
+knapsack problem.
+
+Options that cost more without earning more are pruned per plot first. Small
+portfolios are then solved exactly with a Pareto-frontier dynamic program
+over (payment, objective) pairs; large ones, or frontiers that grow beyond
+FRONTIER_LIMIT, use the LP greedy over each plot's convex hull followed by an
+upgrade pass.
+"""
+from enum import Enum
+import numpy as np
+from risk import VALUE_CV
+from scenarios import CROPS, FERTILIZERS, HARVEST_OPTIONS
+
+EXACT_MAX_PLOTS = 25
+FRONTIER_LIMIT = 20000
+P10_Z = 1.2815515655446004  # Standard normal 10% quantile (negated)
+
+
+class Objective(str, Enum):
+    PROFIT = "profit"
+    RISK = "risk"  # Maximize the approximate P10 profit
+
+
+def candidate_options(result, objective, allowed_crops=None, allowed_harvest_options=None):
+    """Per plot: pruned list of (payment, value, (crop, fertilizer, harvest)) with value > 0"""
+    value = result["profit_loss"]
+    if objective == Objective.RISK:
+        deviation = result["expected_market_value"] * VALUE_CV[None, :, None]
+        value = value - P10_Z * deviation[..., None]
+
+    feasible = result["feasible"].copy()
+    if allowed_crops is not None:
+        feasible &= np.array([crop in allowed_crops for crop in CROPS])[None, :, None, None]
+    if allowed_harvest_options is not None:
+        feasible &= np.array([option in allowed_harvest_options for option in HARVEST_OPTIONS])
+    feasible &= value > 0
+
+    options = []
+    for plot_index in range(value.shape[0]):
+        indices = np.argwhere(feasible[plot_index])
+        payments = np.round(result["payment_amount"][plot_index][feasible[plot_index]], 2)
+        values = value[plot_index][feasible[plot_index]]
+        # Cheapest first, best value first among equal payments
+        order = np.lexsort((-values, payments))
+        pruned = []
+        for position in order:
+            if not pruned or values[position] > pruned[-1][1]:
+                pruned.append((float(payments[position]), float(values[position]), tuple(int(i) for i in indices[position])))
+        options.append(pruned)
+    return options
+
+
+def _solve_exact(options, budget):
+    """Pareto frontier DP; returns the chosen option index per plot, or None if the frontier explodes"""
+    # Frontier entries: (payment, value, choices) with value strictly increasing in payment
+    frontier = [(0.0, 0.0, ())]
+    for plot_options in options:
+        candidates = []
+        for payment, value, choices in frontier:
+            candidates.append((payment, value, choices + (None,)))
+            for index, (option_payment, option_value, _) in enumerate(plot_options):
+                total = payment + option_payment
+                if total <= budget + 1e-9:
+                    candidates.append((total, value + option_value, choices + (index,)))
+        candidates.sort(key=lambda entry: (entry[0], -entry[1]))
+        frontier = []
+        for entry in candidates:
+            if not frontier or entry[1] > frontier[-1][1] + 1e-12:
+                frontier.append(entry)
+        if len(frontier) > FRONTIER_LIMIT:
+            return None
+    return list(frontier[-1][2])
+
+
+def _upper_hull(plot_options):
+    """Indices of the options on the concave hull of (payment, value) starting at (0, 0)"""
+    hull = []
+    points = [(0.0, 0.0)]
+    for index, (payment, value, _) in enumerate(plot_options):
+        while hull:
+            (x0, y0), (x1, y1) = points[-2], points[-1]
+            # Drop the last point if it lies below the segment to the new one
+            if (y1 - y0) * (payment - x0) <= (value - y0) * (x1 - x0):
+                hull.pop()
+                points.pop()
+            else:
+                break
+        hull.append(index)
+        points.append((payment, value))
+    return hull
+
+
+def _solve_greedy(options, budget):
+    """Greedy over hull increments by value per euro, then upgrade with the leftover budget"""
+    increments = []
+    for plot_index, plot_options in enumerate(options):
+        previous_payment, previous_value = 0.0, 0.0
+        for step, index in enumerate(_upper_hull(plot_options)):
+            payment, value, _ = plot_options[index]
+            extra_payment = payment - previous_payment
+            efficiency = np.inf if extra_payment <= 0 else (value - previous_value) / extra_payment
+            increments.append((-efficiency, plot_index, step, index))
+            previous_payment, previous_value = payment, value
+    increments.sort()
+
+    choices = [None] * len(options)
+    next_step = [0] * len(options)
+    spent = 0.0
+    for _, plot_index, step, index in increments:
+        if next_step[plot_index] != step:
+            continue  # An earlier step of this plot's chain did not fit
+        current = options[plot_index][choices[plot_index]][0] if choices[plot_index] is not None else 0.0
+        extra = options[plot_index][index][0] - current
+        if spent + extra <= budget + 1e-9:
+            choices[plot_index] = index
+            next_step[plot_index] += 1
+            spent += extra
+        else:
+            next_step[plot_index] = -1
+
+    # Spend what is left on the best single upgrade until none fits
+    while True:
+        best_gain, best_move = 0.0, None
+        for plot_index, plot_options in enumerate(options):
+            current_payment, current_value = (
+                plot_options[choices[plot_index]][:2] if choices[plot_index] is not None else (0.0, 0.0)
+            )
+            for index, (payment, value, _) in enumerate(plot_options):
+                gain = value - current_value
+                if gain > best_gain + 1e-12 and spent - current_payment + payment <= budget + 1e-9:
+                    best_gain, best_move = gain, (plot_index, index, payment - current_payment)
+        if best_move is None:
+            return choices
+        plot_index, index, extra = best_move
+        choices[plot_index] = index
+        spent += extra
+
+
+def optimize_portfolio(result, budget, objective=Objective.PROFIT, allowed_crops=None, allowed_harvest_options=None):
+    """Best option per plot (None: leave unleased) under the budget"""
+    options = candidate_options(result, objective, allowed_crops, allowed_harvest_options)
+    choices = _solve_exact(options, budget) if len(options) <= EXACT_MAX_PLOTS else None
+    solver = "exact"
+    if choices is None:
+        choices = _solve_greedy(options, budget)
+        solver = "greedy"
+
+    selections = []
+    for plot_index, choice in enumerate(choices):
+        if choice is None:
+            selections.append(None)
+            continue
+        payment, value, (crop, fertilizer, harvest) = options[plot_index][choice]
+        selections.append({
+            "crop_type": CROPS[crop],
+            "fertilizer_type": FERTILIZERS[fertilizer],
+            "harvest_option": HARVEST_OPTIONS[harvest],
+            "payment_amount": payment,
+            "profit_loss": round(float(result["profit_loss"][plot_index, crop, fertilizer, harvest]), 2),
+            "objective_value": round(value, 2)
+        })
+    return selections, solver
@@ -0,0 +1,81 @@
+"""Pricing engine shared by order creation and the /api/quote endpoint.
+
+Pure and synchronous: all inputs are plain values (plot price and soil
+points, crop, fertilizer cost, machine prices, harvest option, applied
+nitrogen and cultivation method), so results can be memoized and the same
+numbers are produced whether or not an order is written.
+
+Seed costs are part of every quote and are billed with the order (the
+configurator shows them as their own line), so orders, the scenario sweep,
+the portfolio optimizer and the rotation planner share one cost model.
+"""
+from dataclasses import dataclass, asdict
+from functools import lru_cache
+from reference_data import HarvestOption, MARKET_PRICES, SEED_COSTS
+from yield_model import YIELD_MODEL
+
+SHIPPING_COST = 25.0  # Flat shipping cost for HarvestOption.SHIP_HOME (EUR)
+
+
+@dataclass(frozen=True)
+class PriceBreakdown:
+    plot_cost: float
+    machine_cost: float
+    fertilizer_cost: float
+    seed_cost: float
+    shipping_cost: float
+    total_cost: float  # All costs of the season
+    expected_yield_kg: float
+    market_price_per_ton: float
+    expected_market_value: float
+    profit_loss: float  # expected_market_value - total_cost
+    payment_amount: float  # What the customer actually pays
+    yield_model_version: str
+
+    def as_dict(self):
+        return asdict(self)
+
+
+@lru_cache(maxsize=8192)
+def quote(plot_price, soil_points, crop_type, fertilizer_cost, machine_prices, harvest_option,
+          applied_n_kg=None, cultivation_method=None, sown=True):
+    """Price one farming decision.
+
+    machine_prices is a sorted tuple of (machine_id, price_per_use) pairs, one
+    entry per selected machine, so the memoization key covers the machine set.
+    applied_n_kg=None prices the yield at the crop's full N requirement.
+    sown=False leaves out the seed (a perennial stand in a later year).
+    """
+    machine_cost = sum(price for _, price in machine_prices)
+    seed_cost = SEED_COSTS.get(crop_type, 0.0) if sown else 0.0
+
+    expected_yield = YIELD_MODEL.expected_yield(crop_type, soil_points, applied_n_kg, cultivation_method)
+    market_price_per_ton = MARKET_PRICES.get(crop_type, 0)
+    expected_market_value = (expected_yield / 1000) * market_price_per_ton  # Convert kg to tons
+
+    shipping_cost = SHIPPING_COST if harvest_option == HarvestOption.SHIP_HOME else 0
+
+    total_cost = plot_price + machine_cost + fertilizer_cost + seed_cost + shipping_cost
+    profit_loss = expected_market_value - total_cost
+
+    if harvest_option == HarvestOption.SELL_TO_FARMER:
+        # Customer pays only the net loss (if any), farmer buys the harvest
+        payment_amount = max(0, total_cost - expected_market_value)
+    else:
+        # Customer pays all costs and keeps the harvest
+        payment_amount = total_cost
+
+    return PriceBreakdown(
+        plot_cost=plot_price,
+        machine_cost=machine_cost,
+        fertilizer_cost=fertilizer_cost,
+        seed_cost=seed_cost,
+        shipping_cost=shipping_cost,
+        total_cost=total_cost,
+        expected_yield_kg=expected_yield,
+        market_price_per_ton=market_price_per_ton,
+        expected_market_value=expected_market_value,
+        profit_loss=profit_loss,
+        payment_amount=payment_amount,
+        yield_model_version=YIELD_MODEL.version
+    )
@@ -0,0 +1,78 @@
+"""Import-time report for the API server.
+
+Imports server.py in a fresh interpreter with `python -X importtime` and
+lists the modules with the largest cumulative import time, i.e. what a cold
+worker spends before it can serve anything:
+
+    cd backend
+    python profile_startup.py --top 25
+
+The server is imported with DATA_BACKEND=memory unless DATA_BACKEND is set,
+so no database is needed; the import itself does no I/O either way.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+import typer
+
+app = typer.Typer(add_completion=False)
+
+
+def parse_importtime(output):
+    """(module, self_us, cumulative_us, depth) for every line of -X importtime output"""
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return modules
+
+
+def profile_import(module="server"):
+    env = dict(os.environ)
+    env.setdefault("DATA_BACKEND", "memory")
+    env.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    env.setdefault("DB_NAME", "profile")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=Path(__file__).parent,
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return parse_importtime(result.stderr)
+
+
+@app.command()
+def main(
+    top: int = typer.Option(25, min=1, help="Number of modules to list"),
+    max_depth: int = typer.Option(1, min=1, help="Only list modules imported at most this deep"),
+    module: str = typer.Option("server", help="Module to import")
+):
+    modules = profile_import(module)
+    # Children are printed before their parent; keep only the subtree of the module itself
+    end = max(index for index, entry in enumerate(modules) if entry[0] == module and entry[3] == 0)
+    start = end
+    while start > 0 and modules[start - 1][3] > 0:
+        start -= 1
+    total_us = modules[end][2]
+    modules = modules[start:end]
+    typer.echo(f"{module}: {total_us / 1000:.1f} ms total import time")
+    typer.echo(f"{'module':<40} {'cumulative':>10} {'self':>8} {'share':>6}")
+    listed = sorted(
+        (entry for entry in modules if entry[3] <= max_depth),
+        key=lambda entry: -entry[2]
+    )
+    for name, self_us, cumulative_us, _ in listed[:top]:
+        typer.echo(
+            f"{name:<40} {cumulative_us / 1000:>8.1f} ms {self_us / 1000:>5.1f} ms {cumulative_us / total_us:>6.1%}"
+        )
+
+
+if __name__ == "__main__":
+    app()
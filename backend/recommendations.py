@@ -0,0 +1,119 @@
+"""Precomputed "best crop" hints per plot.
+
+Rankings come from the scenario sweep and are kept in memory together with
+what they were computed from: a fingerprint of the reference price tables
+and the machines, and each plot's soil points and price. Only those inputs
+change a ranking. A refresh recomputes the plots whose inputs changed (all of
+them if the tables or machines did) and is a no-op otherwise, so writes that
+touch other fields, like reserving a plot, cost no sweep.
+
+The rankings are not persisted: they follow deterministically from the
+catalog, the sweep takes milliseconds even for thousands of plots, and with
+a preloaded catalog snapshot the gunicorn master computes them once for all
+workers.
+"""
+import hashlib
+import json
+from datetime import datetime
+import numpy as np
+from reference_data import MARKET_PRICES, SEED_COSTS, N_REQUIREMENTS, FERTILIZER_SPECS, BASE_YIELDS_250M2
+from scenarios import CROPS, FERTILIZERS, HARVEST_OPTIONS, SweepTables, sweep
+
+TOP_CROPS = 3
+
+
+def plot_inputs(plot):
+    """The fields of a plot its ranking depends on"""
+    return (plot["soil_points"], plot["price_per_plot"])
+
+
+def tables_fingerprint(machines):
+    """Fingerprint of the reference tables and the machine fields the sweep reads"""
+    payload = {
+        "tables": [MARKET_PRICES, SEED_COSTS, N_REQUIREMENTS, FERTILIZER_SPECS, BASE_YIELDS_250M2],
+        "machines": sorted(
+            (
+                machine["id"],
+                machine["price_per_use"],
+                machine["working_step"],
+                machine.get("fertilizer_type") or "",
+                sorted(machine["suitable_for"])
+            )
+            for machine in machines
+        )
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.sha1(encoded).hexdigest()
+
+
+def best_crops(result, top=TOP_CROPS):
+    """Top feasible crops per plot, each with its most profitable fertilizer and harvest option"""
+    profit = np.where(result["feasible"], result["profit_loss"], -np.inf)
+    plots, crops, fertilizers, harvest_options = profit.shape
+    per_crop = profit.reshape(plots, crops, fertilizers * harvest_options)
+    best_option = per_crop.argmax(axis=2)
+    best_profit = per_crop.max(axis=2)
+    top_crops = np.argsort(-best_profit, axis=1, kind="stable")[:, :top]
+
+    hints = []
+    for plot_index in range(plots):
+        plot_hints = []
+        for crop in top_crops[plot_index]:
+            if not np.isfinite(best_profit[plot_index, crop]):
+                break  # Only crops the sweep marks infeasible are left
+            fertilizer, harvest = divmod(int(best_option[plot_index, crop]), harvest_options)
+            plot_hints.append({
+                "crop_type": CROPS[crop],
+                "fertilizer_type": FERTILIZERS[fertilizer],
+                "harvest_option": HARVEST_OPTIONS[harvest],
+                "profit_loss": round(float(best_profit[plot_index, crop]), 2),
+                "payment_amount": round(float(result["payment_amount"][plot_index, crop, fertilizer, harvest]), 2)
+            })
+        hints.append(plot_hints)
+    return hints
+
+
+class CropRecommendationCache:
+    def __init__(self):
+        self.fingerprint = None  # tables_fingerprint the rankings were computed with
+        self.tables = None
+        self.inputs = {}  # Plot id -> plot_inputs its ranking was computed with
+        self.computed_at = None
+        self.by_plot = {}
+
+    def get(self, plot_id):
+        return self.by_plot.get(plot_id, [])
+
+    def refresh(self, plots, machines):
+        """Bring the rankings in line with the whole catalog; returns the number of plots recomputed"""
+        fingerprint = tables_fingerprint(machines)
+        if fingerprint != self.fingerprint:
+            self.fingerprint = fingerprint
+            self.tables = SweepTables(machines)
+            self.inputs = {}
+        current = {plot["id"] for plot in plots}
+        return self.update_plots(plots, removed=[plot_id for plot_id in self.inputs if plot_id not in current])
+
+    def update_plots(self, plots, removed=()):
+        """Recompute the plots whose soil points or price changed; returns how many were recomputed.
+
+        Needs a refresh() first, for the machines.
+        """
+        by_plot = dict(self.by_plot)
+        for plot_id in removed:
+            self.inputs.pop(plot_id, None)
+            by_plot.pop(plot_id, None)
+        changed = [plot for plot in plots if self.inputs.get(plot["id"]) != plot_inputs(plot)]
+        if changed:
+            result = sweep(
+                self.tables,
+                [plot["price_per_plot"] for plot in changed],
+                [plot["soil_points"] for plot in changed]
+            )
+            for plot, hints in zip(changed, best_crops(result)):
+                by_plot[plot["id"]] = hints
+                self.inputs[plot["id"]] = plot_inputs(plot)
+            self.computed_at = datetime.utcnow()
+        # Machines changed: rankings of plots not passed in are stale, drop them
+        self.by_plot = {plot_id: hints for plot_id, hints in by_plot.items() if plot_id in self.inputs}
+        return len(changed)
@@ -0,0 +1,357 @@
+"""Reference data for the farming simulator: enums, market prices, yields,
+seed and fertilizer specs and nitrogen requirements.
+
+Kept free of I/O and framework imports so the pricing and planning engines
+can use it without importing the API module.
+"""
+from enum import Enum
+
+# Enums for farming choices
+class SoilType(str, Enum):
+    SAND = "sand"
+    LOAMY_SAND = "loamy_sand"
+    CLAYEY_SAND = "clayey_sand"
+    SANDY_LOAM = "sandy_loam"
+
+class CropType(str, Enum):
+    WINTERROGGEN = "winterroggen"
+    WINTERWEIZEN = "winterweizen"
+    WINTERGERSTE = "wintergerste"
+    WINTERTRITICALE = "wintertriticale"
+    WINTERRAPS = "winterraps"
+    KHORASAN_WEIZEN = "khorasan_weizen"  # Sommerweizen, wenig Ertrag, teuer, viel Protein
+    SILOMAIS = "silomais"
+    ZUCKERRUEBEN = "zuckerrueben"
+    LUZERNE = "luzerne"
+    GRAS = "gras"
+    BLUEHMISCHUNG = "bluehmischung"
+    ERBSEN = "erbsen"
+
+class FertilizerType(str, Enum):
+    SSA = "ssa"  # Schwefelsaurer Ammoniak
+    KAS = "kas"  # Kalkammonsalpeter
+    SCHWEINEGULLE = "schweinegulle"
+    RINDERGUELLE = "rinderguelle"
+    GAERREST = "gaerrest"
+    RINDERMIST = "rindermist"
+    KEINE_DUENGUNG = "keine_duengung"
+
+class CultivationMethod(str, Enum):
+    KONVENTIONELL = "konventionell"
+    BIOLOGISCH = "biologisch"
+
+class MachineType(str, Enum):
+    TRAKTOR = "traktor"
+    TRAKTOR_AUSSAAT = "traktor_aussaat"
+    TRAKTOR_DUENGUNG = "traktor_duengung"
+    TRAKTOR_PFLANZENSCHUTZ = "traktor_pflanzenschutz"
+    PFLUG = "pflug"
+    GRUBBER = "grubber"
+    SCHEIBENEGGE = "scheibenegge"
+    SAEMASCHINE = "saemaschine"
+    MAEHDRESCHER = "maehdrescher"
+    FELDSPRITZE = "feldspritze"
+    GUELLEFASS = "guellefass"
+    MISTSTREUER = "miststreuer"
+    HACKE = "hacke"
+    STRIEGEL = "striegel"
+    CAMBRIDGE_WALZE = "cambridge_walze"
+    MAIS_HAECKSLER = "mais_haecksler"
+    GRAS_HAECKSLER = "gras_haecksler"
+
+class WorkingStep(str, Enum):
+    BODENBEARBEITUNG = "bodenbearbeitung"
+    AUSSAAT = "aussaat"
+    PFLANZENSCHUTZ = "pflanzenschutz"
+    DUENGUNG = "duengung"
+    PFLEGE = "pflege"
+    ERNTE = "ernte"
+
+class OrderStatus(str, Enum):
+    PENDING = "pending"
+    CONFIRMED = "confirmed"
+    IMPLEMENTING = "implementing"
+    GROWING = "growing"
+    HARVEST_READY = "harvest_ready"
+    COMPLETED = "completed"
+
+class PaymentStatus(str, Enum):
+    PENDING = "pending"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class HarvestOption(str, Enum):
+    SHIP_HOME = "ship_home"
+    SELL_TO_FARMER = "sell_to_farmer"
+
+# Machine data organized by working steps
+# Machine data has been moved to initialize_sample_data function
+MACHINE_DATA = {}
+
+# Market prices per ton (in EUR) - updated with real prices
+MARKET_PRICES = {
+    CropType.WINTERWEIZEN: 220.0,  # 0.22€/kg = 220€/t
+    CropType.WINTERROGGEN: 180.0,  # 0.18€/kg = 180€/t
+    CropType.WINTERGERSTE: 190.0,  # 0.19€/kg = 190€/t
+    CropType.WINTERTRITICALE: 170.0,  # 0.17€/kg = 170€/t
+    CropType.WINTERRAPS: 450.0,  # 0.45€/kg = 450€/t
+    CropType.KHORASAN_WEIZEN: 1500.0,  # 1.5€/kg = 1500€/t (sehr teuer, viel Protein)
+    CropType.SILOMAIS: 35.0,  # 0.035€/kg = 35€/t
+    CropType.ZUCKERRUEBEN: 45.0,  # 0.045€/kg = 45€/t
+    CropType.LUZERNE: 150.0,  # 0.15€/kg = 150€/t
+    CropType.GRAS: 120.0,  # 0.12€/kg = 120€/t
+    CropType.BLUEHMISCHUNG: 0,  # Subsidized, no market price
+    CropType.ERBSEN: 250.0  # 0.25€/kg = 250€/t
+}
+
+# Real yields per 250m² based on Grabow location (in kg)
+REAL_YIELDS_250M2 = {
+    CropType.WINTERWEIZEN: 125.0,      # 5 t/ha × 0.025 = 125 kg
+    CropType.WINTERROGGEN: 75.0,       # 3 t/ha × 0.025 = 75 kg
+    CropType.WINTERGERSTE: 100.0,      # 4 t/ha × 0.025 = 100 kg
+    CropType.WINTERTRITICALE: 100.0,   # 4 t/ha × 0.025 = 100 kg
+    CropType.SILOMAIS: 1200.0,   # Keeping existing estimate
+    CropType.ZUCKERRUEBEN: 1500.0, # 60 t/ha × 0.025 = 1500 kg
+    CropType.LUZERNE: 150.0,     # 6 t/ha × 0.025 = 150 kg
+    CropType.GRAS: 200.0,        # 8 t/ha × 0.025 = 200 kg
+    CropType.BLUEHMISCHUNG: 0.0, # No harvest - only subsidy
+    CropType.ERBSEN: 50.0        # 2 t/ha × 0.025 = 50 kg
+}
+
+# Market values per 250m² plot (in EUR)
+MARKET_VALUES_250M2 = {
+    CropType.WINTERWEIZEN: 21.25,      # 125 kg × 170€/t = 21.25€
+    CropType.WINTERROGGEN: 11.63,      # 75 kg × 155€/t = 11.63€
+    CropType.WINTERGERSTE: 15.00,      # 100 kg × 150€/t = 15.00€
+    CropType.WINTERTRITICALE: 16.50,   # 100 kg × 165€/t = 16.50€
+    CropType.WINTERRAPS: 22.50,        # 50 kg × 450€/t = 22.50€
+    CropType.KHORASAN_WEIZEN: 18.75,   # Durchschnitt: 12.5-37.5 kg, 1500€/t = 18.75€-56.25€
+    CropType.SILOMAIS: 54.00,    # 1200 kg × 45€/t = 54.00€
+    CropType.ZUCKERRUEBEN: 60.00, # 1500 kg × 40€/t = 60.00€
+    CropType.LUZERNE: 27.00,     # 150 kg × 180€/t = 27.00€
+    CropType.GRAS: 24.00,        # 200 kg × 120€/t = 24.00€
+    CropType.BLUEHMISCHUNG: 17.50, # 700€/ha × 0.025 = 17.50€
+    CropType.ERBSEN: 12.50       # 50 kg × 250€/t = 12.50€
+}
+
+# Expected yield per 250m² (in kg) - varies by soil points
+# Base yields at 35 soil points, adjusted by soil quality
+BASE_YIELDS_250M2 = {
+    CropType.WINTERWEIZEN: 125.0,      # 5 t/ha × 0.025 = 125 kg at 35 soil points
+    CropType.WINTERROGGEN: 75.0,       # 3 t/ha × 0.025 = 75 kg at 35 soil points
+    CropType.WINTERGERSTE: 100.0,      # 4 t/ha × 0.025 = 100 kg at 35 soil points
+    CropType.WINTERTRITICALE: 100.0,   # 4 t/ha × 0.025 = 100 kg at 35 soil points
+    CropType.WINTERRAPS: 50.0,   # 2 t/ha × 0.025 = 50 kg at 35 soil points  
+    CropType.KHORASAN_WEIZEN: 12.5,   # 0.5 t/ha × 0.025 = 12.5 kg at 35 soil points (schlechteste)  
+    CropType.SILOMAIS: 1200.0,   # 48 t/ha × 0.025 = 1200 kg at 35 soil points
+    CropType.ZUCKERRUEBEN: 1500.0, # 60 t/ha × 0.025 = 1500 kg at 35 soil points
+    CropType.LUZERNE: 150.0,     # 6 t/ha × 0.025 = 150 kg at 35 soil points
+    CropType.GRAS: 200.0,        # 8 t/ha × 0.025 = 200 kg at 35 soil points
+    CropType.BLUEHMISCHUNG: 0.0, # No harvest
+    CropType.ERBSEN: 57.5        # 2.3 t/ha × 0.025 = 57.5 kg at 35 soil points (15% erhöht)
+}
+
+# Yield factor by soil points, piecewise linear: (from soil points, factor there, slope per point).
+# Each segment holds above its start (the first one also below it).
+SOIL_QUALITY_SEGMENTS = (
+    (25, 0.8, 0.02),   # Linear scale from 0.8 to 1.2
+    (45, 1.2, 0.027)   # Premium soils: 45-56 points = 1.2x to 1.5x
+)
+
+def soil_quality_factor(soil_points: int):
+    """Yield factor for soil points: 25 = 0.8x, 35 = 1.0x, 45 = 1.2x, 56 = 1.5x"""
+    start, factor, slope = SOIL_QUALITY_SEGMENTS[0]
+    for segment in SOIL_QUALITY_SEGMENTS[1:]:
+        if soil_points <= segment[0]:
+            break
+        start, factor, slope = segment
+    return factor + (soil_points - start) * slope
+
+def calculate_yield_by_soil_points(crop_type: CropType, soil_points: int):
+    """Calculate expected yield based on soil points (25-56 range)"""
+    base_yield = BASE_YIELDS_250M2.get(crop_type, 0)
+    if base_yield == 0:
+        return 0
+    
+    return round(base_yield * soil_quality_factor(soil_points), 1)
+
+EXPECTED_YIELDS = {
+    CropType.WINTERWEIZEN: 125.0,
+    CropType.WINTERROGGEN: 75.0,
+    CropType.WINTERGERSTE: 100.0,
+    CropType.WINTERTRITICALE: 100.0,
+    CropType.WINTERRAPS: 50.0,   # 2 t/ha × 0.025 = 50 kg per 250m²
+    CropType.KHORASAN_WEIZEN: 12.5,  # 0.5 t/ha × 0.025 = 12.5 kg at 35 soil points (schlechteste Parzelle)
+    CropType.SILOMAIS: 1200.0,
+    CropType.ZUCKERRUEBEN: 1500.0,
+    CropType.LUZERNE: 150.0,
+    CropType.GRAS: 200.0,
+    CropType.BLUEHMISCHUNG: 0.0,  # No harvest
+    CropType.ERBSEN: 57.5         # Erhöht um 15%: 50 * 1.15 = 57.5
+}
+
+# Seed costs per 250m² (in EUR)
+SEED_COSTS = {
+    CropType.WINTERWEIZEN: 2.10,  # 150kg/ha * 0.025ha * 0.56€/kg = 2.10€
+    CropType.WINTERROGGEN: 1.75,
+    CropType.WINTERGERSTE: 1.90,
+    CropType.WINTERTRITICALE: 1.85,
+    CropType.SILOMAIS: 12.50,
+    CropType.ZUCKERRUEBEN: 35.00,
+    CropType.LUZERNE: 8.75,
+    CropType.GRAS: 3.25,
+    CropType.BLUEHMISCHUNG: 15.00,
+    CropType.ERBSEN: 6.25
+}
+
+# Fertilizer specifications (updated with realistic mineral fertilizer calculations)
+FERTILIZER_SPECS = {
+    # Mineralische Düngung
+    FertilizerType.SSA: {
+        "name": "Schwefelsaurer Ammoniak (SSA)",
+        "n_content": 21,  # kg N in 100 kg SSA
+        "s_content": 24,  # % Schwefel
+        "price_per_ton": 350.0,  # EUR/t
+        "organic": False,
+        "category": "mineral"
+    },
+    FertilizerType.KAS: {
+        "name": "Kalkammonsalpeter (KAS)",
+        "n_content": 27,  # kg N in 100 kg KAS
+        "s_content": 0,
+        "price_per_ton": 300.0,  # EUR/t
+        "organic": False,
+        "category": "mineral"
+    },
+    # Organische Düngung
+    FertilizerType.SCHWEINEGULLE: {
+        "name": "Schweinegülle",
+        "n_content": 0.4,  # % Stickstoff (4 kg N/m³)
+        "s_content": 0,
+        "price_per_m3": 8.50,  # EUR/m³
+        "organic": True,
+        "category": "organic"
+    },
+    FertilizerType.RINDERGUELLE: {
+        "name": "Rindergülle",
+        "n_content": 0.35,  # % Stickstoff (3.5 kg N/m³)
+        "s_content": 0,
+        "price_per_m3": 7.80,  # EUR/m³
+        "organic": True,
+        "category": "organic"
+    },
+    FertilizerType.GAERREST: {
+        "name": "Gärrest (Biogasanlage)",
+        "n_content": 0.45,  # % Stickstoff (4.5 kg N/m³)
+        "s_content": 0,
+        "price_per_m3": 9.20,  # EUR/m³
+        "organic": True,
+        "category": "organic"
+    },
+    FertilizerType.RINDERMIST: {
+        "name": "Rindermist",
+        "n_content": 0.5,  # % Stickstoff (5 kg N/t)
+        "s_content": 0,
+        "price_per_m3": 15.00,  # EUR/m³ (umgerechnet von Tonnen)
+        "organic": True,
+        "category": "organic"
+    },
+    FertilizerType.KEINE_DUENGUNG: {
+        "name": "Ohne Düngung",
+        "n_content": 0,
+        "s_content": 0,
+        "price_per_unit": 0.00,  # EUR
+        "organic": False,
+        "category": "none"
+    }
+}
+
+# Maximum amount per product and 250m² plot, in the product's unit
+# (kg mineral, m³ organic) - about 40 m³/ha slurry and 600-800 kg/ha mineral
+FERTILIZER_MAX_AMOUNTS_250M2 = {
+    FertilizerType.SSA: 15.0,
+    FertilizerType.KAS: 20.0,
+    FertilizerType.SCHWEINEGULLE: 1.0,
+    FertilizerType.RINDERGUELLE: 1.0,
+    FertilizerType.GAERREST: 1.0,
+    FertilizerType.RINDERMIST: 1.0
+}
+
+# Plant protection costs (35€/ha = 0.875€ per 250m²)
+PLANT_PROTECTION_COST_PER_250M2 = 0.88  # EUR per treatment
+
+# Year-to-year variability (coefficient of variation) used for risk simulation
+YIELD_CV = {
+    CropType.WINTERWEIZEN: 0.15,
+    CropType.WINTERROGGEN: 0.18,
+    CropType.WINTERGERSTE: 0.16,
+    CropType.WINTERTRITICALE: 0.17,
+    CropType.WINTERRAPS: 0.25,   # Frost, Erdfloh, Rapsglanzkäfer
+    CropType.KHORASAN_WEIZEN: 0.35,
+    CropType.SILOMAIS: 0.20,     # Trockenheit auf Sandböden
+    CropType.ZUCKERRUEBEN: 0.15,
+    CropType.LUZERNE: 0.20,
+    CropType.GRAS: 0.20,
+    CropType.BLUEHMISCHUNG: 0.0,
+    CropType.ERBSEN: 0.30
+}
+
+PRICE_CV = {
+    CropType.WINTERWEIZEN: 0.20,
+    CropType.WINTERROGGEN: 0.22,
+    CropType.WINTERGERSTE: 0.20,
+    CropType.WINTERTRITICALE: 0.22,
+    CropType.WINTERRAPS: 0.18,
+    CropType.KHORASAN_WEIZEN: 0.25,
+    CropType.SILOMAIS: 0.10,     # Mostly contract prices
+    CropType.ZUCKERRUEBEN: 0.10,
+    CropType.LUZERNE: 0.15,
+    CropType.GRAS: 0.15,
+    CropType.BLUEHMISCHUNG: 0.0,
+    CropType.ERBSEN: 0.20
+}
+
+# Nitrogen requirements per crop (kg N per ton of expected yield)
+N_REQUIREMENTS = {
+    CropType.WINTERWEIZEN: 23.0,  # kg N/t Ertrag
+    CropType.WINTERROGGEN: 20.0,
+    CropType.WINTERGERSTE: 18.0,
+    CropType.WINTERTRITICALE: 21.0,
+    CropType.SILOMAIS: 2.8,   # kg N/t Frischmasse
+    CropType.ZUCKERRUEBEN: 1.8,
+    CropType.LUZERNE: 0.0,    # Leguminose - bindet selbst Stickstoff
+    CropType.GRAS: 15.0,
+    CropType.BLUEHMISCHUNG: 8.0,
+    CropType.ERBSEN: 0.0      # Leguminose - bindet selbst Stickstoff
+}
+
+# Crop rotation rules
+CEREAL_CROPS = {
+    CropType.WINTERWEIZEN, CropType.WINTERROGGEN, CropType.WINTERGERSTE,
+    CropType.WINTERTRITICALE, CropType.KHORASAN_WEIZEN
+}
+MAX_CONSECUTIVE_CEREALS = 2
+
+# Minimum number of years with other crops before a crop returns (Anbaupause)
+ROTATION_BREAK_YEARS = {
+    CropType.WINTERWEIZEN: 1,
+    CropType.WINTERGERSTE: 1,
+    CropType.WINTERTRITICALE: 1,
+    CropType.KHORASAN_WEIZEN: 1,
+    CropType.WINTERRAPS: 3,      # Kohlhernie
+    CropType.ZUCKERRUEBEN: 3,    # Nematoden
+    CropType.LUZERNE: 4,
+    CropType.ERBSEN: 5           # Leguminosenmüdigkeit
+}
+
+# Perennial crops may stand for several years without being sown again
+MAX_STAND_YEARS = {
+    CropType.LUZERNE: 3,
+    CropType.GRAS: 3
+}
+
+# Nitrogen left for the following crop after legumes (kg N/ha)
+LEGUME_N_CREDIT_KG_HA = {
+    CropType.ERBSEN: 30.0,
+    CropType.LUZERNE: 60.0
+}
@@ -0,0 +1,706 @@
+"""Data access layer.
+
+Handlers talk to one repository per collection (plots, machines, orders,
+advisories, advisory_rules) instead of the Motor database. Every repository
+offers the same async interface in two implementations:
+
+- MotorRepository: a thin wrapper around a Motor collection.
+- MemoryRepository: documents kept in a dict keyed by "id", for tests and
+  microbenchmarks without a MongoDB server.
+
+Filters, projections and updates use the MongoDB syntax, restricted to what
+the in-memory backend understands: equality on (dotted) fields, $in, $nin,
+$ne, $exists, $type "string", $gt/$gte/$lt/$lte; inclusion or exclusion
+projections; $set and $unset.
+
+CachedRepository, BatchedRepository and NotifyingRepository wrap any
+repository with the same interface: the first memoizes reads until the
+documents they depend on change, the second coalesces concurrent get()
+calls into one get_many() round-trip, the third reports writes to the
+invalidation bus (see invalidation.py). build_repositories() assembles the
+layers from configuration.
+"""
+import asyncio
+import copy
+import json
+import operator
+import time
+from datetime import datetime, timedelta
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from events import EVENT_RETENTION_SECONDS
+from seeding import seed_collection
+
+COLLECTIONS = ("plots", "machines", "orders", "advisories", "advisory_rules")
+# Unique keys besides id the memory backend enforces (see MotorRepositories.ensure_indexes)
+MEMORY_UNIQUE_KEYS = {"advisories": [("rule_id", "rule_window", "order_id")]}
+DUPLICATE_KEY = 11000
+
+
+def _projection(fields):
+    projection = {"_id": 0}
+    projection.update(fields or {})
+    return projection
+
+
+class MotorRepository:
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def get(self, document_id, fields=None):
+        return await self.collection.find_one({"id": document_id}, _projection(fields))
+
+    async def get_many(self, document_ids, fields=None):
+        return await self.find({"id": {"$in": list(document_ids)}}, fields)
+
+    async def find(self, filter=None, fields=None, sort=None, skip=0, limit=None):
+        cursor = self.collection.find(filter or {}, _projection(fields))
+        if sort:
+            cursor = cursor.sort(sort)
+        if skip:
+            cursor = cursor.skip(skip)
+        if limit:
+            cursor = cursor.limit(limit)
+        return await cursor.to_list(limit)
+
+    async def iterate(self, filter=None, fields=None):
+        async for document in self.collection.find(filter or {}, _projection(fields)):
+            yield document
+
+    async def count(self, filter=None):
+        return await self.collection.count_documents(filter or {})
+
+    async def distinct(self, field, filter=None):
+        return await self.collection.distinct(field, filter or {})
+
+    async def insert(self, document, session=None):
+        await self.collection.insert_one(dict(document), session=session)
+
+    async def insert_many(self, documents, session=None, ignore_duplicates=False):
+        """Insert documents; with ignore_duplicates, documents violating a unique index are skipped.
+
+        Returns the ids of the skipped documents.
+        """
+        if not documents:
+            return set()
+        try:
+            await self.collection.insert_many([dict(document) for document in documents], ordered=False, session=session)
+        except BulkWriteError as e:
+            errors = e.details["writeErrors"]
+            if not ignore_duplicates or any(error["code"] != DUPLICATE_KEY for error in errors):
+                raise
+            return {documents[error["index"]]["id"] for error in errors}
+        return set()
+
+    async def update(self, document_id, set=None, unset=None, return_document=False):
+        """Update one document; returns the updated document or whether it existed"""
+        update = {}
+        if set:
+            update["$set"] = set
+        if unset:
+            update["$unset"] = {field: "" for field in unset}
+        if return_document:
+            return await self.collection.find_one_and_update(
+                {"id": document_id}, update, projection={"_id": 0}, return_document=ReturnDocument.AFTER
+            )
+        result = await self.collection.update_one({"id": document_id}, update)
+        return result.matched_count > 0
+
+    async def update_where(self, filter, set=None, unset=None, session=None):
+        """Update all matching documents; returns the number modified"""
+        update = {}
+        if set:
+            update["$set"] = set
+        if unset:
+            update["$unset"] = {field: "" for field in unset}
+        result = await self.collection.update_many(filter, update, session=session)
+        return result.modified_count
+
+    async def delete(self, document_id):
+        result = await self.collection.delete_one({"id": document_id})
+        return result.deleted_count > 0
+
+    async def delete_where(self, filter=None):
+        result = await self.collection.delete_many(filter or {})
+        return result.deleted_count
+
+    async def seed(self, documents, insert_only=(), prune=True):
+        return await seed_collection(self.collection, documents, insert_only, prune)
+
+
+def _get_path(document, path):
+    """Values at a dotted path (list indices allowed); a missing path yields no value"""
+    value = document
+    for part in path.split("."):
+        if isinstance(value, dict) and part in value:
+            value = value[part]
+        elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        else:
+            return False, None
+    return True, value
+
+
+RANGE_OPERATORS = {"$gt": operator.gt, "$gte": operator.ge, "$lt": operator.lt, "$lte": operator.le}
+
+
+def _sort_key(value):
+    """MongoDB's order across types: null (and missing) first, then numbers, strings, objects, booleans, dates"""
+    if value is None:
+        return (0, 0)
+    if isinstance(value, bool):
+        return (8, value)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    if isinstance(value, datetime):
+        return (9, value)
+    return (3, json.dumps(value, sort_keys=True, default=str))
+
+
+def _compare(exists, value, condition):
+    if not isinstance(condition, dict) or not any(key.startswith("$") for key in condition):
+        return exists and (value == condition or (isinstance(value, list) and condition in value))
+    for name, operand in condition.items():
+        if name == "$in":
+            matched = exists and (value in operand or (isinstance(value, list) and any(item in operand for item in value)))
+        elif name == "$nin":
+            matched = not _compare(exists, value, {"$in": operand})
+        elif name == "$ne":
+            matched = not _compare(exists, value, operand)
+        elif name == "$exists":
+            matched = exists == bool(operand)
+        elif name == "$type":
+            if operand == "string":
+                matched = exists and isinstance(value, str)
+            elif operand == "number":
+                matched = exists and isinstance(value, (int, float)) and not isinstance(value, bool)
+            else:
+                raise ValueError(f"Unsupported $type {operand!r}")
+        elif name in RANGE_OPERATORS:
+            # Like MongoDB, only values of the operand's type match; missing counts as null
+            value_type, value_key = _sort_key(value)
+            operand_type, operand_key = _sort_key(operand)
+            matched = value_type == operand_type and RANGE_OPERATORS[name](value_key, operand_key)
+        else:
+            raise ValueError(f"Unsupported operator {name}")
+        if not matched:
+            return False
+    return True
+
+
+def matches(document, filter):
+    return all(_compare(*_get_path(document, path), condition) for path, condition in (filter or {}).items())
+
+
+def project(document, fields):
+    """Apply an inclusion or exclusion projection (fields without _id)"""
+    fields = {key: value for key, value in (fields or {}).items() if key != "_id"}
+    if not fields:
+        return copy.deepcopy(document)
+    if all(not value for value in fields.values()):
+        result = copy.deepcopy(document)
+        for path in fields:
+            *parents, last = path.split(".")
+            target = result
+            for part in parents:
+                target = target.get(part) if isinstance(target, dict) else None
+            if isinstance(target, dict):
+                target.pop(last, None)
+        return result
+    result = {}
+    for path in fields:
+        exists, value = _get_path(document, path)
+        if not exists:
+            continue
+        *parents, last = path.split(".")
+        target = result
+        for part in parents:
+            target = target.setdefault(part, {})
+        target[last] = copy.deepcopy(value)
+    return result
+
+
+def _set_path(document, path, value):
+    *parents, last = path.split(".")
+    for part in parents:
+        document = document.setdefault(part, {})
+    document[last] = value
+
+
+def _unset_path(document, path):
+    *parents, last = path.split(".")
+    for part in parents:
+        document = document.get(part)
+        if not isinstance(document, dict):
+            return
+    document.pop(last, None)
+
+
+def _key_values(document, fields):
+    """Values of a unique key, or None if a field is missing (not indexed, like a partial index)"""
+    values = tuple(_get_path(document, field)[1] for field in fields)
+    return None if any(value is None for value in values) else values
+
+
+class MemoryRepository:
+    """Documents in insertion order, keyed by id; results are copies.
+
+    unique lists further unique keys as field tuples, the counterpart of the
+    unique partial indexes MotorRepositories.ensure_indexes creates.
+    """
+
+    def __init__(self, unique=()):
+        self.documents = {}
+        self.unique = {fields: {} for fields in unique}  # Key fields -> {values: id}
+
+    def _key_taken(self, document):
+        """Whether one of the document's unique keys belongs to another document"""
+        for fields, index in self.unique.items():
+            values = _key_values(document, fields)
+            if values is not None and index.get(values, document["id"]) != document["id"]:
+                return True
+        return False
+
+    def _duplicate(self, document):
+        return document["id"] in self.documents or self._key_taken(document)
+
+    def _index(self, document, add=True):
+        for fields, index in self.unique.items():
+            values = _key_values(document, fields)
+            if values is not None:
+                if add:
+                    index[values] = document["id"]
+                else:
+                    index.pop(values, None)
+
+    async def get(self, document_id, fields=None):
+        document = self.documents.get(document_id)
+        return None if document is None else project(document, fields)
+
+    async def get_many(self, document_ids, fields=None):
+        return await self.find({"id": {"$in": list(document_ids)}}, fields)
+
+    async def find(self, filter=None, fields=None, sort=None, skip=0, limit=None):
+        if filter and set(filter) == {"id"} and not isinstance(filter["id"], dict):
+            found = [self.documents[filter["id"]]] if filter["id"] in self.documents else []
+        else:
+            found = [document for document in self.documents.values() if matches(document, filter)]
+        for field, direction in reversed(sort or []):
+            found.sort(key=lambda document: _sort_key(_get_path(document, field)[1]), reverse=direction == DESCENDING)
+        found = found[skip:]
+        if limit:
+            found = found[:limit]
+        return [project(document, fields) for document in found]
+
+    async def iterate(self, filter=None, fields=None):
+        for document in await self.find(filter, fields):
+            yield document
+
+    async def count(self, filter=None):
+        return sum(1 for document in self.documents.values() if matches(document, filter))
+
+    async def distinct(self, field, filter=None):
+        values = []
+        for document in self.documents.values():
+            exists, value = _get_path(document, field)
+            if exists and matches(document, filter) and value not in values:
+                values.append(value)
+        return values
+
+    async def insert(self, document, session=None):
+        if self._duplicate(document):
+            raise ValueError(f"Duplicate key for {document['id']}")
+        self.documents[document["id"]] = copy.deepcopy(dict(document))
+        self._index(document)
+
+    async def insert_many(self, documents, session=None, ignore_duplicates=False):
+        skipped = set()
+        for document in documents:
+            if ignore_duplicates and self._duplicate(document):
+                skipped.add(document["id"])
+            else:
+                await self.insert(document)
+        return skipped
+
+    def _apply(self, document, set=None, unset=None):
+        before = copy.deepcopy(document)
+        for path, value in (set or {}).items():
+            _set_path(document, path, copy.deepcopy(value))
+        for path in unset or ():
+            _unset_path(document, path)
+        if self.unique and document != before:
+            self._index(before, add=False)
+            if self._key_taken(document):
+                document.clear()
+                document.update(before)
+                self._index(document)
+                raise ValueError(f"Duplicate key for {document['id']}")
+            self._index(document)
+        return document != before
+
+    async def update(self, document_id, set=None, unset=None, return_document=False):
+        document = self.documents.get(document_id)
+        if document is not None:
+            self._apply(document, set, unset)
+        if return_document:
+            return None if document is None else copy.deepcopy(document)
+        return document is not None
+
+    async def update_where(self, filter, set=None, unset=None, session=None):
+        return sum(
+            self._apply(document, set, unset)
+            for document in self.documents.values()
+            if matches(document, filter)
+        )
+
+    async def delete(self, document_id):
+        document = self.documents.pop(document_id, None)
+        if document is not None:
+            self._index(document, add=False)
+        return document is not None
+
+    async def delete_where(self, filter=None):
+        doomed = [document_id for document_id, document in self.documents.items() if matches(document, filter)]
+        for document_id in doomed:
+            self._index(self.documents.pop(document_id), add=False)
+        return len(doomed)
+
+    async def seed(self, documents, insert_only=(), prune=True):
+        started = time.perf_counter()
+        ids = {document["id"] for document in documents}
+        deleted = await self.delete_where({"id": {"$nin": list(ids)}}) if prune else 0
+        inserted = modified = 0
+        for document in documents:
+            current = self.documents.get(document["id"])
+            if current is None:
+                await self.insert(document)
+                inserted += 1
+            else:
+                changes = {key: value for key, value in document.items() if key not in insert_only}
+                modified += self._apply(current, changes)
+        return {
+            "documents": len(documents),
+            "inserted": inserted,
+            "modified": modified,
+            "deleted": deleted,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2)
+        }
+
+
+READ_METHODS = ("get", "get_many", "find", "count", "distinct")
+WRITE_METHODS = ("insert", "insert_many", "update", "update_where", "delete", "delete_where", "seed")
+
+
+def _cache_key(name, args, kwargs):
+    return name + json.dumps([args, kwargs], sort_keys=True, default=str)
+
+
+def _filter_ids(filter):
+    """IDs a filter is restricted to, or None if it may match any document"""
+    condition = (filter or {}).get("id")
+    if condition is None:
+        return None
+    if not isinstance(condition, dict):
+        return {condition}
+    if set(condition) == {"$in"}:
+        return set(condition["$in"])
+    return None
+
+
+def read_ids(name, args, kwargs):
+    """IDs a read depends on, or None if it depends on the whole collection"""
+    if name == "get":
+        return {args[0] if args else kwargs["document_id"]}
+    if name == "get_many":
+        return set(args[0] if args else kwargs["document_ids"])
+    return None
+
+
+def written_ids(name, args, kwargs):
+    """IDs a write may change, or None if it may change any document"""
+    if name in ("update", "delete"):
+        return {args[0] if args else kwargs["document_id"]}
+    if name == "insert":
+        return {(args[0] if args else kwargs["document"])["id"]}
+    if name == "insert_many":
+        return {document["id"] for document in (args[0] if args else kwargs["documents"])}
+    if name in ("update_where", "delete_where"):
+        return _filter_ids(args[0] if args else kwargs.get("filter"))
+    return None
+
+
+class CachedRepository:
+    """Memoizes reads for ttl seconds.
+
+    Entries are evicted by invalidate(ids): reads of those documents and all
+    queries over the collection. Writes through this wrapper invalidate
+    what they change; writes by other processes must be reported through
+    the invalidation bus, otherwise rely on a short ttl.
+    """
+
+    def __init__(self, inner, ttl):
+        self.inner = inner
+        self.ttl = ttl
+        self.entries = {}  # key -> (expires, ids or None, result)
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self, ids=None):
+        self.generation += 1
+        if ids is None:
+            self.entries.clear()
+            return
+        ids = set(ids)
+        for key, (_, entry_ids, _) in list(self.entries.items()):
+            if entry_ids is None or entry_ids & ids:
+                del self.entries[key]
+
+    def __getattr__(self, name):
+        attribute = getattr(self.inner, name)
+        if name in READ_METHODS:
+            async def cached_read(*args, **kwargs):
+                key = _cache_key(name, args, kwargs)
+                entry = self.entries.get(key)
+                if entry is not None and entry[0] > time.monotonic():
+                    self.hits += 1
+                    return copy.deepcopy(entry[2])
+                self.misses += 1
+                generation = self.generation
+                result = await attribute(*args, **kwargs)
+                # Do not store a result that an invalidation during the read may have made stale
+                if generation == self.generation:
+                    self.entries[key] = (time.monotonic() + self.ttl, read_ids(name, args, kwargs), copy.deepcopy(result))
+                return result
+            return cached_read
+        if name in WRITE_METHODS:
+            async def write(*args, **kwargs):
+                try:
+                    return await attribute(*args, **kwargs)
+                finally:
+                    self.invalidate(written_ids(name, args, kwargs))
+            return write
+        return attribute
+
+
+class NotifyingRepository:
+    """Reports every write as (collection, ids or None) to an async callback"""
+
+    def __init__(self, inner, collection, on_write):
+        self.inner = inner
+        self.collection = collection
+        self.on_write = on_write
+
+    def __getattr__(self, name):
+        attribute = getattr(self.inner, name)
+        if name in WRITE_METHODS:
+            async def write(*args, **kwargs):
+                try:
+                    return await attribute(*args, **kwargs)
+                finally:
+                    await self.on_write(self.collection, written_ids(name, args, kwargs))
+            return write
+        return attribute
+
+
+def find_layer(repository, layer_type):
+    """The wrapper of the given type in a repository's wrapper chain, or None"""
+    while repository is not None:
+        if isinstance(repository, layer_type):
+            return repository
+        repository = repository.__dict__.get("inner")
+    return None
+
+
+class BatchedRepository:
+    """Coalesces get() calls made in the same event loop iteration into one get_many()"""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.pending = {}  # fields key -> (fields, {id: [futures]})
+        self.batches = 0
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    async def get(self, document_id, fields=None):
+        key = json.dumps(fields, sort_keys=True)
+        loop = asyncio.get_running_loop()
+        if key not in self.pending:
+            self.pending[key] = (fields, {})
+            loop.call_soon(lambda: asyncio.ensure_future(self._flush(key)))
+        future = loop.create_future()
+        self.pending[key][1].setdefault(document_id, []).append(future)
+        return await future
+
+    async def _flush(self, key):
+        fields, waiting = self.pending.pop(key)
+        self.batches += 1
+        try:
+            lookup_fields = dict(fields, id=1) if fields and any(fields.values()) else fields
+            documents = await self.inner.get_many(list(waiting), lookup_fields)
+        except Exception as e:
+            for futures in waiting.values():
+                for future in futures:
+                    future.set_exception(e)
+            return
+        by_id = {document["id"]: document for document in documents}
+        for document_id, futures in waiting.items():
+            document = by_id.get(document_id)
+            if document is not None and lookup_fields is not fields and "id" not in fields:
+                document = {key: value for key, value in document.items() if key != "id"}
+            for future in futures:
+                future.set_result(copy.deepcopy(document))
+
+
+class Repositories:
+    """The repositories of one backend plus operations spanning collections"""
+
+    def __init__(self, repositories):
+        for name in COLLECTIONS:
+            setattr(self, name, repositories[name])
+        self.reservation_lock = asyncio.Lock()
+
+    async def warm_up(self, connections=1):
+        pass
+
+    async def ensure_indexes(self):
+        pass
+
+    async def acquire_lease(self, name, holder, seconds):
+        """Whether holder owns the named lease for the next `seconds`; one process, so always"""
+        return True
+
+    async def place_cart_orders(self, cart_id, plot_ids, order_documents):
+        """Reserve all plots and insert all orders, or do nothing; returns False if a plot is taken"""
+        # Wrapping layers may suspend between the check and the reservation (e.g. write notification)
+        async with self.reservation_lock:
+            available = await self.plots.count({"id": {"$in": plot_ids}, "available": True})
+            if available != len(plot_ids):
+                return False
+            await self.plots.update_where({"id": {"$in": plot_ids}}, {"available": False})
+            await self.orders.insert_many(order_documents)
+            return True
+
+    def close(self):
+        pass
+
+
+class MotorRepositories(Repositories):
+    def __init__(self, client, db, wrap=lambda repository, name: repository):
+        self.client = client
+        self.db = db
+        super().__init__({name: wrap(MotorRepository(db[name]), name) for name in COLLECTIONS})
+
+    async def warm_up(self, connections=1):
+        """Open `connections` pooled connections with concurrent pings"""
+        await asyncio.gather(*[self.client.admin.command("ping") for _ in range(max(1, connections))])
+
+    async def ensure_indexes(self):
+        """Create the indexes the read paths rely on (no-op if they already exist)"""
+        # Every lookup and seeding upsert is keyed on id; unique so concurrent upserts cannot duplicate
+        for name in ("plots", "machines", "orders", "advisories"):
+            await self.db[name].create_index("id", unique=True)
+        await self.db.advisories.create_index([("order_id", ASCENDING), ("created_at", DESCENDING)])
+        # One advisory per rule, order and cooldown window, even if two evaluations race;
+        # window second, so the rules engine reads a rule's recent windows as one index range
+        await self.db.advisories.create_index(
+            [("rule_id", ASCENDING), ("rule_window", ASCENDING), ("order_id", ASCENDING)],
+            unique=True,
+            partialFilterExpression={"rule_id": {"$type": "string"}, "rule_window": {"$type": "number"}}
+        )
+        try:
+            await self.db.advisories.drop_index("rule_id_1_order_id_1")  # Superseded by the index above
+        except OperationFailure:
+            pass  # Never created or already dropped
+        await self.db.orders.create_index("cart_id", partialFilterExpression={"cart_id": {"$type": "string"}})
+        await self.db.orders.create_index(
+            "payment_data.paypal_order_id",
+            partialFilterExpression={"payment_data.paypal_order_id": {"$type": "string"}}
+        )
+        # Relayed SSE events: polled by created_at, dropped by the TTL monitor
+        await self.db.events.create_index("created_at", expireAfterSeconds=EVENT_RETENTION_SECONDS)
+
+    async def acquire_lease(self, name, holder, seconds):
+        """Take or renew the named lease in the leases collection; False while another holder has it"""
+        now = datetime.utcnow()
+        try:
+            await self.db.leases.update_one(
+                {"_id": name, "$or": [{"holder": holder}, {"expires_at": {"$lte": now}}]},
+                {"$set": {"holder": holder, "expires_at": now + timedelta(seconds=seconds)}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            return False  # The lease exists and belongs to someone else
+        return True
+
+    async def place_cart_orders(self, cart_id, plot_ids, order_documents):
+        """Reserve all plots and insert all orders in one transaction.
+
+        Standalone MongoDB servers do not support transactions; there the
+        reservation is undone explicitly if it is incomplete or the insert fails.
+        """
+        try:
+            async with await self.client.start_session() as session:
+                async with session.start_transaction():
+                    if not await self._reserve_and_insert(cart_id, plot_ids, order_documents, session):
+                        await session.abort_transaction()
+                        return False
+                    return True
+        except OperationFailure as e:
+            if e.code != 20:  # IllegalOperation: transactions need a replica set
+                raise
+
+        try:
+            if await self._reserve_and_insert(cart_id, plot_ids, order_documents):
+                return True
+        except Exception:
+            await self._release(cart_id)
+            raise
+        await self._release(cart_id)
+        return False
+
+    async def _reserve_and_insert(self, cart_id, plot_ids, order_documents, session=None):
+        reserved = await self.plots.update_where(
+            {"id": {"$in": plot_ids}, "available": True},
+            {"available": False, "reserved_by": cart_id},
+            session=session
+        )
+        if reserved != len(plot_ids):
+            return False
+        await self.orders.insert_many(order_documents, session=session)
+        # The marker is only needed to undo an incomplete reservation
+        await self.plots.update_where({"reserved_by": cart_id}, unset=["reserved_by"], session=session)
+        return True
+
+    async def _release(self, cart_id):
+        await self.plots.update_where({"reserved_by": cart_id}, {"available": True}, unset=["reserved_by"])
+        await self.orders.delete_where({"cart_id": cart_id})
+
+    def close(self):
+        self.client.close()
+
+
+def build_repositories(backend="mongo", mongo_url=None, db_name=None, cache_ttl=0.0, batch=False, min_pool_size=0,
+                       on_write=None):
+    """Repositories for the configured backend, optionally with caching, batching and write notification layers"""
+    def wrap(repository, name):
+        if batch:
+            repository = BatchedRepository(repository)
+        if cache_ttl > 0:
+            repository = CachedRepository(repository, cache_ttl)
+        if on_write is not None:
+            repository = NotifyingRepository(repository, name, on_write)
+        return repository
+
+    if backend == "memory":
+        return Repositories({name: wrap(MemoryRepository(MEMORY_UNIQUE_KEYS.get(name, ())), name) for name in COLLECTIONS})
+    if backend != "mongo":
+        raise ValueError(f"Unknown data backend {backend!r}")
+
+    from motor.motor_asyncio import AsyncIOMotorClient
+    # Connects lazily; warm_up() opens the pool before the app takes traffic
+    client = AsyncIOMotorClient(mongo_url, minPoolSize=min_pool_size)
+    return MotorRepositories(client, client[db_name], wrap)
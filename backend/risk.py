@@ -0,0 +1,98 @@
+"""Monte Carlo profit-risk simulation for orders.
+
+Yield and market price are drawn from lognormal distributions around the
+order's expected yield and the crop's market price, with the per-crop
+coefficients of variation from reference_data. Price shocks are market-wide:
+one price draw per crop and scenario is shared by every order of that crop,
+while yields vary per order. Orders are processed in chunks of
+(orders, samples) arrays, so the whole order book is simulated in a few
+NumPy passes with bounded memory.
+"""
+import numpy as np
+from reference_data import CropType, MARKET_PRICES, YIELD_CV, PRICE_CV
+
+CROPS = list(CropType)
+CROP_INDEX = {crop: index for index, crop in enumerate(CROPS)}
+
+CHUNK_ELEMENTS = 2_000_000  # orders × samples per chunk
+BOOK_SAMPLES = 500
+ORDER_SAMPLES = 10000
+
+
+def _lognormal_sigma(cv):
+    return np.sqrt(np.log1p(np.asarray(cv, dtype=float) ** 2))
+
+
+YIELD_SIGMA = _lognormal_sigma([YIELD_CV.get(crop, 0.0) for crop in CROPS])
+PRICE_SIGMA = _lognormal_sigma([PRICE_CV.get(crop, 0.0) for crop in CROPS])
+# CV of yield × price for independent lognormal factors, per crop
+VALUE_CV = np.sqrt(
+    (1 + np.array([YIELD_CV.get(crop, 0.0) for crop in CROPS]) ** 2)
+    * (1 + np.array([PRICE_CV.get(crop, 0.0) for crop in CROPS]) ** 2)
+    - 1
+)
+MARKET_PRICE = np.array([MARKET_PRICES.get(crop, 0.0) for crop in CROPS], dtype=float)
+
+
+def _mean_one_factors(rng, sigma, shape):
+    """Lognormal multipliers with mean 1 (float32, precision is far beyond the model's)"""
+    sigma = np.asarray(sigma, dtype=np.float32)
+    return np.exp(sigma * rng.standard_normal(shape, dtype=np.float32) - sigma ** 2 / 2)
+
+
+def _quantile_ranks(samples):
+    """Order-statistic ranks of P10/P50/P90, so one np.partition replaces np.percentile"""
+    return [min(samples - 1, int(q * samples)) for q in (0.1, 0.5, 0.9)]
+
+
+def simulate_profit(crop_types, expected_yield_kg, total_cost, samples=1000, seed=None):
+    """Simulate profit per order.
+
+    total_cost is the full season cost of each order (not the payment amount).
+    Returns per-order P10/P50/P90/mean profit and probability of a loss, plus
+    the P10/P50/P90 of the summed book profit.
+    """
+    rng = np.random.default_rng(seed)
+    crop_index = np.array([CROP_INDEX[CropType(crop)] for crop in crop_types], dtype=int)
+    expected_yield_kg = np.asarray(expected_yield_kg, dtype=np.float32)
+    total_cost = np.asarray(total_cost, dtype=np.float32)
+    orders = crop_index.size
+
+    # One market price path per crop, shared by all orders
+    price_factors = _mean_one_factors(rng, PRICE_SIGMA[:, None], (len(CROPS), samples))
+    prices = (MARKET_PRICE[:, None] / 1000).astype(np.float32) * price_factors
+    ranks = _quantile_ranks(samples)
+
+    percentiles = np.empty((orders, 3))
+    mean = np.empty(orders)
+    probability_of_loss = np.empty(orders)
+    book_profit = np.zeros(samples, dtype=np.float64)
+
+    chunk = max(1, CHUNK_ELEMENTS // samples)
+    for start in range(0, orders, chunk):
+        stop = min(start + chunk, orders)
+        crops = crop_index[start:stop]
+        yields = expected_yield_kg[start:stop, None] * _mean_one_factors(
+            rng, YIELD_SIGMA[crops, None], (stop - start, samples)
+        )
+        profit = yields * prices[crops] - total_cost[start:stop, None]
+
+        mean[start:stop] = profit.mean(axis=1, dtype=np.float64)
+        probability_of_loss[start:stop] = np.count_nonzero(profit < 0, axis=1) / samples
+        book_profit += profit.sum(axis=0, dtype=np.float64)
+        profit.partition(ranks, axis=1)
+        percentiles[start:stop] = profit[:, ranks]
+
+    return {
+        "p10": percentiles[:, 0],
+        "p50": percentiles[:, 1],
+        "p90": percentiles[:, 2],
+        "mean": mean,
+        "probability_of_loss": probability_of_loss,
+        "book": {
+            "p10": float(np.percentile(book_profit, 10)),
+            "p50": float(np.percentile(book_profit, 50)),
+            "p90": float(np.percentile(book_profit, 90)),
+            "mean": float(book_profit.mean())
+        }
+    }
@@ -0,0 +1,174 @@
+"""Multi-year crop rotation planner.
+
+A rotation is a sequence of one crop per season on the same plot. Each season
+is priced with the pricing engine, with the standard machine set of the
+scenario sweep, seed costs and the cheapest nitrogen source for the crop's
+remaining N requirement: legumes (erbsen, luzerne) leave a nitrogen credit
+that the following crop does not have to buy.
+
+Rotation rules (Anbaupausen, at most MAX_CONSECUTIVE_CEREALS cereal years in
+a row, perennial stands up to MAX_STAND_YEARS) only depend on the recent
+history, so the search is a dynamic program over states
+(year, previous crop, stand length, cereal run, years since each break crop),
+memoized per request. Season prices are computed once per (crop, N credit).
+"""
+from functools import lru_cache
+import numpy as np
+from reference_data import (
+    CultivationMethod, HarvestOption,
+    N_REQUIREMENTS, CEREAL_CROPS, MAX_CONSECUTIVE_CEREALS,
+    ROTATION_BREAK_YEARS, MAX_STAND_YEARS, LEGUME_N_CREDIT_KG_HA,
+    calculate_yield_by_soil_points
+)
+from pricing import quote
+from fertilizer import FERTILIZER_TABLE
+from scenarios import CROPS, SweepTables
+from yield_model import HA_PER_PLOT
+
+BREAK_CROPS = [crop for crop in CROPS if ROTATION_BREAK_YEARS.get(crop)]
+
+
+def n_credit_kg(previous_crop):
+    """kg N per plot left by the previous crop"""
+    return LEGUME_N_CREDIT_KG_HA.get(previous_crop, 0.0) * HA_PER_PLOT
+
+
+def price_season(tables, plot, crop_type, credit_kg, cultivation_method, harvest_option, sown=True):
+    """Price one season; the N credit replaces part of the purchased fertilizer"""
+    crop = CROPS.index(crop_type)
+    reference_yield = calculate_yield_by_soil_points(crop_type, plot["soil_points"])
+    n_requirement = reference_yield / 1000 * N_REQUIREMENTS.get(crop_type, 0.0)
+    fertilizer_n = max(0.0, n_requirement - credit_kg)
+
+    fertilizer_type, fertilizer_amount, fertilizer_cost, spreading_cost = None, 0.0, 0.0, 0.0
+    if fertilizer_n > 0:
+        usable = tables.supplies_n.copy()
+        if cultivation_method == CultivationMethod.BIOLOGISCH:
+            usable &= tables.organic_allowed
+        costs = np.where(usable, fertilizer_n * tables.cost_per_kg_n + tables.fertilizer_machine_cost[crop], np.inf)
+        index = int(costs.argmin())
+        fertilizer_type = FERTILIZER_TABLE.types[index]
+        fertilizer_amount = fertilizer_n / FERTILIZER_TABLE.kg_n_per_unit[index]
+        fertilizer_cost = round(float(fertilizer_n * tables.cost_per_kg_n[index]), 2)
+        spreading_cost = float(tables.fertilizer_machine_cost[crop, index])
+
+    machine_prices = [("standard", round(float(tables.base_machine_cost[crop]), 2))]
+    if spreading_cost:
+        machine_prices.append(("duengung", round(spreading_cost, 2)))
+    # The credit plus the purchased fertilizer cover the full requirement
+    breakdown = quote(
+        plot["price_per_plot"],
+        plot["soil_points"],
+        crop_type,
+        fertilizer_cost,
+        tuple(sorted(machine_prices)),
+        harvest_option,
+        None,
+        cultivation_method,
+        sown  # A perennial stand that is not sown again needs no seed
+    )
+    return {
+        "crop_type": crop_type,
+        "n_credit_kg": round(credit_kg, 2),
+        "fertilizer_type": fertilizer_type,
+        "fertilizer_amount": round(float(fertilizer_amount), 2),
+        "fertilizer_cost": fertilizer_cost,
+        "machine_cost": round(breakdown.machine_cost, 2),
+        "seed_cost": breakdown.seed_cost,
+        "total_cost": round(breakdown.total_cost, 2),
+        "expected_yield_kg": breakdown.expected_yield_kg,
+        "expected_market_value": round(breakdown.expected_market_value, 2),
+        "profit_loss": round(breakdown.profit_loss, 2),
+        "payment_amount": round(breakdown.payment_amount, 2)
+    }
+
+
+def initial_state(previous_crops):
+    """Rotation state after the crops already grown on the plot (oldest first)"""
+    previous = previous_crops[-1] if previous_crops else None
+    stand = 0
+    for crop in reversed(previous_crops):
+        if crop != previous:
+            break
+        stand += 1
+    cereal_run = 0
+    for crop in reversed(previous_crops):
+        if crop not in CEREAL_CROPS:
+            break
+        cereal_run += 1
+    since = []
+    for crop in BREAK_CROPS:
+        cap = ROTATION_BREAK_YEARS[crop] + 1
+        grown = [len(previous_crops) - position for position, value in enumerate(previous_crops) if value == crop]
+        since.append(min(grown[-1], cap) if grown else cap)
+    return previous, stand, min(cereal_run, MAX_CONSECUTIVE_CEREALS), tuple(since)
+
+
+def plan_rotation(plot, machines, years, cultivation_method=CultivationMethod.KONVENTIONELL,
+                  harvest_option=HarvestOption.SELL_TO_FARMER, previous_crops=(), allowed_crops=None,
+                  fixed_crops=()):
+    """Most profitable rotation over `years` seasons, or None if the rules allow none.
+
+    fixed_crops pins the crop of a season (None leaves it open), e.g. to plan
+    around a rotation the customer already has in mind.
+    """
+    tables = SweepTables(machines)
+    candidates = [crop for crop in CROPS if allowed_crops is None or crop in allowed_crops]
+    fixed = list(fixed_crops) + [None] * (years - len(fixed_crops))
+
+    @lru_cache(maxsize=None)
+    def season(crop_type, previous, sown):
+        return price_season(tables, plot, crop_type, n_credit_kg(previous), cultivation_method, harvest_option, sown)
+
+    @lru_cache(maxsize=None)
+    def best(year, previous, stand, cereal_run, since):
+        """(total profit, crops) of the best continuation from this state"""
+        if year == years:
+            return 0.0, ()
+        best_profit, best_crops = -np.inf, None
+        for crop in ([fixed[year]] if fixed[year] is not None else candidates):
+            if not tables.crop_feasible[CROPS.index(crop)]:
+                continue  # The sweep cannot price it: a step without machine or no seed cost
+            continues_stand = crop == previous and crop in MAX_STAND_YEARS
+            if continues_stand:
+                if stand >= MAX_STAND_YEARS[crop]:
+                    continue
+            elif crop in ROTATION_BREAK_YEARS and since[BREAK_CROPS.index(crop)] <= ROTATION_BREAK_YEARS[crop]:
+                continue
+            is_cereal = crop in CEREAL_CROPS
+            if is_cereal and cereal_run >= MAX_CONSECUTIVE_CEREALS:
+                continue
+
+            next_since = tuple(
+                1 if break_crop == crop else min(years_since + 1, ROTATION_BREAK_YEARS[break_crop] + 1)
+                for break_crop, years_since in zip(BREAK_CROPS, since)
+            )
+            rest_profit, rest_crops = best(
+                year + 1,
+                crop,
+                stand + 1 if crop == previous else 1,
+                cereal_run + 1 if is_cereal else 0,
+                next_since
+            )
+            if rest_crops is None:
+                continue
+            profit = season(crop, previous, not continues_stand)["profit_loss"] + rest_profit
+            if profit > best_profit:
+                best_profit, best_crops = profit, (crop,) + rest_crops
+        return best_profit, best_crops
+
+    total_profit, crops = best(0, *initial_state(list(previous_crops)))
+    if crops is None:
+        return None
+
+    seasons = []
+    previous = previous_crops[-1] if previous_crops else None
+    for year, crop in enumerate(crops, start=1):
+        continues_stand = crop == previous and crop in MAX_STAND_YEARS
+        seasons.append({"year": year, **season(crop, previous, not continues_stand)})
+        previous = crop
+    return {
+        "seasons": seasons,
+        "total_profit_loss": round(float(total_profit), 2),
+        "total_payment_amount": round(sum(entry["payment_amount"] for entry in seasons), 2)
+    }
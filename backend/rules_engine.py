@@ -0,0 +1,200 @@
+"""Rule-based advisory engine.
+
+Rules are declarative conditions on crop type, cultivation method, fertilizer
+choice and season, optionally combined with weather observations per plot
+location. Each rule is compiled once into boolean lookup masks; all active
+orders are encoded as integer code arrays, so evaluating a rule over the whole
+order book is a handful of NumPy indexing operations instead of a Python loop.
+"""
+from datetime import datetime, timedelta
+import numpy as np
+
+# Months belonging to each season (used by rule conditions)
+SEASON_MONTHS = {
+    "fruejahr": {3, 4, 5},
+    "sommer": {6, 7, 8},
+    "herbst": {9, 10, 11},
+    "winter": {12, 1, 2}
+}
+
+# Weather observation fields, in the column order of the weather table
+WEATHER_FIELDS = ("temperature", "humidity", "precipitation_mm")
+
+# Rule weather condition -> (observation column, comparison)
+WEATHER_CONDITIONS = {
+    "min_temperature": (0, np.greater_equal),
+    "max_temperature": (0, np.less_equal),
+    "min_humidity": (1, np.greater_equal),
+    "max_humidity": (1, np.less_equal),
+    "min_precipitation_mm": (2, np.greater_equal)
+}
+
+
+def _encode(values, vocabulary):
+    """Map values to their index in vocabulary, -1 for unknown values"""
+    index = {value: code for code, value in enumerate(vocabulary)}
+    return np.fromiter((index.get(value, -1) for value in values), dtype=np.int32, count=len(values))
+
+
+def _mask(allowed, vocabulary):
+    """Boolean lookup table over vocabulary codes; empty means "any value".
+
+    The table has one extra trailing slot so that the unknown code -1 can be
+    used as an index directly; it only matches when the rule has no condition.
+    """
+    if not allowed:
+        return np.ones(len(vocabulary) + 1, dtype=bool)
+    allowed = set(allowed)
+    return np.array([value in allowed for value in vocabulary] + [False], dtype=bool)
+
+
+class OrderColumns:
+    """Active orders as column arrays of vocabulary codes"""
+
+    def __init__(self, orders, crop_types, cultivation_methods, fertilizer_types):
+        self.crop_types = list(crop_types)
+        self.cultivation_methods = list(cultivation_methods)
+        self.fertilizer_types = list(fertilizer_types)
+        self.order_ids = [order["id"] for order in orders]
+        self.locations = sorted({order.get("location") or "" for order in orders})
+
+        self.crop = _encode([order.get("crop_type") for order in orders], self.crop_types)
+        self.method = _encode([order.get("cultivation_method") for order in orders], self.cultivation_methods)
+        self.fertilizer = _encode([order.get("fertilizer_type") for order in orders], self.fertilizer_types)
+        self.location = _encode([order.get("location") or "" for order in orders], self.locations)
+
+    def __len__(self):
+        return len(self.order_ids)
+
+    def weather_table(self, weather):
+        """Observations per location as a (locations + 1, fields) array, NaN where unknown"""
+        table = np.full((len(self.locations) + 1, len(WEATHER_FIELDS)), np.nan)
+        for code, location in enumerate(self.locations):
+            observation = (weather or {}).get(location)
+            if observation:
+                for column, field in enumerate(WEATHER_FIELDS):
+                    if observation.get(field) is not None:
+                        table[code, column] = observation[field]
+        return table
+
+
+class CompiledRule:
+    """A rule turned into lookup masks for one OrderColumns vocabulary"""
+
+    def __init__(self, rule, columns):
+        self.rule = rule
+        self.id = rule["id"]
+        self.months = set()
+        for season in rule.get("seasons") or []:
+            self.months |= SEASON_MONTHS[season]
+        self.crop_mask = _mask(rule.get("crop_types"), columns.crop_types)
+        self.method_mask = _mask(rule.get("cultivation_methods"), columns.cultivation_methods)
+        self.fertilizer_mask = _mask(rule.get("fertilizer_types"), columns.fertilizer_types)
+        self.weather = {
+            condition: value
+            for condition, value in (rule.get("weather") or {}).items()
+            if value is not None
+        }
+
+    def in_season(self, month):
+        return not self.months or month in self.months
+
+    def location_mask(self, weather_table):
+        """Which locations satisfy the weather condition (missing data never matches)"""
+        mask = np.ones(weather_table.shape[0], dtype=bool)
+        for condition, value in self.weather.items():
+            column, compare = WEATHER_CONDITIONS[condition]
+            # Comparisons against NaN are False, so unobserved locations drop out
+            mask &= compare(weather_table[:, column], value)
+        return mask
+
+    def evaluate(self, columns, weather_table):
+        mask = (
+            self.crop_mask[columns.crop]
+            & self.method_mask[columns.method]
+            & self.fertilizer_mask[columns.fertilizer]
+        )
+        if self.weather:
+            mask &= self.location_mask(weather_table)[columns.location]
+        return np.flatnonzero(mask)
+
+
+def compile_rules(rules, columns):
+    return [CompiledRule(rule, columns) for rule in rules]
+
+
+def evaluate_rules(compiled_rules, columns, month, weather=None):
+    """Return {rule_id: array of matching order indices} for all rules in season"""
+    if not len(columns):
+        return {}
+    weather_table = columns.weather_table(weather)
+    matches = {}
+    for compiled in compiled_rules:
+        if not compiled.in_season(month):
+            continue
+        indices = compiled.evaluate(columns, weather_table)
+        if indices.size:
+            matches[compiled.id] = indices
+    return matches
+
+
+def suppress_duplicates(matches, compiled_rules, columns, existing, now=None):
+    """Drop matches that already received an advisory from the same rule.
+
+    existing is an iterable of advisory documents with rule_id, order_id and
+    created_at. A rule with cooldown_days may fire again once the last
+    advisory for that order is older than the cooldown; otherwise a rule
+    advises each order at most once.
+    """
+    now = now or datetime.utcnow()
+    cutoffs = {}
+    for compiled in compiled_rules:
+        cooldown_days = compiled.rule.get("cooldown_days")
+        cutoffs[compiled.id] = now - timedelta(days=cooldown_days) if cooldown_days else None
+
+    already_advised = set()
+    for advisory in existing:
+        cutoff = cutoffs.get(advisory["rule_id"])
+        if cutoff is None or advisory["created_at"] >= cutoff:
+            already_advised.add((advisory["rule_id"], advisory["order_id"]))
+
+    fresh = {}
+    suppressed = 0
+    for rule_id, indices in matches.items():
+        order_ids = [columns.order_ids[index] for index in indices]
+        kept = [order_id for order_id in order_ids if (rule_id, order_id) not in already_advised]
+        suppressed += len(order_ids) - len(kept)
+        if kept:
+            fresh[rule_id] = kept
+    return fresh, suppressed
+
+
+def advisory_window(rule, now):
+    """Cooldown period a rule advisory created at `now` belongs to.
+
+    A rule advises an order at most once per window: 0 for rules without
+    cooldown, otherwise consecutive periods of cooldown_days. Together with
+    rule_id and order_id it forms a unique key, so two evaluations racing
+    each other cannot both write the same advisory.
+    """
+    cooldown_days = rule.get("cooldown_days")
+    return (now - datetime(1970, 1, 1)).days // cooldown_days if cooldown_days else 0
+
+
+def earlier_advisories_query(rule, now):
+    """Query for the advisories of a rule that can still suppress a match at `now`.
+
+    With cooldown_days only the windows overlapping the cooldown are read, so
+    the lookup stays the same size however long the rule has been running.
+    The conditions on rule_window match the unique advisory index and its
+    partial filter, which serve the query.
+    """
+    cooldown_days = rule.get("cooldown_days")
+    if not cooldown_days:
+        return {"rule_id": rule["id"], "rule_window": {"$type": "number"}}
+    cutoff = now - timedelta(days=cooldown_days)
+    return {
+        "rule_id": rule["id"],
+        "rule_window": {"$type": "number", "$gte": advisory_window(rule, cutoff)},
+        "created_at": {"$gte": cutoff}
+    }
@@ -0,0 +1,174 @@
+"""Vectorized scenario sweep: profit/loss for every crop × fertilizer ×
+harvest option on one or more plots.
+
+All reference tables are turned into NumPy arrays once (SweepTables) and the
+sweep is evaluated as a (plots, crops, fertilizers, harvest options) array
+expression, so even a sweep across the whole catalog is a few array ops.
+
+Unlike the order pricing, which only knows the machines a customer picked,
+the sweep prices a standard machine set per crop: the cheapest suitable
+machine for soil preparation, sowing and harvest, plus the cheapest
+spreader matching the fertilizer (mineral, liquid or solid organic).
+Seed costs are included as an input cost. Each fertilizer is applied at
+the crop's full N requirement; "keine Düngung" applies none, and the yield
+model prices the resulting yield loss.
+
+A crop without a suitable machine for one of the base steps, or without a
+seed cost, cannot be priced: its costs are infinite and it is marked
+infeasible, as is a fertilizer without a matching spreader.
+"""
+import numpy as np
+from reference_data import (
+    CropType, FertilizerType, CultivationMethod, HarvestOption, WorkingStep,
+    BASE_YIELDS_250M2, MARKET_PRICES, SEED_COSTS, N_REQUIREMENTS, SOIL_QUALITY_SEGMENTS
+)
+from pricing import SHIPPING_COST
+from fertilizer import FERTILIZER_TABLE, cost_per_kg_n
+from yield_model import YIELD_MODEL
+
+CROPS = list(CropType)
+FERTILIZERS = FERTILIZER_TABLE.types
+HARVEST_OPTIONS = [HarvestOption.SHIP_HOME, HarvestOption.SELL_TO_FARMER]
+
+# Working steps priced in the standard machine set besides fertilization
+BASE_STEPS = [WorkingStep.BODENBEARBEITUNG, WorkingStep.AUSSAAT, WorkingStep.ERNTE]
+
+
+def fertilizer_application(fertilizer_type):
+    """Machine fertilizer_type needed to spread a fertilizer (None: no spreading)"""
+    category = FERTILIZER_TABLE.categories[FERTILIZER_TABLE.index(fertilizer_type)]
+    if category == "mineral":
+        return "mineral"
+    if category == "organic":
+        return "organic_solid" if fertilizer_type == FertilizerType.RINDERMIST else "organic_liquid"
+    return None
+
+
+def soil_quality_factors(soil_points):
+    """Vectorized reference_data.soil_quality_factor, over the same SOIL_QUALITY_SEGMENTS"""
+    soil_points = np.asarray(soil_points, dtype=float)
+    start, factor, slope = SOIL_QUALITY_SEGMENTS[0]
+    factors = factor + (soil_points - start) * slope
+    for start, factor, slope in SOIL_QUALITY_SEGMENTS[1:]:
+        factors = np.where(soil_points > start, factor + (soil_points - start) * slope, factors)
+    return factors
+
+
+def _cheapest(machines, crop, step, fertilizer_type=None):
+    prices = [
+        machine["price_per_use"]
+        for machine in machines
+        if machine["working_step"] == step
+        and crop in machine["suitable_for"]
+        and (fertilizer_type is None or machine.get("fertilizer_type") == fertilizer_type)
+    ]
+    return min(prices) if prices else np.inf  # No machine for a required step
+
+
+class SweepTables:
+    """Reference data as arrays over CROPS and FERTILIZERS"""
+
+    def __init__(self, machines):
+        self.base_yield = np.array([BASE_YIELDS_250M2.get(crop, 0.0) for crop in CROPS])
+        self.market_price = np.array([MARKET_PRICES.get(crop, 0.0) for crop in CROPS], dtype=float)
+        self.seed_cost = np.array([SEED_COSTS.get(crop, np.inf) for crop in CROPS])
+        self.n_requirement = np.array([N_REQUIREMENTS.get(crop, 0.0) for crop in CROPS])
+        self.cost_per_kg_n = cost_per_kg_n()
+        self.supplies_n = FERTILIZER_TABLE.kg_n_per_unit > 0
+        self.crop_index = np.array([YIELD_MODEL.index[crop] for crop in CROPS])
+        # Organic farming allows organic fertilizers or none at all
+        self.organic_allowed = np.array([category != "mineral" for category in FERTILIZER_TABLE.categories])
+        self.shipping = np.array([SHIPPING_COST if option == HarvestOption.SHIP_HOME else 0.0 for option in HARVEST_OPTIONS])
+
+        self.base_machine_cost = np.array([
+            sum(_cheapest(machines, crop, step) for step in BASE_STEPS) for crop in CROPS
+        ])
+        self.fertilizer_machine_cost = np.array([
+            [
+                _cheapest(machines, crop, WorkingStep.DUENGUNG, fertilizer_application(fertilizer))
+                if fertilizer_application(fertilizer) else 0.0
+                for fertilizer in FERTILIZERS
+            ]
+            for crop in CROPS
+        ])
+        # Combinations that can actually be ordered: every step has a machine and the seed a price
+        self.crop_feasible = np.isfinite(self.seed_cost + self.base_machine_cost)
+        self.feasible = self.crop_feasible[:, None] & np.isfinite(self.fertilizer_machine_cost)
+
+
+def sweep(tables, plot_prices, soil_points, cultivation_method=None):
+    """Evaluate every combination; arrays are shaped (plots, crops, fertilizers, harvest options)"""
+    plot_prices = np.asarray(plot_prices, dtype=float)
+
+    # Same rounding as calculate_yield_by_soil_points
+    reference_yield = np.round(tables.base_yield[None, :] * soil_quality_factors(soil_points)[:, None], 1)
+    n_requirement = reference_yield / 1000 * tables.n_requirement
+    fertilizer_cost = n_requirement[:, :, None] * tables.cost_per_kg_n
+
+    # Yield per (plot, crop, fertilizer) from the N actually applied
+    applied_n = n_requirement[:, :, None] * tables.supplies_n
+    yield_factor = YIELD_MODEL.yield_factor(
+        tables.crop_index[None, :, None],
+        applied_n,
+        n_requirement[:, :, None],
+        cultivation_method == CultivationMethod.BIOLOGISCH
+    )
+    expected_yield = np.round(reference_yield[:, :, None] * yield_factor, 1)
+    market_value = expected_yield / 1000 * tables.market_price[None, :, None]
+
+    total_cost = (
+        plot_prices[:, None, None, None]
+        + (tables.seed_cost + tables.base_machine_cost)[None, :, None, None]
+        + (tables.fertilizer_machine_cost[None, :, :] + fertilizer_cost)[..., None]
+        + tables.shipping
+    )
+    profit_loss = market_value[..., None] - total_cost
+
+    sell_to_farmer = np.array([option == HarvestOption.SELL_TO_FARMER for option in HARVEST_OPTIONS])
+    payment = np.where(sell_to_farmer, np.maximum(0, -profit_loss), total_cost)
+
+    # Fertilizing a crop without N requirement only adds cost
+    feasible = np.broadcast_to(
+        (((n_requirement[:, :, None] > 0) | ~tables.supplies_n) & tables.feasible)[..., None],
+        total_cost.shape
+    ).copy()
+    if cultivation_method == CultivationMethod.BIOLOGISCH:
+        feasible &= tables.organic_allowed[None, None, :, None]
+
+    return {
+        "expected_yield_kg": expected_yield,
+        "expected_market_value": market_value,
+        "n_requirement_kg": n_requirement,
+        "fertilizer_cost": fertilizer_cost,
+        "total_cost": total_cost,
+        "profit_loss": profit_loss,
+        "payment_amount": payment,
+        "feasible": feasible
+    }
+
+
+def rank(result, plot_index, limit=None):
+    """Feasible combinations for one plot, best profit first"""
+    profit = np.where(result["feasible"][plot_index], result["profit_loss"][plot_index], -np.inf)
+    order = np.argsort(-profit, axis=None, kind="stable")
+    if limit is not None:
+        order = order[:limit]
+
+    ranked = []
+    for flat_index in order:
+        if not np.isfinite(profit.flat[flat_index]):
+            break
+        crop, fertilizer, harvest = np.unravel_index(flat_index, profit.shape)
+        ranked.append({
+            "crop_type": CROPS[crop],
+            "fertilizer_type": FERTILIZERS[fertilizer],
+            "harvest_option": HARVEST_OPTIONS[harvest],
+            "expected_yield_kg": float(result["expected_yield_kg"][plot_index, crop, fertilizer]),
+            "n_requirement_kg": round(float(result["n_requirement_kg"][plot_index, crop]), 2),
+            "fertilizer_cost": round(float(result["fertilizer_cost"][plot_index, crop, fertilizer]), 2),
+            "total_cost": round(float(result["total_cost"][plot_index, crop, fertilizer, harvest]), 2),
+            "expected_market_value": round(float(result["expected_market_value"][plot_index, crop, fertilizer]), 2),
+            "profit_loss": round(float(profit[crop, fertilizer, harvest]), 2),
+            "payment_amount": round(float(result["payment_amount"][plot_index, crop, fertilizer, harvest]), 2)
+        })
+    return ranked
@@ -1,316 +1,139 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Request
+from startup_timing import STARTUP, FirstResponseTimer  # First, so the import time covers everything below
+from fastapi import FastAPI, APIRouter, HTTPException, Request, Query
+from fastapi.responses import StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import DESCENDING
 import os
+import socket
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 import uuid
 from datetime import datetime, timezone
-from enum import Enum
-from paypalcheckoutsdk.core import SandboxEnvironment, LiveEnvironment, PayPalHttpClient
-from paypalcheckoutsdk.orders import OrdersCreateRequest, OrdersCaptureRequest
-from paypalhttp import HttpError
 import asyncio
 import json
+import time
+from contextlib import asynccontextmanager
+import numpy as np
+from reference_data import (
+    SoilType, CropType, FertilizerType, CultivationMethod, MachineType, WorkingStep,
+    OrderStatus, PaymentStatus, HarvestOption,
+    MARKET_VALUES_250M2, SEED_COSTS, FERTILIZER_SPECS, N_REQUIREMENTS,
+    calculate_yield_by_soil_points
+)
+from rules_engine import (
+    SEASON_MONTHS, OrderColumns, advisory_window, compile_rules, earlier_advisories_query, evaluate_rules,
+    suppress_duplicates
+)
+from pricing import quote
+from scenarios import SweepTables, rank, sweep
+from fertilizer import FERTILIZER_TABLE, applied_nitrogen_kg, optimize_mix
+from yield_model import YIELD_MODEL
+from rotation import plan_rotation
+from portfolio import Objective, optimize_portfolio
+from risk import BOOK_SAMPLES, ORDER_SAMPLES, simulate_profit
+from recommendations import CropRecommendationCache
+from seeding import load_fixtures
+from repositories import CachedRepository, build_repositories, find_layer
+from invalidation import WATCHED_COLLECTIONS, InvalidationBus, run_invalidation
+from singleflight import SingleFlight
+from compression import CompressionMiddleware, PrecompressedPayload
+from static_site import StaticSite
+from payments import PaymentError, PayPalGateway
+from catalog_snapshot import load_snapshot, write_snapshot
+from events import EventBus, customer_topic, format_sse, order_topic, relay_events
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Tells this worker's caches which documents changed, including writes of other workers
+invalidation_bus = InvalidationBus()
+CACHE_INVALIDATION = os.environ.get('CACHE_INVALIDATION', 'auto')
+CACHE_POLL_INTERVAL_SECONDS = float(os.environ.get('CACHE_POLL_INTERVAL_SECONDS', '2'))
+
+# Concurrent identical catalog reads share one query
+hot_reads = SingleFlight()
+# Collection -> single-flight keys that read it
+HOT_READ_KEYS = {"plots": ["plots"], "machines": ["machines"], "orders": ["active_plots_count"]}
+
+# Data access: MongoDB by default, DATA_BACKEND=memory for tests and benchmarks
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', '4'))
+repos = build_repositories(
+    os.environ.get('DATA_BACKEND', 'mongo'),
+    os.environ.get('MONGO_URL'),
+    os.environ.get('DB_NAME'),
+    cache_ttl=float(os.environ.get('REPOSITORY_CACHE_TTL_SECONDS', '0')),
+    batch=os.environ.get('REPOSITORY_BATCHING', '0') == '1',
+    min_pool_size=MONGO_MIN_POOL_SIZE,
+    on_write=invalidation_bus.publish
+)
 
 # PayPal configuration
 paypal_client_id = os.environ.get('PAYPAL_CLIENT_ID')
 paypal_client_secret = os.environ.get('PAYPAL_CLIENT_SECRET')
 paypal_environment = os.environ.get('PAYPAL_ENVIRONMENT', 'sandbox')
 
-# Initialize PayPal environment and client
-if paypal_environment == 'sandbox':
-    paypal_env = SandboxEnvironment(client_id=paypal_client_id, client_secret=paypal_client_secret)
-else:
-    paypal_env = LiveEnvironment(client_id=paypal_client_id, client_secret=paypal_client_secret)
-
-paypal_client = PayPalHttpClient(paypal_env)
+# The SDK is imported and the client built on the first payment request
+payment_gateway = PayPalGateway(paypal_client_id, paypal_client_secret, paypal_environment)
+# Set PAYPAL_PRELOAD=1 to build it in the background once the worker is ready
+PAYPAL_PRELOAD = os.environ.get('PAYPAL_PRELOAD', '0') == '1'
+
+# Optional catalog snapshot file, served while the database is warming up
+CATALOG_SNAPSHOT = os.environ.get('CATALOG_SNAPSHOT')
+catalog_snapshot = None
+
+# Startup steps and their durations; the worker reports ready once all are done
+startup_state = {"ready": False, "steps": {}}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    subscribe_to_invalidations()
+    # The snapshot may already have been loaded by the gunicorn master (preload_shared_state)
+    if CATALOG_SNAPSHOT and (catalog_snapshot is not None or load_catalog_snapshot()):
+        # Take traffic right away; only the catalog endpoints work until warm-up is done
+        background_tasks.append(asyncio.create_task(warm_up_in_background()))
+    else:
+        await warm_up()
+    yield
+    await shut_down()
 
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+
+# Bus for live order and advisory updates (Server-Sent Events), relayed between workers via MongoDB
+event_bus = EventBus()
+SSE_HEARTBEAT_SECONDS = 15
+EVENT_RELAY_INTERVAL_SECONDS = float(os.environ.get('EVENT_RELAY_INTERVAL_SECONDS', '0.5'))
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
-# Enums for farming choices
-class SoilType(str, Enum):
-    SAND = "sand"
-    LOAMY_SAND = "loamy_sand"
-    CLAYEY_SAND = "clayey_sand"
-    SANDY_LOAM = "sandy_loam"
-
-class CropType(str, Enum):
-    WINTERROGGEN = "winterroggen"
-    WINTERWEIZEN = "winterweizen"
-    WINTERGERSTE = "wintergerste"
-    WINTERTRITICALE = "wintertriticale"
-    WINTERRAPS = "winterraps"
-    KHORASAN_WEIZEN = "khorasan_weizen"  # Sommerweizen, wenig Ertrag, teuer, viel Protein
-    SILOMAIS = "silomais"
-    ZUCKERRUEBEN = "zuckerrueben"
-    LUZERNE = "luzerne"
-    GRAS = "gras"
-    BLUEHMISCHUNG = "bluehmischung"
-    ERBSEN = "erbsen"
-
-class FertilizerType(str, Enum):
-    SSA = "ssa"  # Schwefelsaurer Ammoniak
-    KAS = "kas"  # Kalkammonsalpeter
-    SCHWEINEGULLE = "schweinegulle"
-    RINDERGUELLE = "rinderguelle"
-    GAERREST = "gaerrest"
-    RINDERMIST = "rindermist"
-    KEINE_DUENGUNG = "keine_duengung"
-
-class CultivationMethod(str, Enum):
-    KONVENTIONELL = "konventionell"
-    BIOLOGISCH = "biologisch"
-
-class MachineType(str, Enum):
-    TRAKTOR = "traktor"
-    TRAKTOR_AUSSAAT = "traktor_aussaat"
-    TRAKTOR_DUENGUNG = "traktor_duengung"
-    TRAKTOR_PFLANZENSCHUTZ = "traktor_pflanzenschutz"
-    PFLUG = "pflug"
-    GRUBBER = "grubber"
-    SCHEIBENEGGE = "scheibenegge"
-    SAEMASCHINE = "saemaschine"
-    MAEHDRESCHER = "maehdrescher"
-    FELDSPRITZE = "feldspritze"
-    GUELLEFASS = "guellefass"
-    MISTSTREUER = "miststreuer"
-    HACKE = "hacke"
-    STRIEGEL = "striegel"
-    CAMBRIDGE_WALZE = "cambridge_walze"
-    MAIS_HAECKSLER = "mais_haecksler"
-    GRAS_HAECKSLER = "gras_haecksler"
-
-class WorkingStep(str, Enum):
-    BODENBEARBEITUNG = "bodenbearbeitung"
-    AUSSAAT = "aussaat"
-    PFLANZENSCHUTZ = "pflanzenschutz"
-    DUENGUNG = "duengung"
-    PFLEGE = "pflege"
-    ERNTE = "ernte"
-
-class OrderStatus(str, Enum):
-    PENDING = "pending"
-    CONFIRMED = "confirmed"
-    IMPLEMENTING = "implementing"
-    GROWING = "growing"
-    HARVEST_READY = "harvest_ready"
-    COMPLETED = "completed"
-
-class PaymentStatus(str, Enum):
-    PENDING = "pending"
-    COMPLETED = "completed"
-    FAILED = "failed"
-
-class HarvestOption(str, Enum):
-    SHIP_HOME = "ship_home"
-    SELL_TO_FARMER = "sell_to_farmer"
-
-# Machine data organized by working steps
-# Machine data has been moved to initialize_sample_data function
-MACHINE_DATA = {}
-
-# Market prices per ton (in EUR) - updated with real prices
-MARKET_PRICES = {
-    CropType.WINTERWEIZEN: 220.0,  # 0.22€/kg = 220€/t
-    CropType.WINTERROGGEN: 180.0,  # 0.18€/kg = 180€/t
-    CropType.WINTERGERSTE: 190.0,  # 0.19€/kg = 190€/t
-    CropType.WINTERTRITICALE: 170.0,  # 0.17€/kg = 170€/t
-    CropType.WINTERRAPS: 450.0,  # 0.45€/kg = 450€/t
-    CropType.KHORASAN_WEIZEN: 1500.0,  # 1.5€/kg = 1500€/t (sehr teuer, viel Protein)
-    CropType.SILOMAIS: 35.0,  # 0.035€/kg = 35€/t
-    CropType.ZUCKERRUEBEN: 45.0,  # 0.045€/kg = 45€/t
-    CropType.LUZERNE: 150.0,  # 0.15€/kg = 150€/t
-    CropType.GRAS: 120.0,  # 0.12€/kg = 120€/t
-    CropType.BLUEHMISCHUNG: 0,  # Subsidized, no market price
-    CropType.ERBSEN: 250.0  # 0.25€/kg = 250€/t
-}
-
-# Real yields per 250m² based on Grabow location (in kg)
-REAL_YIELDS_250M2 = {
-    CropType.WINTERWEIZEN: 125.0,      # 5 t/ha × 0.025 = 125 kg
-    CropType.WINTERROGGEN: 75.0,       # 3 t/ha × 0.025 = 75 kg
-    CropType.WINTERGERSTE: 100.0,      # 4 t/ha × 0.025 = 100 kg
-    CropType.WINTERTRITICALE: 100.0,   # 4 t/ha × 0.025 = 100 kg
-    CropType.SILOMAIS: 1200.0,   # Keeping existing estimate
-    CropType.ZUCKERRUEBEN: 1500.0, # 60 t/ha × 0.025 = 1500 kg
-    CropType.LUZERNE: 150.0,     # 6 t/ha × 0.025 = 150 kg
-    CropType.GRAS: 200.0,        # 8 t/ha × 0.025 = 200 kg
-    CropType.BLUEHMISCHUNG: 0.0, # No harvest - only subsidy
-    CropType.ERBSEN: 50.0        # 2 t/ha × 0.025 = 50 kg
-}
-
-# Market values per 250m² plot (in EUR)
-MARKET_VALUES_250M2 = {
-    CropType.WINTERWEIZEN: 21.25,      # 125 kg × 170€/t = 21.25€
-    CropType.WINTERROGGEN: 11.63,      # 75 kg × 155€/t = 11.63€
-    CropType.WINTERGERSTE: 15.00,      # 100 kg × 150€/t = 15.00€
-    CropType.WINTERTRITICALE: 16.50,   # 100 kg × 165€/t = 16.50€
-    CropType.WINTERRAPS: 22.50,        # 50 kg × 450€/t = 22.50€
-    CropType.KHORASAN_WEIZEN: 18.75,   # Durchschnitt: 12.5-37.5 kg, 1500€/t = 18.75€-56.25€
-    CropType.SILOMAIS: 54.00,    # 1200 kg × 45€/t = 54.00€
-    CropType.ZUCKERRUEBEN: 60.00, # 1500 kg × 40€/t = 60.00€
-    CropType.LUZERNE: 27.00,     # 150 kg × 180€/t = 27.00€
-    CropType.GRAS: 24.00,        # 200 kg × 120€/t = 24.00€
-    CropType.BLUEHMISCHUNG: 17.50, # 700€/ha × 0.025 = 17.50€
-    CropType.ERBSEN: 12.50       # 50 kg × 250€/t = 12.50€
-}
-
-# Expected yield per 250m² (in kg) - varies by soil points
-# Base yields at 35 soil points, adjusted by soil quality
-def calculate_yield_by_soil_points(crop_type: CropType, soil_points: int):
-    """Calculate expected yield based on soil points (25-56 range)"""
-    base_yields = {
-        CropType.WINTERWEIZEN: 125.0,      # 5 t/ha × 0.025 = 125 kg at 35 soil points
-        CropType.WINTERROGGEN: 75.0,       # 3 t/ha × 0.025 = 75 kg at 35 soil points
-        CropType.WINTERGERSTE: 100.0,      # 4 t/ha × 0.025 = 100 kg at 35 soil points
-        CropType.WINTERTRITICALE: 100.0,   # 4 t/ha × 0.025 = 100 kg at 35 soil points
-        CropType.WINTERRAPS: 50.0,   # 2 t/ha × 0.025 = 50 kg at 35 soil points  
-        CropType.KHORASAN_WEIZEN: 12.5,   # 0.5 t/ha × 0.025 = 12.5 kg at 35 soil points (schlechteste)  
-        CropType.SILOMAIS: 1200.0,   # 48 t/ha × 0.025 = 1200 kg at 35 soil points
-        CropType.ZUCKERRUEBEN: 1500.0, # 60 t/ha × 0.025 = 1500 kg at 35 soil points
-        CropType.LUZERNE: 150.0,     # 6 t/ha × 0.025 = 150 kg at 35 soil points
-        CropType.GRAS: 200.0,        # 8 t/ha × 0.025 = 200 kg at 35 soil points
-        CropType.BLUEHMISCHUNG: 0.0, # No harvest
-        CropType.ERBSEN: 57.5        # 2.3 t/ha × 0.025 = 57.5 kg at 35 soil points (15% erhöht)
-    }
-    
-    base_yield = base_yields.get(crop_type, 0)
-    if base_yield == 0:
-        return 0
-    
-    # Soil quality factor: 25 points = 0.8x, 35 points = 1.0x, 45 points = 1.2x, 56 points = 1.5x
-    # Extended range for premium soils
-    if soil_points <= 45:
-        soil_factor = 0.8 + (soil_points - 25) * 0.02  # Linear scale from 0.8 to 1.2
-    else:
-        # Premium soils: 45-56 points = 1.2x to 1.5x
-        soil_factor = 1.2 + (soil_points - 45) * 0.027  # Linear scale from 1.2 to 1.5
-    
-    return round(base_yield * soil_factor, 1)
-
-EXPECTED_YIELDS = {
-    CropType.WINTERWEIZEN: 125.0,
-    CropType.WINTERROGGEN: 75.0,
-    CropType.WINTERGERSTE: 100.0,
-    CropType.WINTERTRITICALE: 100.0,
-    CropType.WINTERRAPS: 50.0,   # 2 t/ha × 0.025 = 50 kg per 250m²
-    CropType.KHORASAN_WEIZEN: 12.5,  # 0.5 t/ha × 0.025 = 12.5 kg at 35 soil points (schlechteste Parzelle)
-    CropType.SILOMAIS: 1200.0,
-    CropType.ZUCKERRUEBEN: 1500.0,
-    CropType.LUZERNE: 150.0,
-    CropType.GRAS: 200.0,
-    CropType.BLUEHMISCHUNG: 0.0,  # No harvest
-    CropType.ERBSEN: 57.5         # Erhöht um 15%: 50 * 1.15 = 57.5
+# Allowed order lifecycle moves: pending orders only get confirmed by payment,
+# after that orders may only move forward (stages can be skipped)
+ORDER_STATUS_TRANSITIONS = {
+    OrderStatus.PENDING: {OrderStatus.CONFIRMED},
+    OrderStatus.CONFIRMED: {OrderStatus.IMPLEMENTING, OrderStatus.GROWING, OrderStatus.HARVEST_READY},
+    OrderStatus.IMPLEMENTING: {OrderStatus.GROWING, OrderStatus.HARVEST_READY},
+    OrderStatus.GROWING: {OrderStatus.HARVEST_READY},
+    OrderStatus.HARVEST_READY: {OrderStatus.COMPLETED},
+    OrderStatus.COMPLETED: set()
 }
 
-# Seed costs per 250m² (in EUR)
-SEED_COSTS = {
-    CropType.WINTERWEIZEN: 2.10,  # 150kg/ha * 0.025ha * 0.56€/kg = 2.10€
-    CropType.WINTERROGGEN: 1.75,
-    CropType.WINTERGERSTE: 1.90,
-    CropType.WINTERTRITICALE: 1.85,
-    CropType.SILOMAIS: 12.50,
-    CropType.ZUCKERRUEBEN: 35.00,
-    CropType.LUZERNE: 8.75,
-    CropType.GRAS: 3.25,
-    CropType.BLUEHMISCHUNG: 15.00,
-    CropType.ERBSEN: 6.25
-}
+# Orders that are paid and still on the field
+ACTIVE_ORDER_STATUSES = [
+    OrderStatus.CONFIRMED,
+    OrderStatus.IMPLEMENTING,
+    OrderStatus.GROWING,
+    OrderStatus.HARVEST_READY
+]
 
-# Fertilizer specifications (updated with realistic mineral fertilizer calculations)
-FERTILIZER_SPECS = {
-    # Mineralische Düngung
-    FertilizerType.SSA: {
-        "name": "Schwefelsaurer Ammoniak (SSA)",
-        "n_content": 21,  # kg N in 100 kg SSA
-        "s_content": 24,  # % Schwefel
-        "price_per_ton": 350.0,  # EUR/t
-        "organic": False,
-        "category": "mineral"
-    },
-    FertilizerType.KAS: {
-        "name": "Kalkammonsalpeter (KAS)",
-        "n_content": 27,  # kg N in 100 kg KAS
-        "s_content": 0,
-        "price_per_ton": 300.0,  # EUR/t
-        "organic": False,
-        "category": "mineral"
-    },
-    # Organische Düngung
-    FertilizerType.SCHWEINEGULLE: {
-        "name": "Schweinegülle",
-        "n_content": 0.4,  # % Stickstoff (4 kg N/m³)
-        "s_content": 0,
-        "price_per_m3": 8.50,  # EUR/m³
-        "organic": True,
-        "category": "organic"
-    },
-    FertilizerType.RINDERGUELLE: {
-        "name": "Rindergülle",
-        "n_content": 0.35,  # % Stickstoff (3.5 kg N/m³)
-        "s_content": 0,
-        "price_per_m3": 7.80,  # EUR/m³
-        "organic": True,
-        "category": "organic"
-    },
-    FertilizerType.GAERREST: {
-        "name": "Gärrest (Biogasanlage)",
-        "n_content": 0.45,  # % Stickstoff (4.5 kg N/m³)
-        "s_content": 0,
-        "price_per_m3": 9.20,  # EUR/m³
-        "organic": True,
-        "category": "organic"
-    },
-    FertilizerType.RINDERMIST: {
-        "name": "Rindermist",
-        "n_content": 0.5,  # % Stickstoff (5 kg N/t)
-        "s_content": 0,
-        "price_per_m3": 15.00,  # EUR/m³ (umgerechnet von Tonnen)
-        "organic": True,
-        "category": "organic"
-    },
-    FertilizerType.KEINE_DUENGUNG: {
-        "name": "Ohne Düngung",
-        "n_content": 0,
-        "s_content": 0,
-        "price_per_unit": 0.00,  # EUR
-        "organic": False,
-        "category": "none"
-    }
-}
+# Legacy order documents may still carry an embedded advisories array
+ORDER_PROJECTION = {"advisories": 0}
 
-# Plant protection costs (35€/ha = 0.875€ per 250m²)
-PLANT_PROTECTION_COST_PER_250M2 = 0.88  # EUR per treatment
-
-# Nitrogen requirements per crop (kg N per ton of expected yield)
-N_REQUIREMENTS = {
-    CropType.WINTERWEIZEN: 23.0,  # kg N/t Ertrag
-    CropType.WINTERROGGEN: 20.0,
-    CropType.WINTERGERSTE: 18.0,
-    CropType.WINTERTRITICALE: 21.0,
-    CropType.SILOMAIS: 2.8,   # kg N/t Frischmasse
-    CropType.ZUCKERRUEBEN: 1.8,
-    CropType.LUZERNE: 0.0,    # Leguminose - bindet selbst Stickstoff
-    CropType.GRAS: 15.0,
-    CropType.BLUEHMISCHUNG: 8.0,
-    CropType.ERBSEN: 0.0      # Leguminose - bindet selbst Stickstoff
-}
+# Number of documents written per update_many / insert_many round-trip
+BULK_CHUNK_SIZE = 1000
 
 # Data Models
 class Plot(BaseModel):
@@ -328,6 +151,16 @@ class Plot(BaseModel):
     image_url: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+class CropHint(BaseModel):
+    crop_type: CropType
+    fertilizer_type: FertilizerType
+    harvest_option: HarvestOption
+    profit_loss: float
+    payment_amount: float
+
+class PlotWithHints(Plot):
+    best_crops: List[CropHint] = []  # Precomputed, see refresh_crop_recommendations
+
 class PlotCreate(BaseModel):
     name: str
     soil_type: SoilType
@@ -395,6 +228,9 @@ class Advisory(BaseModel):
     order_id: str
     message: str
     advisory_type: str  # "disease", "pest", "fungicide", "insecticide", "general"
+    broadcast_id: Optional[str] = None  # Set when sent as part of a broadcast
+    rule_id: Optional[str] = None  # Set when generated by the advisory rules engine
+    rule_window: Optional[int] = None  # Cooldown window of a rule advisory (rules_engine.advisory_window)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     acknowledged: bool = False
 
@@ -414,10 +250,10 @@ class Order(BaseModel):
     expected_yield_kg: float
     expected_market_value: float
     profit_loss: float  # Gewinn/Verlust = expected_market_value - total_cost
+    cart_id: Optional[str] = None  # Set for orders placed together via /orders/cart
     payment_data: Optional[PaymentData] = None
     status: OrderStatus = OrderStatus.PENDING
     notes: Optional[str] = None
-    advisories: List[Advisory] = []
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -429,14 +265,128 @@ class OrderCreate(BaseModel):
     farming_decision: FarmingDecision
     notes: Optional[str] = None
 
+class CartItem(BaseModel):
+    plot_id: str
+    farming_decision: FarmingDecision
+
+class CartCheckout(BaseModel):
+    user_name: str
+    user_email: str
+    user_phone: Optional[str] = None
+    items: List[CartItem] = Field(min_length=1)
+    notes: Optional[str] = None
+
 class OrderUpdate(BaseModel):
     status: OrderStatus
     notes: Optional[str] = None
 
+class OrderFilter(BaseModel):
+    status: Optional[List[OrderStatus]] = None
+    crop_type: Optional[CropType] = None
+    cultivation_method: Optional[CultivationMethod] = None
+    plot_ids: Optional[List[str]] = None
+    locations: Optional[List[str]] = None  # Region, matched against the plot location
+
+class BulkOrderStatusUpdate(BaseModel):
+    status: OrderStatus
+    order_ids: Optional[List[str]] = None  # Either explicit IDs ...
+    filter: Optional[OrderFilter] = None   # ... or a filter over all orders
+    notes: Optional[str] = None
+
+class AdvisoryBroadcast(BaseModel):
+    message: str
+    advisory_type: str
+    filter: OrderFilter = OrderFilter()  # Defaults to all active orders
+
+class WeatherCondition(BaseModel):
+    min_temperature: Optional[float] = None  # °C
+    max_temperature: Optional[float] = None
+    min_humidity: Optional[float] = None  # %
+    max_humidity: Optional[float] = None
+    min_precipitation_mm: Optional[float] = None
+
+class WeatherObservation(BaseModel):
+    temperature: Optional[float] = None
+    humidity: Optional[float] = None
+    precipitation_mm: Optional[float] = None
+
+class AdvisoryRuleCreate(BaseModel):
+    name: str
+    message: str
+    advisory_type: str
+    # Empty condition lists match every value
+    crop_types: List[CropType] = []
+    cultivation_methods: List[CultivationMethod] = []
+    fertilizer_types: List[FertilizerType] = []
+    seasons: List[str] = []  # 'fruejahr', 'sommer', 'herbst', 'winter'
+    weather: Optional[WeatherCondition] = None
+    cooldown_days: Optional[int] = Field(default=None, ge=1)  # None = advise each order only once
+    active: bool = True
+
+class AdvisoryRule(AdvisoryRuleCreate):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class RuleEvaluationRequest(BaseModel):
+    weather: Dict[str, WeatherObservation] = {}  # Observations keyed by plot location
+
+class QuoteRequest(BaseModel):
+    plot_id: str
+    crop_type: CropType
+    cultivation_method: CultivationMethod = CultivationMethod.KONVENTIONELL
+    fertilizer_choice: Optional[FertilizerChoice] = None
+    machines: WorkingStepMachines = WorkingStepMachines()
+    harvest_option: HarvestOption
+
+class ScenarioSweepRequest(BaseModel):
+    plot_ids: Optional[List[str]] = None  # Default: all plots
+    cultivation_method: Optional[CultivationMethod] = None
+    limit: Optional[int] = Field(default=None, ge=1)  # Top N scenarios per plot
+
+class NitrogenNeedItem(BaseModel):
+    crop_type: CropType
+    expected_yield_kg: float = Field(ge=0)
+
+class NitrogenNeedBatch(BaseModel):
+    items: List[NitrogenNeedItem]
+
+class FertilizerMixRequest(BaseModel):
+    plot_id: str
+    crop_type: CropType
+    cultivation_method: CultivationMethod = CultivationMethod.KONVENTIONELL
+    s_requirement_kg: float = Field(default=0.0, ge=0)  # Optional sulphur need per plot
+    max_amounts: Dict[FertilizerType, float] = {}  # Overrides FERTILIZER_MAX_AMOUNTS_250M2
+
+class RotationPlanRequest(BaseModel):
+    plot_id: str
+    years: int = Field(default=3, ge=1, le=10)
+    cultivation_method: CultivationMethod = CultivationMethod.KONVENTIONELL
+    harvest_option: HarvestOption = HarvestOption.SELL_TO_FARMER
+    previous_crops: List[CropType] = []  # Crops already grown on the plot, oldest first
+    allowed_crops: Optional[List[CropType]] = None
+    fixed_crops: List[Optional[CropType]] = []  # Pinned crop per season, None leaves it open
+
+class PortfolioRequest(BaseModel):
+    plot_ids: List[str] = Field(min_length=1)
+    budget: float = Field(ge=0)  # Maximum sum of payment amounts (EUR)
+    objective: Objective = Objective.PROFIT
+    cultivation_method: Optional[CultivationMethod] = None
+    crop_types: Optional[List[CropType]] = None
+    harvest_options: Optional[List[HarvestOption]] = None
+
+class OrderBookRiskRequest(BaseModel):
+    filter: Optional[OrderFilter] = None  # Default: all orders not yet completed
+    samples: int = Field(default=BOOK_SAMPLES, ge=100, le=ORDER_SAMPLES)
+    seed: Optional[int] = None
+    limit: int = Field(default=50, ge=0)  # Riskiest orders listed in the response
+
 class PayPalOrderCreate(BaseModel):
     order_id: str
     amount: float
 
+class PayPalCartOrderCreate(BaseModel):
+    cart_id: str
+
 class PayPalOrderCapture(BaseModel):
     paypal_order_id: str
 
@@ -446,14 +396,17 @@ async def root():
     return {"message": "Lust auf Landwirtschaft API"}
 
 # Plot management
-@api_router.get("/plots", response_model=List[Plot])
+@api_router.get("/plots", response_model=List[PlotWithHints])
 async def get_plots():
-    plots = await db.plots.find({"available": True}).to_list(1000)
-    return [Plot(**plot) for plot in plots]
+    if catalog_snapshot is not None:
+        plots = [plot for plot in catalog_snapshot["plots"] if plot.get("available", True)][:1000]
+    else:
+        plots = await hot_reads.do("plots", lambda: repos.plots.find({"available": True}, limit=1000))
+    return [PlotWithHints(**plot, best_crops=crop_recommendations.get(plot["id"])) for plot in plots]
 
 @api_router.get("/plots/{plot_id}", response_model=Plot)
 async def get_plot(plot_id: str):
-    plot = await db.plots.find_one({"id": plot_id})
+    plot = await repos.plots.get(plot_id)
     if not plot:
         raise HTTPException(status_code=404, detail="Parzelle nicht gefunden")
     return Plot(**plot)
@@ -461,31 +414,131 @@ async def get_plot(plot_id: str):
 @api_router.post("/plots", response_model=Plot)
 async def create_plot(plot_data: PlotCreate):
     plot = Plot(**plot_data.dict())
-    await db.plots.insert_one(plot.dict())
+    await repos.plots.insert(plot.dict())
+    schedule_recommendation_refresh([plot.id])
     return plot
 
 # Machine management
 @api_router.get("/machines", response_model=List[Machine])
 async def get_machines():
-    machines = await db.machines.find().to_list(1000)
+    if catalog_snapshot is not None:
+        machines = catalog_snapshot["machines"][:1000]
+    else:
+        machines = await hot_reads.do("machines", lambda: repos.machines.find(limit=1000))
     return [Machine(**machine) for machine in machines]
 
 @api_router.get("/machines/{machine_type}")
 async def get_machines_by_type(machine_type: MachineType):
-    machines = await db.machines.find({"type": machine_type}).to_list(1000)
+    machines = await repos.machines.find({"type": machine_type}, limit=1000)
     return [Machine(**machine) for machine in machines]
 
 @api_router.get("/machines/step/{working_step}")
 async def get_machines_by_working_step(working_step: WorkingStep):
-    machines = await db.machines.find({"working_step": working_step}).to_list(1000)
+    machines = await repos.machines.find({"working_step": working_step}, limit=1000)
     return [Machine(**machine) for machine in machines]
 
 @api_router.post("/machines", response_model=Machine)
 async def create_machine(machine_data: MachineCreate):
     machine = Machine(**machine_data.dict())
-    await db.machines.insert_one(machine.dict())
+    await repos.machines.insert(machine.dict())
+    schedule_recommendation_refresh()
     return machine
 
+@api_router.get("/bootstrap")
+async def get_bootstrap():
+    """Everything the configurator needs on first load, in one request"""
+    plots, machines = await asyncio.gather(get_plots(), get_machines())
+    return {
+        "plots": plots,
+        "machines": machines,
+        "market_values": MARKET_VALUES_250M2,
+        "seed_costs": SEED_COSTS,
+        "fertilizer_specs": FERTILIZER_SPECS,
+        "nitrogen_requirements": N_REQUIREMENTS
+    }
+
+# Crop recommendations, recomputed only when prices, plots or machines change
+crop_recommendations = CropRecommendationCache()
+recommendation_refresh_task = None
+# Plots written since the last refresh; None stands for the whole catalog
+recommendation_refresh_pending = set()
+RANKING_FIELDS = {"id": 1, "soil_points": 1, "price_per_plot": 1}
+
+async def refresh_crop_recommendations():
+    plots, machines = await asyncio.gather(repos.plots.find({}, RANKING_FIELDS), repos.machines.find())
+    recomputed = crop_recommendations.refresh(plots, machines)
+    if recomputed:
+        logger.info(f"Crop recommendations recomputed for {recomputed} plots")
+
+async def refresh_plot_recommendations(plot_ids):
+    """Re-check only the given plots; most plot writes (reservations) leave their ranking unchanged"""
+    plots = await repos.plots.get_many(plot_ids, RANKING_FIELDS)
+    found = {plot["id"] for plot in plots}
+    recomputed = crop_recommendations.update_plots(plots, removed=[plot_id for plot_id in plot_ids if plot_id not in found])
+    if recomputed:
+        logger.info(f"Crop recommendations recomputed for {recomputed} plots")
+
+async def run_recommendation_refreshes():
+    while recommendation_refresh_pending:
+        pending = set(recommendation_refresh_pending)
+        recommendation_refresh_pending.clear()
+        if None in pending or crop_recommendations.tables is None:
+            await refresh_crop_recommendations()
+        else:
+            await refresh_plot_recommendations(list(pending))
+
+def load_catalog_snapshot():
+    """Serve plots and machines from the snapshot file until the database is warm"""
+    global catalog_snapshot
+    snapshot = load_snapshot(CATALOG_SNAPSHOT)
+    if snapshot is None:
+        return False
+    plots, machines = snapshot
+    catalog_snapshot = {"plots": plots, "machines": machines}
+    crop_recommendations.refresh(plots, machines)
+    logger.info(f"Serving catalog snapshot ({len(plots)} plots, {len(machines)} machines) during warm-up")
+    return True
+
+def preload_shared_state():
+    """Build read-only state in the gunicorn master so forked workers share it"""
+    if CATALOG_SNAPSHOT and catalog_snapshot is None:
+        load_catalog_snapshot()
+
+async def save_catalog_snapshot():
+    plots, machines = await asyncio.gather(repos.plots.find(), repos.machines.find())
+    await asyncio.to_thread(write_snapshot, CATALOG_SNAPSHOT, plots, machines)
+
+async def load_catalog():
+    """Warm the catalog from the database and switch off the snapshot"""
+    global catalog_snapshot
+    await refresh_crop_recommendations()
+    if CATALOG_SNAPSHOT:
+        await save_catalog_snapshot()
+    catalog_snapshot = None
+
+def subscribe_to_invalidations():
+    """Evict cached reads and recompute recommendations when the catalog or orders change"""
+    for collection in WATCHED_COLLECTIONS:
+        cached = find_layer(getattr(repos, collection), CachedRepository)
+        if cached is not None:
+            invalidation_bus.subscribe(collection, cached.invalidate)
+    invalidation_bus.subscribe("plots", schedule_recommendation_refresh)
+    invalidation_bus.subscribe("machines", lambda ids: schedule_recommendation_refresh())
+    for collection, keys in HOT_READ_KEYS.items():
+        for key in keys:
+            invalidation_bus.subscribe(collection, lambda ids, key=key: hot_reads.forget(key))
+
+def schedule_recommendation_refresh(plot_ids=None):
+    """Refresh recommendations in the background; triggers arriving meanwhile are merged into one more run.
+
+    plot_ids limits the refresh to those plots; None re-checks the whole catalog.
+    """
+    global recommendation_refresh_task
+    recommendation_refresh_pending.update([None] if plot_ids is None else plot_ids)
+    if recommendation_refresh_task is None or recommendation_refresh_task.done():
+        recommendation_refresh_task = asyncio.create_task(run_recommendation_refreshes())
+    return recommendation_refresh_task
+
 # Get expected yields based on soil points
 @api_router.get("/expected-yields/{soil_points}")
 async def get_expected_yields_by_soil(soil_points: int):
@@ -499,29 +552,63 @@ async def get_expected_yields_by_soil(soil_points: int):
     
     return yields
 
+@api_router.get("/yield-model")
+async def get_yield_model(request: Request):
+    return REFERENCE_PAYLOADS["yield_model"].response(request)
+
+@api_router.get("/yield-curve/{crop_type}/{soil_points}")
+async def get_yield_curve(crop_type: CropType, soil_points: int, steps: int = Query(11, ge=2, le=101)):
+    """Expected yield over N rates from 0 to twice the crop's requirement"""
+    if soil_points < 25 or soil_points > 56:
+        raise HTTPException(status_code=400, detail="Bodenpunkte müssen zwischen 25 und 56 liegen")
+    
+    reference_yield = calculate_yield_by_soil_points(crop_type, soil_points)
+    index = YIELD_MODEL.index[crop_type]
+    reference_n = reference_yield / 1000 * YIELD_MODEL.n_requirement[index]
+    n_rates = np.linspace(0, 2 * reference_n, steps)
+    factors = YIELD_MODEL.yield_factor(index, n_rates, reference_n)
+    
+    return {
+        "crop_type": crop_type,
+        "soil_points": soil_points,
+        "yield_model_version": YIELD_MODEL.version,
+        "n_requirement_kg": round(float(reference_n), 3),
+        "curve": [
+            {"n_kg": round(float(n_rate), 3), "expected_yield_kg": round(float(reference_yield * factor), 1)}
+            for n_rate, factor in zip(n_rates, factors)
+        ]
+    }
+
+# Constant reference data, serialized and compressed once per process (in the gunicorn master when preloading)
+REFERENCE_PAYLOADS = {
+    "market_values": PrecompressedPayload(MARKET_VALUES_250M2),
+    "seed_costs": PrecompressedPayload(SEED_COSTS),
+    "fertilizer_specs": PrecompressedPayload(FERTILIZER_SPECS),
+    "nitrogen_requirements": PrecompressedPayload(N_REQUIREMENTS),
+    "yield_model": PrecompressedPayload(YIELD_MODEL.as_dict())
+}
+
 @api_router.get("/market-values")
-async def get_market_values():
-    return MARKET_VALUES_250M2
+async def get_market_values(request: Request):
+    return REFERENCE_PAYLOADS["market_values"].response(request)
 
 @api_router.get("/seed-costs")
-async def get_seed_costs():
-    return SEED_COSTS
+async def get_seed_costs(request: Request):
+    return REFERENCE_PAYLOADS["seed_costs"].response(request)
 
 @api_router.get("/fertilizer-specs")
-async def get_fertilizer_specs():
-    return FERTILIZER_SPECS
+async def get_fertilizer_specs(request: Request):
+    return REFERENCE_PAYLOADS["fertilizer_specs"].response(request)
 
 @api_router.get("/nitrogen-requirements")
-async def get_nitrogen_requirements():
-    return N_REQUIREMENTS
+async def get_nitrogen_requirements(request: Request):
+    return REFERENCE_PAYLOADS["nitrogen_requirements"].response(request)
 
 # PayPal payment endpoints
 @api_router.post("/payments/create-paypal-order")
 async def create_paypal_order(order_data: PayPalOrderCreate):
     try:
-        request = OrdersCreateRequest()
-        request.prefer('return=representation')
-        request.request_body({
+        response = payment_gateway.create_order({
             "intent": "CAPTURE",
             "purchase_units": [{
                 "reference_id": order_data.order_id,
@@ -532,53 +619,89 @@ async def create_paypal_order(order_data: PayPalOrderCreate):
             }]
         })
         
-        response = paypal_client.execute(request)
-        
         # Update order with payment data
-        await db.orders.update_one(
-            {"id": order_data.order_id},
+        await repos.orders.update(
+            order_data.order_id,
             {
-                "$set": {
-                    "payment_data": {
-                        "paypal_order_id": response.result.id,
-                        "amount": order_data.amount,
-                        "currency": "EUR",
-                        "status": PaymentStatus.PENDING,
-                        "created_at": datetime.utcnow()
-                    }
+                "payment_data": {
+                    "paypal_order_id": response.result.id,
+                    "amount": order_data.amount,
+                    "currency": "EUR",
+                    "status": PaymentStatus.PENDING,
+                    "created_at": datetime.utcnow()
                 }
             }
         )
         
         return {"paypal_order_id": response.result.id}
-    except HttpError as e:
+    except PaymentError as e:
+        raise HTTPException(status_code=400, detail=f"PayPal error: {e}")
+
+@api_router.post("/payments/create-paypal-cart-order")
+async def create_paypal_cart_order(cart_data: PayPalCartOrderCreate):
+    """One PayPal order covering every order of a cart; the amount is summed server-side"""
+    orders = await repos.orders.find({"cart_id": cart_data.cart_id}, {"id": 1, "total_cost": 1})
+    if not orders:
+        raise HTTPException(status_code=404, detail="Warenkorb nicht gefunden")
+    amount = round(sum(order["total_cost"] for order in orders), 2)
+    if amount <= 0:
+        raise HTTPException(status_code=400, detail="Kein Zahlungsbetrag für diesen Warenkorb")
+    
+    try:
+        response = payment_gateway.create_order({
+            "intent": "CAPTURE",
+            "purchase_units": [{
+                "reference_id": cart_data.cart_id,
+                "description": f"{len(orders)} Parzellen",
+                "amount": {
+                    "currency_code": "EUR",
+                    "value": f"{amount:.2f}"
+                }
+            }]
+        })
+        
+        await repos.orders.update_where(
+            {"cart_id": cart_data.cart_id},
+            {
+                "payment_data": {
+                    "paypal_order_id": response.result.id,
+                    "amount": amount,
+                    "currency": "EUR",
+                    "status": PaymentStatus.PENDING,
+                    "created_at": datetime.utcnow()
+                }
+            }
+        )
+        
+        return {"paypal_order_id": response.result.id, "amount": amount, "orders": len(orders)}
+    except PaymentError as e:
         raise HTTPException(status_code=400, detail=f"PayPal error: {e}")
 
 @api_router.post("/payments/capture-paypal-order")
 async def capture_paypal_order(capture_data: PayPalOrderCapture):
     try:
-        request = OrdersCaptureRequest(capture_data.paypal_order_id)
-        response = paypal_client.execute(request)
+        response = payment_gateway.capture_order(capture_data.paypal_order_id)
         
-        # Find order by PayPal order ID
-        order = await db.orders.find_one({"payment_data.paypal_order_id": capture_data.paypal_order_id})
-        if not order:
+        # Find orders by PayPal order ID (several for a cart)
+        paid_query = {"payment_data.paypal_order_id": capture_data.paypal_order_id}
+        orders = await repos.orders.find(paid_query, {"id": 1, "user_email": 1})
+        if not orders:
             raise HTTPException(status_code=404, detail="Order not found")
         
         # Update payment status
-        await db.orders.update_one(
-            {"id": order["id"]},
+        await repos.orders.update_where(
+            paid_query,
             {
-                "$set": {
-                    "payment_data.status": PaymentStatus.COMPLETED,
-                    "status": OrderStatus.CONFIRMED,
-                    "updated_at": datetime.utcnow()
-                }
+                "payment_data.status": PaymentStatus.COMPLETED,
+                "status": OrderStatus.CONFIRMED,
+                "updated_at": datetime.utcnow()
             }
         )
+        for order in orders:
+            publish_order_status(order["id"], order.get("user_email"), OrderStatus.CONFIRMED)
         
         return {"status": "success", "capture_id": response.result.id}
-    except HttpError as e:
+    except PaymentError as e:
         raise HTTPException(status_code=400, detail=f"PayPal error: {e}")
 
 # Calculate nitrogen requirement for specific crop and yield
@@ -605,357 +728,878 @@ async def calculate_nitrogen_need(crop_type: CropType, expected_yield_kg: float)
 
 def calculate_fertilizer_options(n_requirement_kg: float):
     """Calculate fertilizer amounts and costs for different fertilizer types"""
-    options = []
-    
-    for fert_type, specs in FERTILIZER_SPECS.items():
-        if specs["category"] == "organic":
-            # Organic fertilizers (m³ or t)
-            if fert_type == FertilizerType.RINDERMIST:
-                # Rindermist: price per ton, N content as % (5 kg N/t)
-                n_content_per_ton = specs["n_content"] * 10  # Convert % to kg/t
-                required_amount = n_requirement_kg / n_content_per_ton if n_content_per_ton > 0 else 0
-                cost = required_amount * specs["price_per_ton"]
-                unit = "t"
-            else:
-                # Other organic fertilizers: price per m³
-                n_content_per_m3 = specs["n_content"] * 10  # Convert % to kg/m³
-                required_amount = n_requirement_kg / n_content_per_m3 if n_content_per_m3 > 0 else 0
-                cost = required_amount * specs["price_per_m3"]
-                unit = "m³"
-            
-            options.append({
-                "fertilizer_type": fert_type,
-                "name": specs["name"],
-                "required_amount": round(required_amount, 2),
-                "unit": unit,
-                "cost": round(cost, 2),
-                "organic": True
-            })
-        elif specs["category"] == "mineral":
-            # Mineral fertilizers (kg) - corrected calculation for 250m²
-            n_content_percent = specs["n_content"] / 100  # Convert to decimal (21% = 0.21)
-            required_amount = n_requirement_kg / n_content_percent if n_content_percent > 0 else 0
-            cost = (required_amount / 1000) * specs["price_per_ton"]  # Convert kg to tons for cost
-            
-            options.append({
-                "fertilizer_type": fert_type,
-                "name": specs["name"],
-                "required_amount": round(required_amount, 2),
-                "unit": "kg",
-                "cost": round(cost, 2),
-                "organic": False
-            })
-        else:
-            # No fertilizer option
-            options.append({
-                "fertilizer_type": fert_type,
-                "name": specs["name"],
-                "required_amount": 0,
-                "unit": "",
-                "cost": 0,
-                "organic": False
-            })
-    
-    return options
+    amounts, costs = FERTILIZER_TABLE.price([n_requirement_kg])
+    return FERTILIZER_TABLE.options(amounts[0], costs[0])
+
+@api_router.post("/calculate-nitrogen-need/batch")
+async def calculate_nitrogen_need_batch(batch: NitrogenNeedBatch):
+    """Price every fertilizer for many (crop, yield) pairs in one vectorized call"""
+    unknown_crops = sorted({item.crop_type.value for item in batch.items if item.crop_type not in N_REQUIREMENTS})
+    if unknown_crops:
+        raise HTTPException(status_code=404, detail=f"Kultur nicht gefunden: {', '.join(unknown_crops)}")
+    
+    n_per_ton = np.array([N_REQUIREMENTS[item.crop_type] for item in batch.items], dtype=float)
+    yield_tons = np.array([item.expected_yield_kg for item in batch.items], dtype=float) / 1000
+    n_requirements = yield_tons * n_per_ton
+    amounts, costs = FERTILIZER_TABLE.price(n_requirements)
+    
+    return [
+        {
+            "crop_type": item.crop_type,
+            "expected_yield_kg": item.expected_yield_kg,
+            "expected_yield_tons": float(yield_tons[index]),
+            "n_requirement_per_ton": float(n_per_ton[index]),
+            "total_n_requirement_kg": float(n_requirements[index]),
+            "fertilizer_options": FERTILIZER_TABLE.options(amounts[index], costs[index])
+        }
+        for index, item in enumerate(batch.items)
+    ]
 
-# Order management
-@api_router.post("/orders", response_model=Order)
-async def create_order(order_data: OrderCreate):
-    # Calculate total cost
-    plot = await db.plots.find_one({"id": order_data.plot_id})
+@api_router.post("/fertilizer-mix")
+async def get_fertilizer_mix(mix_request: FertilizerMixRequest):
+    """Cheapest fertilizer combination covering the crop's N (and optional S) need on a plot"""
+    if mix_request.crop_type not in N_REQUIREMENTS:
+        raise HTTPException(status_code=404, detail="Kultur nicht gefunden")
+    plot = await repos.plots.get(mix_request.plot_id, {"soil_points": 1})
     if not plot:
         raise HTTPException(status_code=404, detail="Parzelle nicht gefunden")
     
-    plot_cost = plot["price_per_plot"]
-    
-    # Get machine costs
-    all_machine_ids = (
-        order_data.farming_decision.machines.bodenbearbeitung +
-        order_data.farming_decision.machines.aussaat +
-        order_data.farming_decision.machines.pflanzenschutz +
-        order_data.farming_decision.machines.duengung +
-        order_data.farming_decision.machines.pflege +
-        order_data.farming_decision.machines.ernte
+    expected_yield = calculate_yield_by_soil_points(mix_request.crop_type, plot["soil_points"])
+    n_requirement = expected_yield / 1000 * N_REQUIREMENTS[mix_request.crop_type]
+    result = optimize_mix(
+        round(n_requirement, 3),
+        mix_request.s_requirement_kg,
+        mix_request.cultivation_method == CultivationMethod.BIOLOGISCH,
+        tuple(sorted(mix_request.max_amounts.items()))
     )
+    if result is None:
+        raise HTTPException(status_code=400, detail="Bedarf mit den zulässigen Düngermengen nicht deckbar")
     
-    machine_cost = 0
-    for machine_id in all_machine_ids:
-        machine = await db.machines.find_one({"id": machine_id})
-        if machine:
-            machine_cost += machine["price_per_use"]
-    
-    # Calculate expected yield and market value based on soil points
-    plot = await db.plots.find_one({"id": order_data.plot_id})
+    return {
+        "crop_type": mix_request.crop_type,
+        "expected_yield_kg": expected_yield,
+        "n_requirement_kg": round(n_requirement, 2),
+        "s_requirement_kg": mix_request.s_requirement_kg,
+        **result
+    }
+
+# Pricing
+def all_machine_ids(machines: WorkingStepMachines):
+    return (
+        machines.bodenbearbeitung +
+        machines.aussaat +
+        machines.pflanzenschutz +
+        machines.duengung +
+        machines.pflege +
+        machines.ernte
+    )
+
+async def load_machine_price_map(machine_ids):
+    """Prices of the given machines with one query"""
+    machines = await repos.machines.get_many(set(machine_ids), {"id": 1, "price_per_use": 1})
+    return {machine["id"]: machine["price_per_use"] for machine in machines}
+
+def machine_price_key(machine_ids, prices):
+    """Pricing key for a machine selection; unknown IDs are ignored"""
+    return tuple(sorted((machine_id, prices[machine_id]) for machine_id in machine_ids if machine_id in prices))
+
+async def load_machine_prices(machine_ids):
+    return machine_price_key(machine_ids, await load_machine_price_map(machine_ids))
+
+async def price_decision(plot, crop_type, cultivation_method, fertilizer_choice: Optional[FertilizerChoice],
+                         machines: WorkingStepMachines, harvest_option):
+    machine_prices = await load_machine_prices(all_machine_ids(machines))
+    return quote_decision(plot, crop_type, cultivation_method, fertilizer_choice, machine_prices, harvest_option)
+
+def quote_decision(plot, crop_type, cultivation_method, fertilizer_choice: Optional[FertilizerChoice],
+                   machine_prices, harvest_option):
+    if fertilizer_choice is None:
+        fertilizer_cost, applied_n = 0, None  # Priced at the full N requirement
+    else:
+        fertilizer_cost = fertilizer_choice.cost
+        applied_n = round(applied_nitrogen_kg(fertilizer_choice.fertilizer_type, fertilizer_choice.amount), 3)
+    return quote(
+        plot["price_per_plot"],
+        plot["soil_points"],
+        crop_type,
+        fertilizer_cost,
+        machine_prices,
+        harvest_option,
+        applied_n,
+        cultivation_method
+    )
+
+@api_router.post("/quote")
+async def get_quote(quote_request: QuoteRequest):
+    """Price a farming decision without creating an order"""
+    plot = await repos.plots.get(quote_request.plot_id, {"price_per_plot": 1, "soil_points": 1})
     if not plot:
         raise HTTPException(status_code=404, detail="Parzelle nicht gefunden")
     
-    crop_type = order_data.farming_decision.crop_type
-    soil_points = plot["soil_points"]
-    expected_yield = calculate_yield_by_soil_points(crop_type, soil_points)
-    market_price_per_ton = MARKET_PRICES.get(crop_type, 0)
-    expected_market_value = (expected_yield / 1000) * market_price_per_ton  # Convert kg to tons
+    breakdown = await price_decision(
+        plot,
+        quote_request.crop_type,
+        quote_request.cultivation_method,
+        quote_request.fertilizer_choice,
+        quote_request.machines,
+        quote_request.harvest_option
+    )
+    return breakdown.as_dict()
+
+@api_router.post("/scenario-sweep")
+async def scenario_sweep(sweep_request: ScenarioSweepRequest):
+    """Rank every crop × fertilizer × harvest option combination per plot by profit"""
+    query = {}
+    if sweep_request.plot_ids is not None:
+        query["id"] = {"$in": sweep_request.plot_ids}
+    plots = await repos.plots.find(query, {"id": 1, "name": 1, "soil_points": 1, "price_per_plot": 1})
+    if not plots:
+        raise HTTPException(status_code=404, detail="Parzelle nicht gefunden")
+    machines = await repos.machines.find()
     
-    # Add fertilizer cost
-    fertilizer_cost = order_data.farming_decision.fertilizer_choice.cost
+    started = time.perf_counter()
+    tables = SweepTables(machines)
+    result = sweep(
+        tables,
+        [plot["price_per_plot"] for plot in plots],
+        [plot["soil_points"] for plot in plots],
+        sweep_request.cultivation_method
+    )
+    ranked_plots = [
+        {
+            "plot_id": plot["id"],
+            "name": plot["name"],
+            "soil_points": plot["soil_points"],
+            "scenarios": rank(result, index, sweep_request.limit)
+        }
+        for index, plot in enumerate(plots)
+    ]
     
-    # Add shipping cost if applicable
-    shipping_cost = 0
-    if order_data.farming_decision.harvest_option == HarvestOption.SHIP_HOME:
-        shipping_cost = 25.0  # Fixed shipping cost
+    return {
+        "plots": ranked_plots,
+        "combinations": int(result["total_cost"].size),
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+
+@api_router.post("/portfolio")
+async def optimize_plot_portfolio(portfolio_request: PortfolioRequest):
+    """Choose crop, fertilizer and harvest option for several plots within a budget"""
+    plot_ids = list(dict.fromkeys(portfolio_request.plot_ids))
+    plots = await repos.plots.get_many(
+        plot_ids,
+        {"id": 1, "name": 1, "soil_points": 1, "price_per_plot": 1, "available": 1}
+    )
+    if len(plots) != len(plot_ids):
+        raise HTTPException(status_code=404, detail="Parzelle nicht gefunden")
+    unavailable = [plot["id"] for plot in plots if not plot.get("available", True)]
+    plots = [plot for plot in plots if plot.get("available", True)]
+    machines = await repos.machines.find()
     
-    # Calculate total costs
-    total_cost = plot_cost + machine_cost + fertilizer_cost + shipping_cost
+    started = time.perf_counter()
+    selections, solver = [], None
+    if plots:
+        result = sweep(
+            SweepTables(machines),
+            [plot["price_per_plot"] for plot in plots],
+            [plot["soil_points"] for plot in plots],
+            portfolio_request.cultivation_method
+        )
+        selections, solver = optimize_portfolio(
+            result,
+            portfolio_request.budget,
+            portfolio_request.objective,
+            portfolio_request.crop_types,
+            portfolio_request.harvest_options
+        )
     
-    # Calculate profit/loss
-    profit_loss = expected_market_value - total_cost
+    assignments = [
+        {"plot_id": plot["id"], "name": plot["name"], **selection}
+        for plot, selection in zip(plots, selections)
+        if selection is not None
+    ]
+    return {
+        "objective": portfolio_request.objective,
+        "solver": solver,
+        "budget": portfolio_request.budget,
+        "total_payment_amount": round(sum(assignment["payment_amount"] for assignment in assignments), 2),
+        "total_profit_loss": round(sum(assignment["profit_loss"] for assignment in assignments), 2),
+        "total_objective_value": round(sum(assignment["objective_value"] for assignment in assignments), 2),
+        "assignments": assignments,
+        "unassigned_plot_ids": [plot["id"] for plot, selection in zip(plots, selections) if selection is None],
+        "unavailable_plot_ids": unavailable,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+
+@api_router.post("/rotation-plan")
+async def get_rotation_plan(plan_request: RotationPlanRequest):
+    """Most profitable multi-year crop rotation for one plot"""
+    if len(plan_request.fixed_crops) > plan_request.years:
+        raise HTTPException(status_code=400, detail="Mehr festgelegte Kulturen als Anbaujahre")
+    plot = await repos.plots.get(plan_request.plot_id, {"price_per_plot": 1, "soil_points": 1})
+    if not plot:
+        raise HTTPException(status_code=404, detail="Parzelle nicht gefunden")
+    machines = await repos.machines.find()
     
-    # Calculate actual payment amount based on harvest option
-    if order_data.farming_decision.harvest_option == HarvestOption.SELL_TO_FARMER:
-        # Customer pays only the net loss (if any), farmer buys the harvest
-        actual_payment = max(0, total_cost - expected_market_value)
-    else:
-        # Customer pays all costs and keeps the harvest
-        actual_payment = total_cost
+    started = time.perf_counter()
+    plan = plan_rotation(
+        plot,
+        machines,
+        plan_request.years,
+        plan_request.cultivation_method,
+        plan_request.harvest_option,
+        tuple(plan_request.previous_crops),
+        plan_request.allowed_crops,
+        tuple(plan_request.fixed_crops)
+    )
+    if plan is None:
+        raise HTTPException(status_code=422, detail="Keine zulässige Fruchtfolge für diese Vorgaben")
+    
+    return {
+        "plot_id": plan_request.plot_id,
+        **plan,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+
+# Order management
+@api_router.post("/orders", response_model=Order)
+async def create_order(order_data: OrderCreate):
+    plot = await repos.plots.get(order_data.plot_id)
+    if not plot:
+        raise HTTPException(status_code=404, detail="Parzelle nicht gefunden")
+    
+    decision = order_data.farming_decision
+    breakdown = await price_decision(
+        plot,
+        decision.crop_type,
+        decision.cultivation_method,
+        decision.fertilizer_choice,
+        decision.machines,
+        decision.harvest_option
+    )
     
     order = Order(
         **order_data.dict(),
-        total_cost=actual_payment,  # This is what customer actually pays
-        expected_yield_kg=expected_yield,
-        expected_market_value=expected_market_value,
-        profit_loss=profit_loss
+        total_cost=breakdown.payment_amount,  # This is what customer actually pays
+        expected_yield_kg=breakdown.expected_yield_kg,
+        expected_market_value=breakdown.expected_market_value,
+        profit_loss=breakdown.profit_loss
     )
-    await db.orders.insert_one(order.dict())
+    await repos.orders.insert(order.dict())
     
     # Mark plot as unavailable
-    await db.plots.update_one({"id": order_data.plot_id}, {"$set": {"available": False}})
+    await repos.plots.update(order_data.plot_id, {"available": False})
     
     return order
 
+@api_router.post("/orders/cart")
+async def checkout_cart(cart: CartCheckout):
+    """Order several plots at once: one pricing pass, one reservation, one insert"""
+    plot_ids = [item.plot_id for item in cart.items]
+    if len(set(plot_ids)) != len(plot_ids):
+        raise HTTPException(status_code=400, detail="Parzelle mehrfach im Warenkorb")
+    plots = await repos.plots.get_many(plot_ids)
+    plots_by_id = {plot["id"]: plot for plot in plots}
+    if len(plots_by_id) != len(plot_ids):
+        raise HTTPException(status_code=404, detail="Parzelle nicht gefunden")
+    
+    machine_prices = await load_machine_price_map(
+        [machine_id for item in cart.items for machine_id in all_machine_ids(item.farming_decision.machines)]
+    )
+    cart_id = str(uuid.uuid4())
+    customer = cart.dict(exclude={"items"})
+    orders = []
+    for item in cart.items:
+        decision = item.farming_decision
+        breakdown = quote_decision(
+            plots_by_id[item.plot_id],
+            decision.crop_type,
+            decision.cultivation_method,
+            decision.fertilizer_choice,
+            machine_price_key(all_machine_ids(decision.machines), machine_prices),
+            decision.harvest_option
+        )
+        orders.append(Order(
+            **customer,
+            plot_id=item.plot_id,
+            farming_decision=decision,
+            total_cost=breakdown.payment_amount,
+            expected_yield_kg=breakdown.expected_yield_kg,
+            expected_market_value=breakdown.expected_market_value,
+            profit_loss=breakdown.profit_loss,
+            cart_id=cart_id
+        ))
+    
+    if not await repos.place_cart_orders(cart_id, plot_ids, [order.dict() for order in orders]):
+        raise HTTPException(status_code=409, detail="Parzelle bereits vergeben")
+    return {
+        "cart_id": cart_id,
+        "orders": orders,
+        "total_payment_amount": round(sum(order.total_cost for order in orders), 2)
+    }
+
 @api_router.get("/orders", response_model=List[Order])
 async def get_orders():
-    orders = await db.orders.find().to_list(1000)
+    orders = await repos.orders.find({}, ORDER_PROJECTION, limit=1000)
     return [Order(**order) for order in orders]
 
 @api_router.get("/orders/{order_id}", response_model=Order)
 async def get_order(order_id: str):
-    order = await db.orders.find_one({"id": order_id})
+    order = await repos.orders.get(order_id, ORDER_PROJECTION)
     if not order:
         raise HTTPException(status_code=404, detail="Bestellung nicht gefunden")
     return Order(**order)
 
 @api_router.patch("/orders/{order_id}", response_model=Order)
 async def update_order(order_id: str, order_update: OrderUpdate):
-    order = await db.orders.find_one({"id": order_id})
+    order = await repos.orders.get(order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Bestellung nicht gefunden")
     
+    current = OrderStatus(order["status"])
+    if order_update.status != current and order_update.status not in ORDER_STATUS_TRANSITIONS[current]:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Statuswechsel von {current.value} nach {order_update.status.value} nicht erlaubt"
+        )
+    
     update_data = order_update.dict(exclude_unset=True)
     update_data["updated_at"] = datetime.utcnow()
     
-    await db.orders.update_one({"id": order_id}, {"$set": update_data})
+    # Re-check the status so a concurrent change is not overwritten
+    if not await repos.orders.update_where({"id": order_id, "status": current}, update_data):
+        raise HTTPException(status_code=409, detail="Bestellung wurde zwischenzeitlich geändert")
     
-    updated_order = await db.orders.find_one({"id": order_id})
+    updated_order = await repos.orders.get(order_id, ORDER_PROJECTION)
+    if updated_order["status"] != order["status"]:
+        publish_order_status(order_id, order.get("user_email"), updated_order["status"])
     return Order(**updated_order)
 
-# Advisory system
+async def build_order_query(order_filter: OrderFilter):
+    """Translate an OrderFilter into a MongoDB query on the orders collection"""
+    query = {}
+    if order_filter.status:
+        query["status"] = {"$in": [status.value for status in order_filter.status]}
+    if order_filter.crop_type:
+        query["farming_decision.crop_type"] = order_filter.crop_type.value
+    if order_filter.cultivation_method:
+        query["farming_decision.cultivation_method"] = order_filter.cultivation_method.value
+    plot_ids = order_filter.plot_ids or None
+    if order_filter.locations:
+        region_plot_ids = await repos.plots.distinct("id", {"location": {"$in": order_filter.locations}})
+        if plot_ids is not None:
+            selected = set(plot_ids)
+            region_plot_ids = [plot_id for plot_id in region_plot_ids if plot_id in selected]
+        plot_ids = region_plot_ids
+    if plot_ids is not None:
+        query["plot_id"] = {"$in": plot_ids}
+    return query
+
+RISK_PROJECTION = {
+    "id": 1, "plot_id": 1, "farming_decision.crop_type": 1, "farming_decision.harvest_option": 1,
+    "expected_yield_kg": 1, "expected_market_value": 1, "profit_loss": 1
+}
+
+def simulate_order_risk(orders, samples, seed=None):
+    """Monte Carlo profit distribution for a list of order documents"""
+    result = simulate_profit(
+        [order["farming_decision"]["crop_type"] for order in orders],
+        [order["expected_yield_kg"] for order in orders],
+        # Full season cost; total_cost only holds the payment amount
+        [order["expected_market_value"] - order["profit_loss"] for order in orders],
+        samples,
+        seed
+    )
+    risks = [
+        {
+            "order_id": order["id"],
+            "plot_id": order["plot_id"],
+            "crop_type": order["farming_decision"]["crop_type"],
+            "harvest_option": order["farming_decision"]["harvest_option"],
+            "expected_profit_loss": round(order["profit_loss"], 2),
+            "p10": round(float(result["p10"][index]), 2),
+            "p50": round(float(result["p50"][index]), 2),
+            "p90": round(float(result["p90"][index]), 2),
+            "mean": round(float(result["mean"][index]), 2),
+            "probability_of_loss": round(float(result["probability_of_loss"][index]), 4)
+        }
+        for index, order in enumerate(orders)
+    ]
+    book = {key: round(value, 2) for key, value in result["book"].items()}
+    return risks, book
+
+@api_router.get("/orders/{order_id}/risk")
+async def get_order_risk(
+    order_id: str,
+    samples: int = Query(ORDER_SAMPLES, ge=100, le=100000),
+    seed: Optional[int] = None
+):
+    """P10/P50/P90 profit and probability of a loss for one order"""
+    order = await repos.orders.get(order_id, RISK_PROJECTION)
+    if not order:
+        raise HTTPException(status_code=404, detail="Bestellung nicht gefunden")
+    
+    risks, _ = simulate_order_risk([order], samples, seed)
+    return {**risks[0], "samples": samples}
+
+@api_router.post("/risk/order-book")
+async def get_order_book_risk(risk_request: OrderBookRiskRequest = OrderBookRiskRequest()):
+    """Simulate the whole order book; price shocks are shared between orders of a crop"""
+    if risk_request.filter is not None:
+        query = await build_order_query(risk_request.filter)
+    else:
+        query = {"status": {"$ne": OrderStatus.COMPLETED.value}}
+    orders = await repos.orders.find(query, RISK_PROJECTION)
+    
+    started = time.perf_counter()
+    risks, book = simulate_order_risk(orders, risk_request.samples, risk_request.seed) if orders else ([], None)
+    # For SELL_TO_FARMER orders a loss is billed to the customer after harvest
+    sell_to_farmer = [risk for risk in risks if risk["harvest_option"] == HarvestOption.SELL_TO_FARMER.value]
+    risks.sort(key=lambda risk: (-risk["probability_of_loss"], risk["p10"]))
+    
+    return {
+        "orders": len(risks),
+        "samples": risk_request.samples,
+        "book_profit": book,
+        "sell_to_farmer_orders": len(sell_to_farmer),
+        # Expected number of SELL_TO_FARMER orders that end in a loss
+        "sell_to_farmer_expected_losses": round(sum(risk["probability_of_loss"] for risk in sell_to_farmer), 2),
+        "riskiest_orders": risks[:risk_request.limit],
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+
+@api_router.post("/orders/bulk-status")
+async def bulk_update_order_status(bulk_update: BulkOrderStatusUpdate):
+    """Move many orders to a new status with chunked update_many calls"""
+    if bulk_update.order_ids is None and bulk_update.filter is None:
+        raise HTTPException(status_code=400, detail="order_ids oder filter muss angegeben werden")
+
+    query = {}
+    if bulk_update.filter is not None:
+        query = await build_order_query(bulk_update.filter)
+    if bulk_update.order_ids is not None:
+        query["id"] = {"$in": bulk_update.order_ids}
+
+    target = bulk_update.status
+    results = []
+    results_by_id = {}
+    legal_by_status = {}  # current status -> order IDs that may move to target
+    user_emails = {}
+
+    async for order in repos.orders.iterate(query, {"id": 1, "status": 1, "user_email": 1}):
+        user_emails[order["id"]] = order.get("user_email")
+        current = OrderStatus(order["status"])
+        if current == target:
+            result = "unchanged"
+        elif target in ORDER_STATUS_TRANSITIONS[current]:
+            legal_by_status.setdefault(current, []).append(order["id"])
+            result = "conflict"  # Until the guarded update below moves it
+        else:
+            result = "illegal_transition"
+        results_by_id[order["id"]] = {"order_id": order["id"], "previous_status": current, "result": result}
+        results.append(results_by_id[order["id"]])
+
+    if bulk_update.order_ids is not None:
+        found_ids = {result["order_id"] for result in results}
+        for order_id in bulk_update.order_ids:
+            if order_id not in found_ids:
+                results.append({"order_id": order_id, "previous_status": None, "result": "not_found"})
+                found_ids.add(order_id)
+
+    update_data = {"status": target, "updated_at": datetime.utcnow()}
+    if bulk_update.notes is not None:
+        update_data["notes"] = bulk_update.notes
+
+    modified = 0
+    for current, order_ids in legal_by_status.items():
+        for start in range(0, len(order_ids), BULK_CHUNK_SIZE):
+            chunk = order_ids[start:start + BULK_CHUNK_SIZE]
+            # Re-check the current status so concurrent changes are not overwritten
+            chunk_modified = await repos.orders.update_where(
+                {"id": {"$in": chunk}, "status": current},
+                update_data
+            )
+            modified += chunk_modified
+            moved = chunk
+            if chunk_modified < len(chunk):
+                # Some orders changed in between; only those now at the target were moved
+                moved = await repos.orders.distinct("id", {"id": {"$in": chunk}, "status": target})
+            for order_id in moved:
+                results_by_id[order_id]["result"] = "updated"
+                publish_order_status(order_id, user_emails[order_id], target)
+
+    summary = {}
+    for result in results:
+        summary[result["result"]] = summary.get(result["result"], 0) + 1
+
+    return {
+        "status": target,
+        "matched": len(results_by_id),
+        "modified": modified,
+        "summary": summary,
+        "results": results
+    }
+
+# Advisory system - advisories live in their own collection so order documents stay small
 @api_router.post("/advisories", response_model=Advisory)
 async def create_advisory(advisory_data: AdvisoryCreate):
-    advisory = Advisory(**advisory_data.dict())
+    order = await repos.orders.get(advisory_data.order_id, {"id": 1, "user_email": 1})
+    if not order:
+        raise HTTPException(status_code=404, detail="Bestellung nicht gefunden")
     
-    # Add advisory to order
-    await db.orders.update_one(
-        {"id": advisory_data.order_id},
-        {"$push": {"advisories": advisory.dict()}}
-    )
+    advisory = Advisory(**advisory_data.dict())
+    await repos.advisories.insert(advisory.dict())
+    publish_advisory(advisory, order.get("user_email"))
     
     return advisory
 
-@api_router.get("/orders/{order_id}/advisories")
-async def get_order_advisories(order_id: str):
-    order = await db.orders.find_one({"id": order_id})
+@api_router.post("/advisories/broadcast")
+async def broadcast_advisory(broadcast: AdvisoryBroadcast):
+    """Send one advisory to every order matching the filter, inserted in batches"""
+    query = await build_order_query(broadcast.filter)
+    if "status" not in query:
+        query["status"] = {"$in": [status.value for status in ACTIVE_ORDER_STATUSES]}
+    
+    broadcast_id = str(uuid.uuid4())
+    created_at = datetime.utcnow()
+    batch = []
+    user_emails = {}
+    fan_out = 0
+    
+    async for order in repos.orders.iterate(query, {"id": 1, "user_email": 1}):
+        user_emails[order["id"]] = order.get("user_email")
+        batch.append(Advisory(
+            order_id=order["id"],
+            message=broadcast.message,
+            advisory_type=broadcast.advisory_type,
+            broadcast_id=broadcast_id,
+            created_at=created_at
+        ))
+        if len(batch) >= BULK_CHUNK_SIZE:
+            await insert_advisories(batch, user_emails)
+            fan_out += len(batch)
+            batch = []
+    
+    if batch:
+        await insert_advisories(batch, user_emails)
+        fan_out += len(batch)
+    
+    return {"broadcast_id": broadcast_id, "advisories_created": fan_out}
+
+async def insert_advisories(advisories, user_emails):
+    """Write a batch of advisories in one round-trip and notify live subscribers.
+
+    Rule advisories another evaluation already wrote (unique rule, order and
+    window) are skipped; returns how many were written.
+    """
+    skipped = await repos.advisories.insert_many([advisory.dict() for advisory in advisories], ignore_duplicates=True)
+    for advisory in advisories:
+        if advisory.id not in skipped:
+            publish_advisory(advisory, user_emails.get(advisory.order_id))
+    return len(advisories) - len(skipped)
+
+@api_router.get("/orders/{order_id}/advisories", response_model=List[Advisory])
+async def get_order_advisories(
+    order_id: str,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500)
+):
+    order = await repos.orders.get(order_id, {"id": 1})
     if not order:
         raise HTTPException(status_code=404, detail="Bestellung nicht gefunden")
     
-    return order.get("advisories", [])
+    # Served by the (order_id, created_at) index, newest first
+    advisories = await repos.advisories.find(
+        {"order_id": order_id},
+        sort=[("created_at", DESCENDING)],
+        skip=skip,
+        limit=limit
+    )
+    return [Advisory(**advisory) for advisory in advisories]
+
+@api_router.post("/advisories/{advisory_id}/acknowledge", response_model=Advisory)
+async def acknowledge_advisory(advisory_id: str):
+    advisory = await repos.advisories.update(advisory_id, {"acknowledged": True}, return_document=True)
+    if not advisory:
+        raise HTTPException(status_code=404, detail="Hinweis nicht gefunden")
+    return Advisory(**advisory)
+
+@api_router.post("/advisories/migrate")
+async def migrate_embedded_advisories():
+    """Move advisories embedded in order documents into the advisories collection"""
+    migrated = 0
+    async for order in repos.orders.iterate({"advisories.0": {"$exists": True}}, {"id": 1, "advisories": 1}):
+        advisories = [Advisory(**advisory).dict() for advisory in order["advisories"]]
+        # Advisories copied by an interrupted earlier run are skipped, so the migration can be rerun
+        for start in range(0, len(advisories), BULK_CHUNK_SIZE):
+            await repos.advisories.insert_many(advisories[start:start + BULK_CHUNK_SIZE], ignore_duplicates=True)
+        await repos.orders.update(order["id"], unset=["advisories"])
+        migrated += len(advisories)
+    return {"migrated": migrated}
+
+# Live updates over Server-Sent Events
+def event_topics(order_id, user_email):
+    topics = [order_topic(order_id)]
+    if user_email:
+        topics.append(customer_topic(user_email))
+    return topics
+
+def publish_order_status(order_id, user_email, status):
+    event_bus.publish(event_topics(order_id, user_email), {
+        "type": "order_status",
+        "order_id": order_id,
+        "status": status,
+        "updated_at": datetime.utcnow()
+    })
+
+def publish_advisory(advisory: Advisory, user_email):
+    event_bus.publish(event_topics(advisory.order_id, user_email), {
+        "type": "advisory",
+        "order_id": advisory.order_id,
+        "advisory": advisory.dict()
+    })
+
+async def stream_events(request: Request, topic: str):
+    queue = event_bus.subscribe(topic)
+    try:
+        yield ": connected\n\n"
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield format_sse(event)
+    finally:
+        event_bus.unsubscribe(topic, queue)
+
+def event_stream_response(request: Request, topic: str):
+    return StreamingResponse(
+        stream_events(request, topic),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@api_router.get("/orders/{order_id}/events")
+async def order_events(order_id: str, request: Request):
+    order = await repos.orders.get(order_id, {"id": 1})
+    if not order:
+        raise HTTPException(status_code=404, detail="Bestellung nicht gefunden")
+    return event_stream_response(request, order_topic(order_id))
+
+@api_router.get("/customers/{user_email}/events")
+async def customer_events(user_email: str, request: Request):
+    return event_stream_response(request, customer_topic(user_email))
+
+# Advisory rules engine
+@api_router.get("/advisory-rules", response_model=List[AdvisoryRule])
+async def get_advisory_rules():
+    rules = await repos.advisory_rules.find(limit=1000)
+    return [AdvisoryRule(**rule) for rule in rules]
+
+@api_router.post("/advisory-rules", response_model=AdvisoryRule)
+async def create_advisory_rule(rule_data: AdvisoryRuleCreate):
+    unknown_seasons = [season for season in rule_data.seasons if season not in SEASON_MONTHS]
+    if unknown_seasons:
+        raise HTTPException(status_code=400, detail=f"Unbekannte Jahreszeit: {', '.join(unknown_seasons)}")
+    
+    rule = AdvisoryRule(**rule_data.dict())
+    await repos.advisory_rules.insert(rule.dict())
+    return rule
+
+@api_router.delete("/advisory-rules/{rule_id}")
+async def delete_advisory_rule(rule_id: str):
+    if not await repos.advisory_rules.delete(rule_id):
+        raise HTTPException(status_code=404, detail="Regel nicht gefunden")
+    return {"deleted": rule_id}
+
+@api_router.post("/advisory-rules/evaluate")
+async def evaluate_advisory_rules(evaluation: RuleEvaluationRequest = RuleEvaluationRequest()):
+    weather = {location: observation.dict() for location, observation in evaluation.weather.items()}
+    return await run_advisory_rules(weather)
+
+async def run_advisory_rules(weather=None):
+    """Evaluate all active rules over all active orders in one pass"""
+    started = datetime.utcnow()
+    rules = await repos.advisory_rules.find({"active": True})
+    if not rules:
+        return {"rules_evaluated": 0, "orders_evaluated": 0, "advisories_created": 0, "duplicates_suppressed": 0}
+    
+    plots = await repos.plots.find({}, {"id": 1, "location": 1})
+    plot_locations = {plot["id"]: plot.get("location") for plot in plots}
+    
+    orders = []
+    async for order in repos.orders.iterate(
+        {"status": {"$in": [status.value for status in ACTIVE_ORDER_STATUSES]}},
+        {
+            "id": 1,
+            "user_email": 1,
+            "plot_id": 1,
+            "farming_decision.crop_type": 1,
+            "farming_decision.cultivation_method": 1,
+            "farming_decision.fertilizer_choice.fertilizer_type": 1
+        }
+    ):
+        decision = order.get("farming_decision", {})
+        orders.append({
+            "id": order["id"],
+            "user_email": order.get("user_email"),
+            "location": plot_locations.get(order.get("plot_id")),
+            "crop_type": decision.get("crop_type"),
+            "cultivation_method": decision.get("cultivation_method"),
+            "fertilizer_type": decision.get("fertilizer_choice", {}).get("fertilizer_type")
+        })
+    
+    columns = OrderColumns(
+        orders,
+        [crop.value for crop in CropType],
+        [method.value for method in CultivationMethod],
+        [fertilizer.value for fertilizer in FertilizerType]
+    )
+    compiled_rules = compile_rules(rules, columns)
+    matches = evaluate_rules(compiled_rules, columns, started.month, weather)
+    
+    # Only the advisories that can still suppress a match, one indexed lookup per matching rule
+    rules_by_id = {rule["id"]: rule for rule in rules}
+    earlier = await asyncio.gather(*[
+        repos.advisories.find(
+            earlier_advisories_query(rules_by_id[rule_id], started),
+            {"rule_id": 1, "order_id": 1, "created_at": 1}
+        )
+        for rule_id in matches
+    ])
+    existing = [advisory for advisories in earlier for advisory in advisories]
+    fresh, suppressed = suppress_duplicates(matches, compiled_rules, columns, existing, started)
+    
+    user_emails = {order["id"]: order["user_email"] for order in orders}
+    created = 0
+    batch = []
+    for rule_id, order_ids in fresh.items():
+        rule = rules_by_id[rule_id]
+        for order_id in order_ids:
+            batch.append(Advisory(
+                order_id=order_id,
+                message=rule["message"],
+                advisory_type=rule["advisory_type"],
+                rule_id=rule_id,
+                rule_window=advisory_window(rule, started),
+                created_at=started
+            ))
+            if len(batch) >= BULK_CHUNK_SIZE:
+                created += await insert_advisories(batch, user_emails)
+                batch = []
+    if batch:
+        created += await insert_advisories(batch, user_emails)
+    # Written concurrently by another evaluation: suppressed as well
+    suppressed += sum(len(order_ids) for order_ids in fresh.values()) - created
+    
+    return {
+        "rules_evaluated": len(compiled_rules),
+        "orders_evaluated": len(columns),
+        "advisories_created": created,
+        "duplicates_suppressed": suppressed,
+        "duration_ms": round((datetime.utcnow() - started).total_seconds() * 1000, 1)
+    }
+
+# Scheduled rule evaluation interval (0 disables the background job)
+ADVISORY_RULES_INTERVAL_MINUTES = float(os.environ.get('ADVISORY_RULES_INTERVAL_MINUTES', '360'))
+
+async def advisory_rules_scheduler():
+    """Every worker runs this; per interval only the holder of the lease evaluates the rules"""
+    holder = f"{socket.gethostname()}:{os.getpid()}"
+    while True:
+        await asyncio.sleep(ADVISORY_RULES_INTERVAL_MINUTES * 60)
+        try:
+            if not await repos.acquire_lease("advisory_rules", holder, ADVISORY_RULES_INTERVAL_MINUTES * 60):
+                continue
+            result = await run_advisory_rules()
+            logger.info(f"Advisory rules evaluated: {result}")
+        except Exception:
+            logger.exception("Advisory rule evaluation failed")
 
 # Initialize sample data
 @api_router.post("/reset-database")
 async def reset_database():
     """Completely reset the database - remove all data"""
-    await db.plots.delete_many({})
-    await db.machines.delete_many({})
-    await db.orders.delete_many({})
+    await repos.plots.delete_where()
+    await repos.machines.delete_where()
+    await repos.orders.delete_where()
+    await repos.advisories.delete_where()
+    schedule_recommendation_refresh()
     return {"message": "Database completely reset"}
 
 @api_router.get("/active-plots-count")
 async def get_active_plots_count():
     """Count how many plots have active orders"""
-    active_count = await db.orders.count_documents({"status": {"$in": ["confirmed", "implementing", "completed"]}})
+    active_count = await hot_reads.do(
+        "active_plots_count",
+        lambda: repos.orders.count({"status": {"$in": ["confirmed", "implementing", "completed"]}})
+    )
     return {"active_plots": active_count}
 @api_router.post("/initialize-data")
-async def initialize_sample_data():
-    # COMPLETELY clear existing data first
-    await db.machines.delete_many({})
-    await db.plots.delete_many({})
-    await db.orders.delete_many({})
-    
-    # Wait a moment to ensure deletion is complete
-    import asyncio
-    await asyncio.sleep(0.1)
-    
-    # Create sample plots
-    sample_plots = [
-        PlotCreate(
-            name="A1 - Ritterfeld",
-            soil_type=SoilType.SAND,
-            soil_points=28,
-            location="39291 Grabow",
-            description="Sandiger Boden, 28 Bodenpunkte",
-            price_per_plot=7.50,
-            image_url="https://images.unsplash.com/photo-1613036582025-ba1d4ccb3226?crop=entropy&cs=srgb&fm=jpg&ixid=M3w3NTY2NzZ8MHwxfHNlYXJjaHwyfHxzb2lsfGVufDB8fHx8MTc1MjgzMzA4NXww&ixlib=rb-4.1.0&q=85"
-        ),
-        PlotCreate(
-            name="B2 - Ritterfeld",
-            soil_type=SoilType.LOAMY_SAND,
-            soil_points=38,
-            location="39291 Grabow",
-            description="Lehmiger Sandboden, 38 Bodenpunkte",
-            price_per_plot=9.00,
-            image_url="https://images.unsplash.com/photo-1519462568576-0c687427fb2e?crop=entropy&cs=srgb&fm=jpg&ixid=M3w3NTY2NzZ8MHwxfHNlYXJjaHwzfHxzb2lsfGVufDB8fHx8MTc1MjgzMzA4NXww&ixlib=rb-4.1.0&q=85"
-        ),
-        PlotCreate(
-            name="C3 - Ritterfeld",
-            soil_type=SoilType.CLAYEY_SAND,
-            soil_points=42,
-            location="39291 Grabow",
-            description="Anlehmiger Sandboden, 42 Bodenpunkte",
-            price_per_plot=10.00,
-            image_url="https://images.pexels.com/photos/1000057/pexels-photo-1000057.jpeg"
-        ),
-        PlotCreate(
-            name="D4 - Ritterfeld",
-            soil_type=SoilType.SANDY_LOAM,
-            soil_points=48,
-            location="39291 Grabow",
-            description="Sandiger Lehm, 48 Bodenpunkte - Premium Boden",
-            price_per_plot=12.50,
-            image_url="https://images.unsplash.com/photo-1625246333195-78d9c38ad449?crop=entropy&cs=srgb&fm=jpg&ixid=M3w3NDQ2NDJ8MHwxfHNlYXJjaHwxfHxmZXJ0aWxlJTIwc29pbHxlbnwwfHx8fDE3NTI4NDU0NzJ8MA&ixlib=rb-4.1.0&q=85"
-        ),
-        PlotCreate(
-            name="E5 - Ritterfeld",
-            soil_type=SoilType.SANDY_LOAM,
-            soil_points=52,
-            location="39291 Grabow",
-            description="Sandiger Lehm, 52 Bodenpunkte - Premium Boden",
-            price_per_plot=14.00,
-            image_url="https://images.unsplash.com/photo-1492496913980-501348b61469?crop=entropy&cs=srgb&fm=jpg&ixid=M3w3NDQ2NDJ8MHwxfHNlYXJjaHwyfHxmZXJ0aWxlJTIwc29pbHxlbnwwfHx8fDE3NTI4NDU0NzJ8MA&ixlib=rb-4.1.0&q=85"
-        )
-    ]
+async def initialize_sample_data(reset: bool = True):
+    """Seed plots and machines from the fixtures file.
     
-    for plot_data in sample_plots:
-        plot = Plot(
-            id=str(uuid.uuid4()),
-            name=plot_data.name,
-            soil_type=plot_data.soil_type,
-            soil_points=plot_data.soil_points,
-            location=plot_data.location,
-            description=plot_data.description,
-            price_per_plot=plot_data.price_per_plot,
-            image_url=plot_data.image_url,
-            available=True,
-            created_at=datetime.now()
-        )
-        await db.plots.insert_one(plot.dict())
-    
-    # Create exactly 16 unique machines
-    machines_to_create = [
-        # Bodenbearbeitung (3 machines)
-        {"id": "traktor_john_deere_8r370", "name": "John Deere 8R370", "type": MachineType.TRAKTOR, "description": "Großtraktor (400 PS, 5 Min. Arbeitszeit)", "price_per_use": 6.50, "working_step": WorkingStep.BODENBEARBEITUNG, "suitable_for": [CropType.WINTERWEIZEN, CropType.WINTERROGGEN, CropType.WINTERGERSTE, CropType.WINTERTRITICALE, CropType.ERBSEN, CropType.SILOMAIS, CropType.ZUCKERRUEBEN]},
-        {"id": "scheibenegge_01", "name": "Scheibenegge", "type": MachineType.SCHEIBENEGGE, "description": "Scheibenegge für Bodenbearbeitung", "price_per_use": 1.00, "working_step": WorkingStep.BODENBEARBEITUNG, "suitable_for": [CropType.WINTERWEIZEN, CropType.WINTERROGGEN, CropType.WINTERGERSTE, CropType.WINTERTRITICALE, CropType.SILOMAIS, CropType.ERBSEN, CropType.ZUCKERRUEBEN]},
-        {"id": "grubber_01", "name": "Grubber", "type": MachineType.GRUBBER, "description": "Bodenbearbeitungsgerät", "price_per_use": 1.20, "working_step": WorkingStep.BODENBEARBEITUNG, "suitable_for": [CropType.WINTERWEIZEN, CropType.WINTERROGGEN, CropType.WINTERGERSTE, CropType.WINTERTRITICALE, CropType.SILOMAIS, CropType.ERBSEN]},
-        
-        # Aussaat (2 machines)
-        {"id": "horsch_pronto_6dc", "name": "Horsch Pronto 6 DC", "type": MachineType.SAEMASCHINE, "description": "Drillmaschine (6m Arbeitsbreite)", "price_per_use": 0.80, "working_step": WorkingStep.AUSSAAT, "suitable_for": [CropType.WINTERWEIZEN, CropType.WINTERROGGEN, CropType.WINTERGERSTE, CropType.WINTERTRITICALE, CropType.ERBSEN]},
-        {"id": "traktor_john_deere_7820", "name": "John Deere 7820", "type": MachineType.TRAKTOR_AUSSAAT, "description": "Traktor für Aussaat", "price_per_use": 5.50, "working_step": WorkingStep.AUSSAAT, "suitable_for": [CropType.WINTERWEIZEN, CropType.WINTERROGGEN, CropType.WINTERGERSTE, CropType.WINTERTRITICALE, CropType.ERBSEN, CropType.SILOMAIS]},
-        
-        # Pflanzenschutz (8 machines)
-        # Herbstbehandlungen für Winterkulturen
-        {"id": "herbizid_herbst", "name": "Herbizid - Herbst", "type": MachineType.FELDSPRITZE, "description": "Herbizid-Behandlung nach der Aussaat im Herbst", "price_per_use": 2.10, "working_step": WorkingStep.PFLANZENSCHUTZ, "season": "herbst", "treatment_type": "herbizid", "suitable_for": [CropType.WINTERWEIZEN, CropType.WINTERROGGEN, CropType.WINTERGERSTE, CropType.WINTERTRITICALE, CropType.WINTERRAPS]},
-        {"id": "traktor_herbst_pflanzenschutz", "name": "John Deere 6R145 + Spritze (Herbst)", "type": MachineType.TRAKTOR_PFLANZENSCHUTZ, "description": "Traktor mit Spritze für Herbstbehandlung", "price_per_use": 4.50, "working_step": WorkingStep.PFLANZENSCHUTZ, "season": "herbst", "treatment_type": "herbizid", "suitable_for": [CropType.WINTERWEIZEN, CropType.WINTERROGGEN, CropType.WINTERGERSTE, CropType.WINTERTRITICALE, CropType.WINTERRAPS]},
-        
-        # Frühjahrsbehandlungen
-        {"id": "herbizid_fruejahr", "name": "Herbizid - Frühjahr", "type": MachineType.FELDSPRITZE, "description": "Herbizid-Behandlung im Frühjahr", "price_per_use": 2.30, "working_step": WorkingStep.PFLANZENSCHUTZ, "season": "fruejahr", "treatment_type": "herbizid", "suitable_for": [CropType.WINTERWEIZEN, CropType.WINTERROGGEN, CropType.WINTERGERSTE, CropType.WINTERTRITICALE, CropType.WINTERRAPS, CropType.KHORASAN_WEIZEN, CropType.ERBSEN]},
-        {"id": "traktor_john_deere_6r145", "name": "John Deere 6R145 + Spritze", "type": MachineType.TRAKTOR_PFLANZENSCHUTZ, "description": "Traktor für Pflanzenschutz", "price_per_use": 4.80, "working_step": WorkingStep.PFLANZENSCHUTZ, "season": "fruejahr", "treatment_type": "herbizid", "suitable_for": [CropType.WINTERWEIZEN, CropType.WINTERROGGEN, CropType.WINTERGERSTE, CropType.WINTERTRITICALE, CropType.WINTERRAPS, CropType.KHORASAN_WEIZEN, CropType.SILOMAIS, CropType.ZUCKERRUEBEN, CropType.ERBSEN]},
-        {"id": "insektizid_fruejahr", "name": "Insektizid - Frühjahr", "type": MachineType.FELDSPRITZE, "description": "Insektizid gegen Schädlinge", "price_per_use": 1.80, "working_step": WorkingStep.PFLANZENSCHUTZ, "season": "fruejahr", "treatment_type": "insektizid", "suitable_for": [CropType.WINTERWEIZEN, CropType.WINTERROGGEN, CropType.WINTERGERSTE, CropType.WINTERTRITICALE, CropType.WINTERRAPS, CropType.KHORASAN_WEIZEN, CropType.SILOMAIS, CropType.ZUCKERRUEBEN, CropType.ERBSEN]},
-        
-        # Herbst-Insektizid für Winterraps (gegen Erdflöhe)
-        {"id": "insektizid_herbst", "name": "Insektizid - Herbst", "type": MachineType.FELDSPRITZE, "description": "Insektizid gegen Erdflöhe nach Auflaufen", "price_per_use": 1.90, "working_step": WorkingStep.PFLANZENSCHUTZ, "season": "herbst", "treatment_type": "insektizid", "suitable_for": [CropType.WINTERRAPS, CropType.WINTERGERSTE]},
-        
-        # Biologische/mechanische Behandlungen  
-        {"id": "hacke_01", "name": "Hacke - mechanisch", "type": MachineType.HACKE, "description": "Mechanische Unkrautbekämpfung", "price_per_use": 1.15, "working_step": WorkingStep.PFLANZENSCHUTZ, "season": "bio", "treatment_type": "mechanisch", "suitable_for": [CropType.WINTERWEIZEN, CropType.WINTERROGGEN, CropType.WINTERGERSTE, CropType.WINTERTRITICALE, CropType.KHORASAN_WEIZEN, CropType.SILOMAIS, CropType.ZUCKERRUEBEN, CropType.ERBSEN]},
-        {"id": "striegel_01", "name": "Striegel - mechanisch", "type": MachineType.STRIEGEL, "description": "Mechanische Unkrautbekämpfung", "price_per_use": 0.85, "working_step": WorkingStep.PFLANZENSCHUTZ, "season": "bio", "treatment_type": "mechanisch", "suitable_for": [CropType.WINTERWEIZEN, CropType.WINTERROGGEN, CropType.WINTERGERSTE, CropType.WINTERTRITICALE, CropType.KHORASAN_WEIZEN, CropType.SILOMAIS, CropType.ZUCKERRUEBEN, CropType.ERBSEN]},
-        
-        # Düngung (5 machines)
-        {"id": "john_deere_6r195_mineral", "name": "John Deere 6R195 + Mineraldüngerstreuer", "type": MachineType.TRAKTOR_DUENGUNG, "description": "Traktor mit Mineraldüngerstreuer", "price_per_use": 6.50, "working_step": WorkingStep.DUENGUNG, "fertilizer_type": "mineral", "suitable_for": [CropType.WINTERWEIZEN, CropType.WINTERROGGEN, CropType.WINTERGERSTE, CropType.WINTERTRITICALE, CropType.SILOMAIS, CropType.ZUCKERRUEBEN, CropType.ERBSEN]},
-        {"id": "john_deere_6r195_guellefass", "name": "John Deere 6R195 + 18m Güllefass", "type": MachineType.TRAKTOR_DUENGUNG, "description": "Traktor mit Güllefass für Rindergülle/Schweinegülle/Gärrest", "price_per_use": 7.30, "working_step": WorkingStep.DUENGUNG, "fertilizer_type": "organic_liquid", "suitable_for": [CropType.WINTERWEIZEN, CropType.WINTERROGGEN, CropType.WINTERGERSTE, CropType.WINTERTRITICALE, CropType.SILOMAIS, CropType.ZUCKERRUEBEN, CropType.ERBSEN]},
-        {"id": "john_deere_6r195_miststreuer", "name": "John Deere 6R195 + Miststreuer", "type": MachineType.TRAKTOR_DUENGUNG, "description": "Traktor mit Miststreuer für Rindermist", "price_per_use": 10.00, "working_step": WorkingStep.DUENGUNG, "fertilizer_type": "organic_solid", "suitable_for": [CropType.WINTERWEIZEN, CropType.WINTERROGGEN, CropType.WINTERGERSTE, CropType.WINTERTRITICALE, CropType.SILOMAIS, CropType.ZUCKERRUEBEN, CropType.ERBSEN]},
-        
-        # Pflege (2 machines)
-        {"id": "cambridge_walze_01", "name": "Cambridge Walze", "type": MachineType.CAMBRIDGE_WALZE, "description": "Walze zur Bestockungsförderung", "price_per_use": 0.95, "working_step": WorkingStep.PFLEGE, "suitable_for": [CropType.WINTERWEIZEN, CropType.WINTERROGGEN, CropType.WINTERGERSTE, CropType.WINTERTRITICALE, CropType.ERBSEN]},
-        {"id": "steine_sammeln_01", "name": "Steine sammeln", "type": MachineType.CAMBRIDGE_WALZE, "description": "Steine von der Fläche sammeln", "price_per_use": 1.50, "working_step": WorkingStep.PFLEGE, "suitable_for": [CropType.WINTERWEIZEN, CropType.WINTERROGGEN, CropType.WINTERGERSTE, CropType.WINTERTRITICALE, CropType.ERBSEN, CropType.SILOMAIS, CropType.ZUCKERRUEBEN]},
-        
-        # Ernte (4 machines)
-        {"id": "john_deere_t660i", "name": "John Deere T660i Mähdrescher", "type": MachineType.MAEHDRESCHER, "description": "Getreidemähdrescher (für Körnergewinnung)", "price_per_use": 4.10, "working_step": WorkingStep.ERNTE, "suitable_for": [CropType.WINTERWEIZEN, CropType.WINTERROGGEN, CropType.WINTERGERSTE, CropType.WINTERTRITICALE, CropType.WINTERRAPS, CropType.KHORASAN_WEIZEN, CropType.ERBSEN]},
-        {"id": "mais_claas_jaguar_940", "name": "Mais-Claas Jaguar 940", "type": MachineType.MAIS_HAECKSLER, "description": "Spezialhäcksler für Silomais", "price_per_use": 4.20, "working_step": WorkingStep.ERNTE, "suitable_for": [CropType.SILOMAIS]},
-        {"id": "gras_claas_jaguar_940", "name": "Gras-Claas Jaguar 940", "type": MachineType.GRAS_HAECKSLER, "description": "Häcksler für Gras", "price_per_use": 3.80, "working_step": WorkingStep.ERNTE, "suitable_for": [CropType.GRAS]},
-        {"id": "ganzpflanzensilage_claas_jaguar_940", "name": "Ganzpflanzensilage-Claas Jaguar 940", "type": MachineType.MAIS_HAECKSLER, "description": "Häcksler für Roggen-Ganzpflanzensilage (für Futterzwecke)", "price_per_use": 4.00, "working_step": WorkingStep.ERNTE, "suitable_for": [CropType.WINTERROGGEN]}
-    ]
+    Safe to re-run: the catalog is upserted by stable IDs. With reset (the
+    default) orders, advisories and catalog entries missing from the fixtures
+    are removed and all plots become available again; without it the
+    fixtures are merged into the existing data and plot availability is kept.
+    """
+    started = time.perf_counter()
+    fixtures = load_fixtures()
+    plots = [Plot(**plot_data).dict() for plot_data in fixtures["plots"]]
+    machines = [Machine(**machine_data).dict() for machine_data in fixtures["machines"]]
     
-    # Initialize database with sample data
-    await db.machines.delete_many({})
-    await db.plots.delete_many({})
-    
-    # Create 5 sample plots
-    for plot_data in sample_plots:
-        plot = Plot(
-            id=str(uuid.uuid4()),
-            name=plot_data.name,
-            soil_type=plot_data.soil_type,
-            soil_points=plot_data.soil_points,
-            location=plot_data.location,
-            description=plot_data.description,
-            price_per_plot=plot_data.price_per_plot,
-            image_url=plot_data.image_url,
-            available=True,
-            created_at=datetime.now()
-        )
-        await db.plots.insert_one(plot.dict())
-
-    # Create 18 sample machines
-    machine_count = 0
-    for machine_data in machines_to_create:
-        machine = Machine(
-            id=machine_data["id"],
-            name=machine_data["name"],
-            type=machine_data["type"],
-            description=machine_data["description"],
-            price_per_use=machine_data["price_per_use"],
-            suitable_for=machine_data["suitable_for"],
-            working_step=machine_data["working_step"],
-            fertilizer_type=machine_data.get("fertilizer_type"),  # Add fertilizer_type support
-            season=machine_data.get("season"),  # Add plant protection season
-            treatment_type=machine_data.get("treatment_type"),  # Add plant protection treatment type
-            crop_specific=machine_data.get("crop_specific"),  # Add crop-specific treatments
-            image_url="https://images.pexels.com/photos/96417/pexels-photo-96417.jpeg"
-        )
-        await db.machines.insert_one(machine.dict())
-        machine_count += 1
+    if reset:
+        await repos.orders.delete_where()
+        await repos.advisories.delete_where()
+    plot_report, machine_report = await asyncio.gather(
+        repos.plots.seed(plots, ("created_at",) if reset else ("created_at", "available"), prune=reset),
+        repos.machines.seed(machines, prune=reset)
+    )
     
-    return {"message": f"Datenbank erfolgreich initialisiert: {len(sample_plots)} Parzellen, {machine_count} Maschinen"}
+    schedule_recommendation_refresh()
+    logger.info(
+        "Seeded fixtures %s: %d plots, %d machines in %.1f ms",
+        fixtures.get("version"), len(plots), len(machines), (time.perf_counter() - started) * 1000
+    )
+    return {
+        "message": f"Datenbank erfolgreich initialisiert: {len(plots)} Parzellen, {len(machines)} Maschinen",
+        "fixtures_version": fixtures.get("version"),
+        "plots": plot_report,
+        "machines": machine_report,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+
+@api_router.get("/ready")
+async def readiness():
+    """Readiness probe: 503 until the worker has finished warming up"""
+    if not startup_state["ready"]:
+        raise HTTPException(status_code=503, detail="Dienst wird gestartet")
+    return {
+        "ready": True,
+        "startup_ms": startup_state["steps"],
+        # Milliseconds since process start: imports, ready, first_response
+        "timeline_ms": STARTUP.report()
+    }
+
+@api_router.get("/cache-status")
+async def get_cache_status():
+    """Invalidation source, collection versions, cache hit rates and request coalescing"""
+    repositories = {}
+    for collection in WATCHED_COLLECTIONS:
+        cached = find_layer(getattr(repos, collection), CachedRepository)
+        if cached is not None:
+            repositories[collection] = {"entries": len(cached.entries), "hits": cached.hits, "misses": cached.misses}
+    return {**invalidation_bus.status(), "repositories": repositories, "single_flight": hot_reads.metrics()}
 
 # Include the router in the main app
 app.include_router(api_router)
 
+# Optionally serve the built frontend too (path relative to backend/); API routes match first
+FRONTEND_BUILD_DIR = os.environ.get('FRONTEND_BUILD_DIR')
+if FRONTEND_BUILD_DIR:
+    app.mount("/", StaticSite(ROOT_DIR / FRONTEND_BUILD_DIR), name="frontend")
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -963,6 +1607,9 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Compress dynamic responses above the threshold (bytes); precompressed payloads pass through
+app.add_middleware(CompressionMiddleware, minimum_size=int(os.environ.get('COMPRESSION_MINIMUM_SIZE', '1024')))
+app.add_middleware(FirstResponseTimer)
 
 # Configure logging
 logging.basicConfig(
@@ -971,6 +1618,58 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+background_tasks = []
+
+async def warm_up():
+    """Do the cold-start work before the first request instead of during it"""
+    steps = [
+        ("database", lambda: repos.warm_up(MONGO_MIN_POOL_SIZE)),
+        ("indexes", repos.ensure_indexes),
+        # Loads plots and machines and runs the sweep, which exercises the yield and fertilizer tables
+        ("catalog", load_catalog)
+    ]
+    started = time.perf_counter()
+    for name, step in steps:
+        step_started = time.perf_counter()
+        await step()
+        startup_state["steps"][name] = round((time.perf_counter() - step_started) * 1000, 2)
+    
+    if ADVISORY_RULES_INTERVAL_MINUTES > 0:
+        background_tasks.append(asyncio.create_task(advisory_rules_scheduler()))
+    if hasattr(repos, "db"):
+        background_tasks.append(asyncio.create_task(
+            run_invalidation(repos.db, invalidation_bus, CACHE_INVALIDATION, CACHE_POLL_INTERVAL_SECONDS)
+        ))
+        background_tasks.append(asyncio.create_task(
+            relay_events(repos.db.events, event_bus, EVENT_RELAY_INTERVAL_SECONDS)
+        ))
+    if PAYPAL_PRELOAD:
+        background_tasks.append(asyncio.create_task(asyncio.to_thread(payment_gateway.client)))
+    startup_state["ready"] = True
+    STARTUP.mark("ready")
+    logger.info(f"Warm-up finished in {(time.perf_counter() - started) * 1000:.1f} ms: {startup_state['steps']}")
+
+async def warm_up_in_background():
+    """Retry warm-up until the database is reachable"""
+    delay = 1
+    while True:
+        try:
+            await warm_up()
+            return
+        except Exception:
+            logger.exception(f"Warm-up failed, retrying in {delay} s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+
+async def shut_down():
+    if CATALOG_SNAPSHOT and startup_state["ready"]:
+        try:
+            await save_catalog_snapshot()
+        except Exception:
+            logger.exception("Writing the catalog snapshot failed")
+    startup_state["ready"] = False
+    for task in background_tasks:
+        task.cancel()
+    repos.close()
+
+STARTUP.mark("imports")
\ No newline at end of file
@@ -0,0 +1,50 @@
+"""Request coalescing for hot identical reads.
+
+SingleFlight.do(key, load) runs load() once for all callers that ask for the
+same key while it is in flight; they all await the same result. A burst of
+identical requests then costs one database query instead of one per request.
+Results are shared between callers and must not be mutated.
+
+A write invalidating a key makes forget(key) detach the in-flight load, so
+callers arriving after the write start a fresh one instead of joining a
+load that may have read the old state.
+"""
+import asyncio
+
+
+class SingleFlight:
+    def __init__(self):
+        self.in_flight = {}
+        self.stats = {}  # key -> {"calls": n, "loads": n}
+
+    async def do(self, key, load):
+        stats = self.stats.setdefault(key, {"calls": 0, "loads": 0})
+        stats["calls"] += 1
+        future = self.in_flight.get(key)
+        if future is None:
+            stats["loads"] += 1
+            future = asyncio.ensure_future(load())
+            self.in_flight[key] = future
+            future.add_done_callback(lambda done: self._finished(key, done))
+        # A caller that goes away (client disconnect) must not cancel the load for the others
+        return await asyncio.shield(future)
+
+    def _finished(self, key, future):
+        if self.in_flight.get(key) is future:
+            del self.in_flight[key]
+        if not future.cancelled():
+            future.exception()  # Retrieved, so an error nobody awaited is not logged as unhandled
+
+    def forget(self, key):
+        self.in_flight.pop(key, None)
+
+    def metrics(self):
+        """Calls, loads and the share of calls that joined a load in flight, per key"""
+        return {
+            key: {
+                **stats,
+                "coalesced": stats["calls"] - stats["loads"],
+                "coalescing_ratio": round(1 - stats["loads"] / stats["calls"], 4) if stats["calls"] else 0.0
+            }
+            for key, stats in self.stats.items()
+        }
@@ -0,0 +1,68 @@
+"""Cold start timing.
+
+Records how long a worker takes from process start to importing the app, to
+finishing warm-up and to sending its first response. server.py imports this
+module first, so "imports" covers everything the app imports. The process
+start time comes from /proc on Linux (dynos, containers); elsewhere the
+clock starts when this module is imported.
+
+Intentionally free of heavy imports.
+"""
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def _process_age_seconds():
+    """Seconds since the process was started, or 0.0 if unknown"""
+    try:
+        with open(f"/proc/{os.getpid()}/stat") as stat_file:
+            # Fields after the command name (which may contain spaces); starttime is field 22
+            fields = stat_file.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as uptime_file:
+            uptime = float(uptime_file.read().split()[0])
+        return max(0.0, uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+class StartupTimer:
+    def __init__(self):
+        self.started = time.perf_counter() - _process_age_seconds()
+        self.marks = {}
+
+    def mark(self, name):
+        """Record the time since process start for a milestone (first call wins)"""
+        if name not in self.marks:
+            self.marks[name] = round((time.perf_counter() - self.started) * 1000, 2)
+        return self.marks[name]
+
+    def report(self):
+        return dict(self.marks)
+
+
+STARTUP = StartupTimer()
+
+
+class FirstResponseTimer:
+    """ASGI middleware marking "first_response" when the first HTTP response starts"""
+
+    def __init__(self, app, timer=STARTUP):
+        self.app = app
+        self.timer = timer
+        self.done = False
+
+    async def __call__(self, scope, receive, send):
+        if self.done or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def timed_send(message):
+            if message["type"] == "http.response.start" and not self.done:
+                self.done = True
+                logger.info(f"Time to first response: {self.timer.mark('first_response'):.1f} ms, {self.timer.report()}")
+            await send(message)
+
+        await self.app(scope, receive, timed_send)
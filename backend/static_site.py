@@ -0,0 +1,133 @@
+"""Serve the built frontend (single-page app) from the API process.
+
+Enabled by setting FRONTEND_BUILD_DIR to the build output (e.g. ../build).
+All files are read once at startup together with a gzip and brotli variant
+of every compressible file: existing .gz/.br siblings are used if they are
+at least as new as the file, otherwise the file is compressed in memory.
+Requests then only pick a variant. To compress at build time instead:
+
+    cd backend
+    python static_site.py ../build
+
+Hashed assets (main.32e3d3de.js) get an immutable one-year Cache-Control;
+everything else, index.html in particular, is revalidated with its ETag.
+Unknown paths without a file extension get index.html so that client-side
+routes work on reload; API routes are matched before this app.
+"""
+import hashlib
+import mimetypes
+import os
+import re
+from pathlib import Path
+from starlette.datastructures import Headers
+from starlette.responses import PlainTextResponse, Response
+from compression import ENCODINGS, choose_encoding, compress_best, is_compressible
+
+HASHED_NAME = re.compile(r"\.[0-9a-f]{8,}\.")
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+MINIMUM_COMPRESS_SIZE = 256
+SUFFIXES = {"gzip": ".gz", "br": ".br"}
+
+
+class StaticFile:
+    def __init__(self, path):
+        self.body = path.read_bytes()
+        self.content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        if self.content_type.startswith("text/") or self.content_type == "application/javascript":
+            self.content_type += "; charset=utf-8"
+        self.etag = '"' + hashlib.sha256(self.body).hexdigest()[:32] + '"'
+        hashed = HASHED_NAME.search(path.name) is not None
+        self.cache_control = IMMUTABLE if hashed else REVALIDATE
+        self.variants = {None: self.body}
+        if is_compressible(self.content_type) and len(self.body) >= MINIMUM_COMPRESS_SIZE:
+            for encoding in ENCODINGS:
+                compressed_path = path.with_name(path.name + SUFFIXES[encoding])
+                if compressed_path.exists() and compressed_path.stat().st_mtime >= path.stat().st_mtime:
+                    self.variants[encoding] = compressed_path.read_bytes()
+                else:
+                    self.variants[encoding] = compress_best(self.body, encoding)
+
+    def response(self, headers, head=False):
+        response_headers = {"ETag": self.etag, "Cache-Control": self.cache_control}
+        if len(self.variants) > 1:
+            response_headers["Vary"] = "Accept-Encoding"
+        if headers.get("if-none-match") == self.etag:
+            return Response(status_code=304, headers=response_headers)
+        encoding = choose_encoding(headers.get("accept-encoding"), [e for e in ENCODINGS if e in self.variants])
+        if encoding is not None:
+            response_headers["Content-Encoding"] = encoding
+        body = self.variants[encoding]
+        if head:
+            response_headers["Content-Length"] = str(len(body))
+            body = b""
+        return Response(body, media_type=self.content_type, headers=response_headers)
+
+
+class StaticSite:
+    """ASGI app serving a build directory from memory"""
+
+    def __init__(self, directory, index="index.html", excluded_prefixes=("/api/",)):
+        self.directory = Path(directory).resolve()
+        self.excluded_prefixes = excluded_prefixes
+        self.files = {}
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                path = Path(root) / name
+                if path.suffix in (".gz", ".br") and path.with_suffix("").exists():
+                    continue  # Precompressed sibling, loaded with its file
+                url_path = "/" + path.relative_to(self.directory).as_posix()
+                self.files[url_path] = StaticFile(path)
+        self.index = self.files.get("/" + index)
+        if self.index is None:
+            raise FileNotFoundError(f"{self.directory / index} not found")
+
+    def stats(self):
+        return {
+            "files": len(self.files),
+            "bytes": sum(len(file.body) for file in self.files.values()),
+            "compressed_bytes": {
+                encoding: sum(len(file.variants.get(encoding, file.body)) for file in self.files.values())
+                for encoding in ENCODINGS
+            }
+        }
+
+    def lookup(self, path):
+        if path == "/":
+            return self.index
+        static_file = self.files.get(path)
+        if static_file is None and not path.startswith(self.excluded_prefixes) and "." not in path.rsplit("/", 1)[-1]:
+            return self.index  # Client-side route
+        return static_file
+
+    async def __call__(self, scope, receive, send):
+        if scope["method"] not in ("GET", "HEAD"):
+            response = PlainTextResponse("Method Not Allowed", status_code=405, headers={"Allow": "GET, HEAD"})
+        else:
+            static_file = self.lookup(scope["path"])
+            if static_file is None:
+                response = PlainTextResponse("Not Found", status_code=404)
+            else:
+                response = static_file.response(Headers(scope=scope), head=scope["method"] == "HEAD")
+        await response(scope, receive, send)
+
+
+def write_precompressed(directory):
+    """Write .gz/.br siblings for every compressible file (build step)"""
+    site = StaticSite(directory)
+    written = 0
+    for url_path, static_file in site.files.items():
+        path = site.directory / url_path.lstrip("/")
+        for encoding, body in static_file.variants.items():
+            if encoding is not None:
+                path.with_name(path.name + SUFFIXES[encoding]).write_bytes(body)
+                written += 1
+    return written
+
+
+if __name__ == "__main__":
+    import sys
+    target = sys.argv[1] if len(sys.argv) > 1 else os.environ.get("FRONTEND_BUILD_DIR")
+    if not target:
+        sys.exit("usage: python static_site.py BUILD_DIR (or set FRONTEND_BUILD_DIR)")
+    print(f"{target}: {write_precompressed(target)} precompressed files written")
@@ -0,0 +1,111 @@
+"""Nitrogen response yield model.
+
+Expected yield depends on soil points, the nitrogen actually applied and the
+cultivation method. The reference yield from calculate_yield_by_soil_points is
+reached at the crop's full N requirement (N_REQUIREMENTS); below or above it a
+per-crop response curve scales the yield:
+
+- mitscherlich:       r(N) = 1 - (1 - b) * exp(-c * N)
+- quadratic_plateau:  r(N) = b + (1 - b) * (2x - x²), x = min(N / N_plateau, 1)
+
+with b the relative yield without nitrogen and N in kg N/ha. Parameters are
+loaded from a versioned JSON table (data/yield_models.json, or the file named
+by YIELD_MODEL_TABLE) and evaluated over NumPy arrays, so sweeps and quotes
+can price any N rate.
+"""
+import json
+import os
+from pathlib import Path
+import numpy as np
+from reference_data import CropType, CultivationMethod, N_REQUIREMENTS, calculate_yield_by_soil_points
+
+MODELS = ["mitscherlich", "quadratic_plateau"]
+HA_PER_PLOT = 0.025  # 250 m²
+
+DEFAULT_TABLE = Path(__file__).parent / "data" / "yield_models.json"
+
+
+class YieldModelTable:
+    """Response curve parameters as arrays indexed like list(CropType)"""
+
+    def __init__(self, data):
+        self.version = data["version"]
+        self.crops = list(CropType)
+        self.index = {crop: index for index, crop in enumerate(self.crops)}
+
+        params = data["crops"]
+        missing = [crop.value for crop in self.crops if crop.value not in params]
+        if missing:
+            raise ValueError(f"Yield model table {self.version} has no parameters for {', '.join(missing)}")
+
+        model, share, rate, plateau, organic = [], [], [], [], []
+        for crop in self.crops:
+            crop_params = params[crop.value]
+            if crop_params["model"] not in MODELS:
+                raise ValueError(f"{crop.value}: unknown yield model {crop_params['model']!r}")
+            if not 0 < crop_params["unfertilized_share"] <= 1:
+                raise ValueError(f"{crop.value}: unfertilized_share must be in (0, 1]")
+            model.append(MODELS.index(crop_params["model"]))
+            share.append(crop_params["unfertilized_share"])
+            rate.append(crop_params.get("response_rate", 0.0))
+            plateau.append(crop_params.get("plateau_n_kg_ha", 1.0))
+            organic.append(crop_params.get("organic_factor", 1.0))
+
+        self.model = np.array(model)
+        self.unfertilized_share = np.array(share, dtype=float)
+        self.response_rate = np.array(rate, dtype=float)
+        self.plateau_n = np.array(plateau, dtype=float)
+        self.organic_factor = np.array(organic, dtype=float)
+        self.n_requirement = np.array([N_REQUIREMENTS.get(crop, 0.0) for crop in self.crops], dtype=float)
+
+    def as_dict(self):
+        return {
+            "version": self.version,
+            "crops": {
+                crop.value: {
+                    "model": MODELS[self.model[index]],
+                    "unfertilized_share": float(self.unfertilized_share[index]),
+                    "response_rate": float(self.response_rate[index]),
+                    "plateau_n_kg_ha": float(self.plateau_n[index]),
+                    "organic_factor": float(self.organic_factor[index])
+                }
+                for index, crop in enumerate(self.crops)
+            }
+        }
+
+    def response(self, crop_index, n_kg_ha):
+        """Relative yield r(N) for crop indices and N rates (broadcast together)"""
+        share = self.unfertilized_share[crop_index]
+        n_kg_ha = np.maximum(n_kg_ha, 0)
+        mitscherlich = 1 - (1 - share) * np.exp(-self.response_rate[crop_index] * n_kg_ha)
+        x = np.minimum(n_kg_ha / self.plateau_n[crop_index], 1)
+        quadratic_plateau = share + (1 - share) * (2 * x - x ** 2)
+        return np.where(self.model[crop_index] == 0, mitscherlich, quadratic_plateau)
+
+    def yield_factor(self, crop_index, applied_n_kg, reference_n_kg, organic=False):
+        """Yield relative to the reference yield; N amounts are kg per 250 m² plot"""
+        factor = (
+            self.response(crop_index, np.asarray(applied_n_kg) / HA_PER_PLOT)
+            / self.response(crop_index, np.asarray(reference_n_kg) / HA_PER_PLOT)
+        )
+        return np.where(organic, factor * self.organic_factor[crop_index], factor)
+
+    def expected_yield(self, crop_type, soil_points, applied_n_kg=None, cultivation_method=None):
+        """Expected yield in kg per plot; applied_n_kg=None means the full N requirement"""
+        reference_yield = calculate_yield_by_soil_points(crop_type, soil_points)
+        index = self.index[crop_type]
+        reference_n = reference_yield / 1000 * self.n_requirement[index]
+        if applied_n_kg is None:
+            applied_n_kg = reference_n
+        organic = cultivation_method == CultivationMethod.BIOLOGISCH
+        factor = self.yield_factor(index, applied_n_kg, reference_n, organic)
+        return round(reference_yield * float(factor), 1)
+
+
+def load_yield_model(path=None):
+    path = Path(path or os.environ.get("YIELD_MODEL_TABLE") or DEFAULT_TABLE)
+    with open(path, encoding="utf-8") as table_file:
+        return YieldModelTable(json.load(table_file))
+
+
+YIELD_MODEL = load_yield_model()
@@ -78,6 +78,7 @@ const App = () => {
   const [marketPrices, setMarketPrices] = useState({});
   const [expectedYields, setExpectedYields] = useState({});
   const [marketValues, setMarketValues] = useState({});
+  const [seedCosts, setSeedCosts] = useState({});
   const [selectedPlot, setSelectedPlot] = useState(null);
   const [farmingDecision, setFarmingDecision] = useState({
     cultivation_method: '',
@@ -160,6 +161,9 @@ const App = () => {
         const marketRes = await axios.get(`${API}/market-prices`).catch(() => ({ data: {} }));
         setMarketPrices(marketRes.data);
         
+        const seedCostsRes = await axios.get(`${API}/seed-costs`).catch(() => ({ data: {} }));
+        setSeedCosts(seedCostsRes.data);
+        
         const activePlotsRes = await axios.get(`${API}/active-plots-count`).catch(() => ({ data: { count: 0 } }));
         setActivePlotsCount(activePlotsRes.data.count);
 
@@ -176,11 +180,12 @@ const App = () => {
         setMachinesByStep(machinesByStep);
       } else {
         // Desktop: Parallele API-Calls für bessere Performance
-        const [plotsRes, machinesRes, fertilizerRes, marketRes, activePlotsRes] = await Promise.all([
+        const [plotsRes, machinesRes, fertilizerRes, marketRes, seedCostsRes, activePlotsRes] = await Promise.all([
           axios.get(`${API}/plots`).catch(() => ({ data: [] })),
           axios.get(`${API}/machines`).catch(() => ({ data: [] })),
           axios.get(`${API}/fertilizer-specs`).catch(() => ({ data: {} })),
           axios.get(`${API}/market-prices`).catch(() => ({ data: {} })),
+          axios.get(`${API}/seed-costs`).catch(() => ({ data: {} })),
           axios.get(`${API}/active-plots-count`).catch(() => ({ data: { count: 0 } }))
         ]);
 
@@ -188,6 +193,7 @@ const App = () => {
         setMachines(machinesRes.data);
         setFertilizerSpecs(fertilizerRes.data);
         setMarketPrices(marketRes.data);
+        setSeedCosts(seedCostsRes.data);
         setActivePlotsCount(activePlotsRes.data.count);
 
         // KRITISCH: Maschinen-Gruppierung für die Anzeige
@@ -359,7 +365,14 @@ const App = () => {
     const fertilizerCost = farmingDecision.fertilizer_choice.cost || 0;
     const shippingCost = farmingDecision.harvest_option === 'ship_home' ? 25.0 : 0;
     
-    return plotCost + machineCost + fertilizerCost + shippingCost;
+    // Same cost model as the backend pricing engine (backend/pricing.py)
+    return plotCost + machineCost + fertilizerCost + getSeedCost() + shippingCost;
+  };
+
+  const getSeedCost = () => {
+    if (!farmingDecision.crop_type) return 0;
+    
+    return seedCosts[farmingDecision.crop_type] || 0;
   };
 
   const getExpectedMarketValue = () => {
@@ -1597,7 +1610,11 @@ const App = () => {
               <span>{expectedYields[farmingDecision.crop_type] || 0}kg</span>
             </div>
             <div className="flex justify-between py-2 border-b">
-              <span className="font-medium">Parzellen- & Maschinenkosten:</span>
+              <span className="font-medium">Saatgut:</span>
+              <span>{getSeedCost().toFixed(2)}€</span>
+            </div>
+            <div className="flex justify-between py-2 border-b">
+              <span className="font-medium">Parzellen-, Maschinen- & Saatgutkosten:</span>
               <span className="text-lg font-bold text-red-600">{calculateTotalCost().toFixed(2)}€</span>
             </div>
             <div className="flex justify-between py-2 border-b bg-green-50">
@@ -0,0 +1,41 @@
+"""Shared fixtures.
+
+The backend modules import each other flat (uvicorn runs server:app from
+backend/), so backend/ goes on sys.path. The server runs against the
+in-memory data backend; no MongoDB server is needed:
+
+    python -m pytest tests
+"""
+import os
+import sys
+from pathlib import Path
+import pytest
+
+os.environ["DATA_BACKEND"] = "memory"
+os.environ["ADVISORY_RULES_INTERVAL_MINUTES"] = "0"
+os.environ.pop("CATALOG_SNAPSHOT", None)
+os.environ.pop("FRONTEND_BUILD_DIR", None)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from fastapi.testclient import TestClient  # noqa: E402
+from repositories import build_repositories  # noqa: E402
+
+
+@pytest.fixture
+def repos():
+    return build_repositories("memory")
+
+
+@pytest.fixture
+def server(monkeypatch):
+    import server
+    monkeypatch.setattr(server, "repos", build_repositories("memory", on_write=server.invalidation_bus.publish))
+    return server
+
+
+@pytest.fixture
+def client(server):
+    """API client on fresh in-memory data with the fixture plots and machines"""
+    with TestClient(server.app) as client:
+        assert client.post("/api/initialize-data").status_code == 200
+        yield client
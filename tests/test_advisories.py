@@ -0,0 +1,53 @@
+def place_order(client, plot_id, crop_type="winterweizen"):
+    return client.post("/api/orders", json={
+        "user_name": "Kunde",
+        "user_email": "kunde@example.com",
+        "plot_id": plot_id,
+        "farming_decision": {
+            "cultivation_method": "konventionell",
+            "crop_type": crop_type,
+            "expected_yield_kg": 1,
+            "fertilizer_choice": {"fertilizer_type": "kas", "amount": 10, "cost": 3},
+            "machines": {},
+            "harvest_option": "sell_to_farmer"
+        }
+    }).json()["id"]
+
+
+def broadcast(client, **order_filter):
+    response = client.post("/api/advisories/broadcast", json={
+        "message": "Frost erwartet", "advisory_type": "weather", "filter": order_filter
+    })
+    assert response.status_code == 200
+    return response.json()
+
+
+def advised(client, order_id):
+    return [advisory["broadcast_id"] for advisory in client.get(f"/api/orders/{order_id}/advisories").json()]
+
+
+def test_broadcast_targets_active_orders_matching_the_filter(client):
+    plots = [plot["id"] for plot in client.get("/api/plots").json()[:3]]
+    wheat = place_order(client, plots[0])
+    maize = place_order(client, plots[1], "silomais")
+    pending = place_order(client, plots[2])
+    client.post("/api/orders/bulk-status", json={"status": "confirmed", "order_ids": [wheat, maize]})
+
+    # Default: all active orders, so not the pending one
+    everyone = broadcast(client)
+    assert everyone["advisories_created"] == 2
+    assert advised(client, wheat) == advised(client, maize) == [everyone["broadcast_id"]]
+    assert advised(client, pending) == []
+
+    by_crop = broadcast(client, crop_type="silomais")
+    assert by_crop["advisories_created"] == 1
+    assert by_crop["broadcast_id"] in advised(client, maize)
+
+    by_status = broadcast(client, status=["pending"])
+    assert by_status["advisories_created"] == 1
+    assert advised(client, pending) == [by_status["broadcast_id"]]
+
+    assert broadcast(client, plot_ids=[plots[0]])["advisories_created"] == 1
+    # Region and plot list intersect
+    assert broadcast(client, locations=["39291 Grabow"], plot_ids=[plots[1], plots[2]])["advisories_created"] == 1
+    assert broadcast(client, locations=["Nirgendwo"])["advisories_created"] == 0
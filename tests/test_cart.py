@@ -0,0 +1,47 @@
+import asyncio
+from tests.test_orders import farming_decision
+
+
+def test_place_cart_orders_reserves_all_plots_or_none(repos):
+    async def scenario():
+        await repos.plots.insert_many([
+            {"id": "p1", "available": True},
+            {"id": "p2", "available": True},
+            {"id": "p3", "available": False}
+        ])
+        assert await repos.place_cart_orders("cart1", ["p1"], [{"id": "o1", "cart_id": "cart1", "plot_id": "p1"}])
+        assert await repos.plots.get("p1") == {"id": "p1", "available": False}  # No reservation marker left
+
+        # p3 is taken: p2 must stay free and no order of the cart may be written
+        placed = await repos.place_cart_orders("cart2", ["p2", "p3"], [
+            {"id": "o2", "cart_id": "cart2", "plot_id": "p2"},
+            {"id": "o3", "cart_id": "cart2", "plot_id": "p3"}
+        ])
+        assert placed is False
+        assert (await repos.plots.get("p2"))["available"] is True
+        assert await repos.orders.count({"cart_id": "cart2"}) == 0
+        assert await repos.orders.count() == 1
+    asyncio.run(scenario())
+
+
+def test_cart_conflict_rolls_back_the_whole_cart(client):
+    plots = client.get("/api/plots").json()
+    cart = {
+        "user_name": "Kunde",
+        "user_email": "kunde@example.com",
+        "items": [{"plot_id": plots[0]["id"], "farming_decision": farming_decision()}]
+    }
+    response = client.post("/api/orders/cart", json=cart)
+    assert response.status_code == 200
+    assert len(response.json()["orders"]) == 1
+
+    # plots[0] is taken now, so plots[1] must not be reserved either
+    cart["items"] = [
+        {"plot_id": plots[1]["id"], "farming_decision": farming_decision()},
+        {"plot_id": plots[0]["id"], "farming_decision": farming_decision()}
+    ]
+    assert client.post("/api/orders/cart", json=cart).status_code == 409
+    available = {plot["id"] for plot in client.get("/api/plots").json()}
+    assert plots[0]["id"] not in available
+    assert plots[1]["id"] in available
+    assert len(client.get("/api/orders").json()) == 1
@@ -0,0 +1,98 @@
+import gzip
+import json
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+from compression import ENCODINGS, CompressionMiddleware, PrecompressedPayload, choose_encoding
+
+BIG = {"values": list(range(500))}
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    (None, None),
+    ("", None),
+    ("gzip", "gzip"),
+    ("gzip;q=0.5, br", "br" if "br" in ENCODINGS else "gzip"),
+    ("br;q=0, gzip;q=0.1", "gzip"),
+    ("*", ENCODINGS[0]),
+    ("*, gzip;q=0", "br" if "br" in ENCODINGS else None),
+    ("identity", None),
+    ("gzip;q=invalid", None)
+])
+def test_choose_encoding(accept_encoding, expected):
+    assert choose_encoding(accept_encoding) == expected
+
+
+@pytest.fixture(scope="module")
+def compressing_client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @app.get("/big")
+    def big():
+        return BIG
+
+    @app.get("/small")
+    def small():
+        return {"values": [1, 2, 3]}
+
+    @app.get("/text")
+    def text():
+        return PlainTextResponse("x" * 2000, headers={"Content-Encoding": "identity"})
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([b"data: 1\n\n", b"data: 2\n\n"]), media_type="text/event-stream")
+
+    with TestClient(app) as client:
+        yield client
+
+
+def test_large_responses_are_compressed(compressing_client):
+    response = compressing_client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    # The client decodes transparently
+    assert response.json() == BIG
+    assert int(response.headers["content-length"]) < len(json.dumps(BIG))
+
+
+@pytest.mark.parametrize("path, accept_encoding", [("/small", "gzip"), ("/big", "identity")])
+def test_uncompressed_variants_still_vary(compressing_client, path, accept_encoding):
+    response = compressing_client.get(path, headers={"Accept-Encoding": accept_encoding})
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+def test_streams_and_encoded_responses_pass_through(compressing_client):
+    stream = compressing_client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert stream.text == "data: 1\n\ndata: 2\n\n"
+    assert "content-encoding" not in stream.headers and "vary" not in stream.headers
+    text = compressing_client.get("/text", headers={"Accept-Encoding": "gzip"})
+    assert text.headers["content-encoding"] == "identity"
+    assert text.text == "x" * 2000
+
+
+def test_precompressed_payload_variants():
+    payload = PrecompressedPayload({"weizen": 1.5, "mais": "Mais"})
+    identity = payload.variants[None]
+    assert json.loads(identity) == {"weizen": 1.5, "mais": "Mais"}
+    assert gzip.decompress(payload.variants["gzip"]) == identity
+    assert set(payload.sizes()) == {"identity", *ENCODINGS}
+
+
+def test_precompressed_payloads_are_served_with_validators(client):
+    response = client.get("/api/seed-costs", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    etag = response.headers["etag"]
+
+    identity = client.get("/api/seed-costs", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert identity.json() == response.json()
+    assert identity.headers["etag"] == etag
+
+    cached = client.get("/api/seed-costs", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
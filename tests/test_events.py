@@ -0,0 +1,113 @@
+import asyncio
+import itertools
+import json
+import events
+from events import EventBus, customer_topic, format_sse, order_topic, relay_events
+from repositories import matches
+from tests.test_advisories import place_order
+
+
+def drain(queue):
+    events = []
+    while not queue.empty():
+        events.append(queue.get_nowait())
+    return events
+
+
+def test_publish_reaches_subscribers_of_the_topics():
+    bus = EventBus()
+    order_queue = bus.subscribe(order_topic("o1"))
+    customer_queue = bus.subscribe(customer_topic("Kunde@Example.com"))
+    other_queue = bus.subscribe(order_topic("o2"))
+    assert bus.subscriber_count() == 3
+
+    bus.publish([order_topic("o1"), customer_topic("kunde@example.com")], {"type": "order_status", "status": "growing"})
+    assert drain(order_queue) == drain(customer_queue) == [{"type": "order_status", "status": "growing"}]
+    assert drain(other_queue) == []
+
+    bus.unsubscribe(order_topic("o2"), other_queue)
+    bus.unsubscribe(order_topic("o2"), other_queue)
+    assert bus.subscriber_count() == 2
+
+
+def test_slow_subscribers_lose_the_oldest_events():
+    bus = EventBus(queue_size=3)
+    queue = bus.subscribe("topic")
+    for number in range(5):
+        bus.publish(["topic"], {"type": "tick", "number": number})
+    assert [event["number"] for event in drain(queue)] == [2, 3, 4]
+
+
+def test_format_sse():
+    message = format_sse({"type": "advisory", "order_id": "o1"})
+    event_line, data_line, *_ = message.split("\n")
+    assert event_line == "event: advisory"
+    assert json.loads(data_line.removeprefix("data: ")) == {"type": "advisory", "order_id": "o1"}
+    assert message.endswith("\n\n")
+
+
+def test_status_changes_and_advisories_are_published(client, server):
+    order_id = place_order(client, client.get("/api/plots").json()[0]["id"])
+    order_queue = server.event_bus.subscribe(order_topic(order_id))
+    customer_queue = server.event_bus.subscribe(customer_topic("kunde@example.com"))
+    try:
+        client.patch(f"/api/orders/{order_id}", json={"status": "confirmed"})
+        client.post("/api/advisories/broadcast", json={
+            "message": "Frost erwartet", "advisory_type": "weather", "filter": {}
+        })
+        events = drain(order_queue)
+        assert [event["type"] for event in events] == ["order_status", "advisory"]
+        assert events[0]["status"] == "confirmed"
+        assert events[1]["advisory"]["message"] == "Frost erwartet"
+        assert len(drain(customer_queue)) == 2
+    finally:
+        server.event_bus.unsubscribe(order_topic(order_id), order_queue)
+        server.event_bus.unsubscribe(customer_topic("kunde@example.com"), customer_queue)
+
+
+def test_streams_need_an_existing_order(client):
+    assert client.get("/api/orders/unknown/events").status_code == 404
+
+
+class FakeEventCollection:
+    """Just enough of a Motor collection for the relay"""
+    def __init__(self):
+        self.documents = []
+
+    async def insert_many(self, documents):
+        self.documents.extend(documents)
+
+    async def find(self, filter, projection):
+        for document in list(self.documents):
+            if matches(document, filter):
+                yield document
+
+
+def test_relay_delivers_events_of_other_workers_once(monkeypatch):
+    # Both relays run in this process, so give them distinct worker ids
+    monkeypatch.setattr(events.os, "getpid", itertools.count(1).__next__)
+
+    async def scenario():
+        collection = FakeEventCollection()
+        sender, receiver = EventBus(), EventBus()
+        relays = [asyncio.create_task(relay_events(collection, bus, interval=0.01)) for bus in (sender, receiver)]
+        try:
+            await asyncio.sleep(0.03)
+            sender.publish([order_topic("o1")], {"type": "order_status", "status": "confirmed"})
+            await asyncio.sleep(0.05)
+            # Events from before the first subscriber are not replayed
+            remote = receiver.subscribe(order_topic("o1"))
+            local = sender.subscribe(order_topic("o1"))
+            await asyncio.sleep(0.05)
+            assert drain(remote) == []
+
+            sender.publish([order_topic("o1")], {"type": "order_status", "status": "growing"})
+            await asyncio.sleep(0.1)
+            # Polled many times within the lag, delivered once, and not echoed back to the sender
+            assert drain(remote) == drain(local) == [{"type": "order_status", "status": "growing"}]
+            assert (sender.relayed, receiver.relayed) == (0, 1)
+            assert len(collection.documents) == 2
+        finally:
+            for relay in relays:
+                relay.cancel()
+    asyncio.run(scenario())
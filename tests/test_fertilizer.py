@@ -0,0 +1,78 @@
+from itertools import product
+import numpy as np
+import pytest
+from fertilizer import FERTILIZER_TABLE, optimize_mix
+from reference_data import FERTILIZER_MAX_AMOUNTS_250M2, FertilizerType
+
+USABLE = [index for index, category in enumerate(FERTILIZER_TABLE.categories) if category != "none"]
+
+
+def caps(max_amounts):
+    by_type = dict(FERTILIZER_MAX_AMOUNTS_250M2)
+    by_type.update(dict(max_amounts))
+    return [by_type.get(FERTILIZER_TABLE.types[index], np.inf) for index in USABLE]
+
+
+def greedy_n_only(n_requirement, product_caps):
+    """Exact for a single nutrient: fill up with the cheapest N per euro first"""
+    cost, need = 0.0, n_requirement
+    order = sorted(USABLE, key=lambda index: FERTILIZER_TABLE.eur_per_unit[index] / FERTILIZER_TABLE.kg_n_per_unit[index])
+    for index in order:
+        kg_n = FERTILIZER_TABLE.kg_n_per_unit[index]
+        amount = min(product_caps[USABLE.index(index)], need / kg_n)
+        cost += amount * FERTILIZER_TABLE.eur_per_unit[index]
+        need -= amount * kg_n
+        if need <= 1e-9:
+            return cost
+    return None
+
+
+def grid_minimum(n_requirement, s_requirement, product_caps, steps=7):
+    """Cheapest feasible point on a grid over all product amounts"""
+    axes = []
+    for index, cap in zip(USABLE, product_caps):
+        upper = cap if np.isfinite(cap) else n_requirement / FERTILIZER_TABLE.kg_n_per_unit[index]
+        axes.append(np.linspace(0, upper, steps))
+    points = np.array(list(product(*axes)))
+    n = points @ FERTILIZER_TABLE.kg_n_per_unit[USABLE]
+    s = points @ FERTILIZER_TABLE.kg_s_per_unit[USABLE]
+    cost = points @ FERTILIZER_TABLE.eur_per_unit[USABLE]
+    feasible = (n >= n_requirement - 1e-9) & (s >= s_requirement - 1e-9)
+    return cost[feasible].min() if feasible.any() else None
+
+
+SMALL_CAPS = (
+    (FertilizerType.SSA, 6.0), (FertilizerType.KAS, 6.0), (FertilizerType.SCHWEINEGULLE, 0.5),
+    (FertilizerType.RINDERGUELLE, 0.5), (FertilizerType.GAERREST, 0.5), (FertilizerType.RINDERMIST, 0.5)
+)
+
+
+@pytest.mark.parametrize("n_requirement", [0.5, 1.5, 2.5, 4.0, 6.0])
+@pytest.mark.parametrize("max_amounts", [(), SMALL_CAPS])
+def test_n_only_matches_greedy(n_requirement, max_amounts):
+    result = optimize_mix(n_requirement, max_amounts=max_amounts)
+    expected = greedy_n_only(n_requirement, caps(max_amounts))
+    if expected is None:
+        assert result is None
+    else:
+        assert result["total_cost"] == pytest.approx(expected, abs=0.01)
+        assert result["n_supplied_kg"] >= n_requirement - 0.01
+
+
+@pytest.mark.parametrize("n_requirement,s_requirement", [(1.0, 0.3), (2.0, 0.5), (3.0, 1.0), (4.0, 1.4)])
+def test_n_and_s_no_grid_point_is_cheaper(n_requirement, s_requirement):
+    result = optimize_mix(n_requirement, s_requirement, max_amounts=SMALL_CAPS)
+    grid_cost = grid_minimum(n_requirement, s_requirement, caps(SMALL_CAPS))
+    if result is None:
+        assert grid_cost is None
+        return
+    assert result["n_supplied_kg"] >= n_requirement - 0.01
+    assert result["s_supplied_kg"] >= s_requirement - 0.01
+    assert grid_cost is None or result["total_cost"] <= grid_cost + 0.01
+    for item in result["mix"]:
+        assert item["amount"] <= dict(SMALL_CAPS)[item["fertilizer_type"]] + 0.01
+
+
+def test_infeasible_requirement():
+    assert optimize_mix(100.0, max_amounts=SMALL_CAPS) is None
+    assert optimize_mix(1.0, 5.0, max_amounts=SMALL_CAPS) is None
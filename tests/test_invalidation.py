@@ -0,0 +1,122 @@
+import asyncio
+import itertools
+import invalidation
+from invalidation import InvalidationBus, _change_ids, _changed_ids, poll_change_log
+from repositories import matches
+
+
+class FakeChangeLog:
+    """Just enough of a Motor collection for the catalog_versions change log"""
+    def __init__(self):
+        self.documents = {}
+        self.updates = []
+
+    async def update_one(self, filter, update, upsert=False):
+        self.updates.append((filter["_id"], update))
+        document = self.documents.setdefault(filter["_id"], {"_id": filter["_id"], "version": 0})
+        document["version"] += update["$inc"]["version"]
+        if "$push" in update:
+            push = update["$push"]["changes"]
+            document["changes"] = (document.get("changes", []) + push["$each"])[push["$slice"]:]
+
+    async def find(self, filter):
+        for document in list(self.documents.values()):
+            if matches(document, filter):
+                yield document
+
+
+def test_notify_bumps_versions_and_calls_subscribers():
+    bus = InvalidationBus()
+    calls = []
+    bus.subscribe("plots", calls.append)
+    bus.notify("plots", {"p1"})
+    bus.notify("plots")
+    bus.notify("unknown", {"x"})
+    assert calls == [{"p1"}, None]
+    assert bus.status() == {"mode": "local", "versions": {"plots": 2, "machines": 0, "orders": 0}, "received": 0}
+
+
+def test_publish_queues_coalesced_changes(monkeypatch):
+    monkeypatch.setattr(invalidation, "MAX_LOGGED_IDS", 3)
+
+    async def scenario():
+        bus = InvalidationBus()
+        # Without a change log (memory backend) writes are only applied locally
+        await bus.publish("plots", ["p1"])
+        assert bus.pending == {}
+
+        bus.change_log = FakeChangeLog()
+        bus.worker_id = "w1"
+        await bus.publish("plots", ["p1"])
+        await bus.publish("plots", ["p2", "p1"])
+        await bus.publish("orders", ["o1"])
+        await bus.publish("machines", ["m1", "m2"])
+        await bus.publish("machines", ["m3", "m4"])
+        assert bus.pending == {"plots": {"p1", "p2"}, "orders": None, "machines": None}
+        assert bus.versions["plots"] == 3
+
+        await bus.flush()
+        assert bus.pending == {}
+        assert bus.change_log.updates == [
+            ("plots", {"$inc": {"version": 1}, "$push": {"changes": {
+                "$each": [{"worker": "w1", "ids": ["p1", "p2"]}], "$slice": -invalidation.CHANGE_LOG_LENGTH
+            }}}),
+            ("orders", {"$inc": {"version": 1}}),
+            ("machines", {"$inc": {"version": 1}, "$push": {"changes": {
+                "$each": [{"worker": "w1", "ids": None}], "$slice": -invalidation.CHANGE_LOG_LENGTH
+            }}})
+        ]
+        await bus.flush()
+        assert len(bus.change_log.updates) == 3
+    asyncio.run(scenario())
+
+
+def test_changed_ids():
+    document = {"version": 5, "changes": [
+        {"worker": "w2", "ids": ["a"]},
+        {"worker": "w1", "ids": ["b"]},
+        {"worker": "w2", "ids": ["c"]}
+    ]}
+    assert _changed_ids(document, 4, "w1") == {"c"}
+    # Own writes are skipped
+    assert _changed_ids(document, 3, "w1") == {"c"}
+    assert _changed_ids(document, 2, "w1") == {"a", "c"}
+    # The log does not reach back to version 1
+    assert _changed_ids(document, 1, "w1") is None
+    document["changes"].append({"worker": "w2", "ids": None})
+    document["version"] = 6
+    assert _changed_ids(document, 5, "w1") is None
+    assert _changed_ids({"version": 3}, 3, "w1") == set()
+
+
+def test_change_ids():
+    assert _change_ids({"fullDocument": {"id": "p1"}, "documentKey": {"_id": "x"}}) == {"p1"}
+    assert _change_ids({"documentKey": {"_id": "x", "id": "p2"}}) == {"p2"}
+    assert _change_ids({"fullDocument": None, "documentKey": {"_id": "x"}}) is None
+
+
+def test_polling_applies_changes_of_other_workers(monkeypatch):
+    # Both pollers run in this process, so give them distinct worker ids
+    monkeypatch.setattr(invalidation.os, "getpid", itertools.count(1).__next__)
+
+    async def scenario():
+        change_log = FakeChangeLog()
+        writer, reader = InvalidationBus(), InvalidationBus()
+        received = {"writer": [], "reader": []}
+        writer.subscribe("plots", received["writer"].append)
+        reader.subscribe("plots", received["reader"].append)
+        pollers = [asyncio.create_task(poll_change_log(change_log, bus, 0.01)) for bus in (writer, reader)]
+        try:
+            await asyncio.sleep(0.03)
+            await writer.publish("plots", ["p1"])
+            await writer.publish("plots", ["p2"])
+            await asyncio.sleep(0.1)
+            # The writer applied its writes right away and ignores them in the log
+            assert received["writer"] == [["p1"], ["p2"]]
+            assert received["reader"] == [{"p1", "p2"}]
+            assert (writer.received, reader.received) == (0, 1)
+            assert reader.mode == "polling"
+        finally:
+            for poller in pollers:
+                poller.cancel()
+    asyncio.run(scenario())
@@ -0,0 +1,78 @@
+FERTILIZER_CHOICE = {"fertilizer_type": "kas", "amount": 10, "cost": 3}
+
+
+def farming_decision(crop_type="winterweizen"):
+    return {
+        "cultivation_method": "konventionell",
+        "crop_type": crop_type,
+        "expected_yield_kg": 1,
+        "fertilizer_choice": FERTILIZER_CHOICE,
+        "machines": {},
+        "harvest_option": "sell_to_farmer"
+    }
+
+
+def create_orders(client, count):
+    plots = client.get("/api/plots").json()[:count]
+    return [
+        client.post("/api/orders", json={
+            "user_name": "Kunde",
+            "user_email": "kunde@example.com",
+            "plot_id": plot["id"],
+            "farming_decision": farming_decision()
+        }).json()["id"]
+        for plot in plots
+    ]
+
+
+def test_bulk_status_result_categories(client):
+    order_ids = create_orders(client, 3)
+    client.post("/api/orders/bulk-status", json={"status": "confirmed", "order_ids": order_ids[:2]})
+
+    response = client.post("/api/orders/bulk-status", json={
+        "status": "growing",
+        "order_ids": order_ids + ["unknown"]
+    }).json()
+    results = {result["order_id"]: result["result"] for result in response["results"]}
+    assert results == {
+        order_ids[0]: "updated",
+        order_ids[1]: "updated",
+        order_ids[2]: "illegal_transition",  # pending -> growing skips the payment
+        "unknown": "not_found"
+    }
+    assert response["matched"] == 3
+    assert response["modified"] == 2
+
+    response = client.post("/api/orders/bulk-status", json={"status": "growing", "order_ids": order_ids[:1]}).json()
+    assert response["summary"] == {"unchanged": 1}
+    assert response["modified"] == 0
+
+
+def test_bulk_status_reports_concurrent_changes_as_conflicts(client, server):
+    order_ids = create_orders(client, 2)
+    client.post("/api/orders/bulk-status", json={"status": "confirmed", "order_ids": order_ids})
+    orders = server.repos.orders
+    update_where = orders.update_where
+
+    async def update_after_concurrent_change(filter, set=None, unset=None, session=None):
+        # Another request moves the first order on between the read and the guarded update
+        await update_where({"id": order_ids[0]}, {"status": "implementing"})
+        return await update_where(filter, set, unset, session)
+
+    orders.update_where = update_after_concurrent_change
+    response = client.post("/api/orders/bulk-status", json={"status": "growing", "order_ids": order_ids}).json()
+    del orders.update_where
+
+    results = {result["order_id"]: result["result"] for result in response["results"]}
+    assert results == {order_ids[0]: "conflict", order_ids[1]: "updated"}
+    assert response["modified"] == 1
+    assert client.get(f"/api/orders/{order_ids[0]}").json()["status"] == "implementing"
+
+
+def test_patch_enforces_status_transitions(client):
+    order_id = create_orders(client, 1)[0]
+    assert client.patch(f"/api/orders/{order_id}", json={"status": "growing"}).status_code == 409
+    assert client.patch(f"/api/orders/{order_id}", json={"status": "confirmed"}).json()["status"] == "confirmed"
+    assert client.patch(f"/api/orders/{order_id}", json={"status": "pending"}).status_code == 409
+    assert client.patch(f"/api/orders/{order_id}", json={"status": "confirmed", "notes": "ok"}).json()["notes"] == "ok"
+
@@ -0,0 +1,75 @@
+import random
+from itertools import product
+import pytest
+from portfolio import Objective, _solve_exact, _solve_greedy, candidate_options, optimize_portfolio
+from scenarios import SweepTables, sweep
+from seeding import load_fixtures
+
+PLOT_PRICES = [7.5, 9.0, 11.0, 14.0]
+SOIL_POINTS = [28, 35, 45, 55]
+
+
+@pytest.fixture(scope="module")
+def result():
+    return sweep(SweepTables(load_fixtures()["machines"]), PLOT_PRICES, SOIL_POINTS)
+
+
+def evaluate(options, choices):
+    payment = sum(options[plot][choice][0] for plot, choice in enumerate(choices) if choice is not None)
+    value = sum(options[plot][choice][1] for plot, choice in enumerate(choices) if choice is not None)
+    return payment, value
+
+
+def brute_force(options, budget):
+    best = 0.0
+    for choices in product(*[[None] + list(range(len(plot_options))) for plot_options in options]):
+        payment, value = evaluate(options, choices)
+        if payment <= budget + 1e-9:
+            best = max(best, value)
+    return best
+
+
+def random_options(rng, plots=5, per_plot=4):
+    """Pruned options per plot: payment and value both strictly increasing"""
+    options = []
+    for _ in range(plots):
+        payment, value, plot_options = 0.0, 0.0, []
+        for index in range(rng.randint(0, per_plot)):
+            payment += round(rng.uniform(1, 20), 2)
+            value += round(rng.uniform(0.5, 10), 2)
+            plot_options.append((payment, value, (index, 0, 0)))
+        options.append(plot_options)
+    return options
+
+
+def check_solvers(options, budget):
+    exact = _solve_exact(options, budget)
+    greedy = _solve_greedy(options, budget)
+
+    exact_payment, exact_value = evaluate(options, exact)
+    greedy_payment, greedy_value = evaluate(options, greedy)
+    assert exact_payment <= budget + 1e-9
+    assert greedy_payment <= budget + 1e-9
+    assert exact_value == pytest.approx(brute_force(options, budget))
+    assert greedy_value <= exact_value + 1e-9
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_exact_is_optimal_and_greedy_within_budget(seed):
+    rng = random.Random(seed)
+    options = random_options(rng)
+    for budget in (0.0, 10.0, 25.0, 50.0, 200.0):
+        check_solvers(options, budget)
+
+
+@pytest.mark.parametrize("objective", list(Objective))
+@pytest.mark.parametrize("budget", [0.0, 5.0, 15.0, 40.0])
+def test_solvers_on_the_sweep(result, objective, budget):
+    check_solvers(candidate_options(result, objective), budget)
+
+
+def test_optimize_portfolio_uses_the_exact_solver_for_small_portfolios(result):
+    selections, solver = optimize_portfolio(result, 20.0)
+    assert solver == "exact"
+    assert len(selections) == len(PLOT_PRICES)
+    assert sum(selection["payment_amount"] for selection in selections if selection) <= 20.0
@@ -0,0 +1,75 @@
+import pytest
+from pricing import SHIPPING_COST, quote
+from reference_data import CropType, HarvestOption, SEED_COSTS
+
+MACHINES = (("m1", 4.0), ("m2", 6.5))
+FERTILIZER_CHOICE = {"fertilizer_type": "kas", "amount": 10, "cost": 3}
+
+
+def test_breakdown_adds_up():
+    breakdown = quote(10.0, 40, CropType.WINTERWEIZEN, 3.0, MACHINES, HarvestOption.SHIP_HOME)
+    assert breakdown.machine_cost == 10.5
+    assert breakdown.seed_cost == SEED_COSTS[CropType.WINTERWEIZEN]
+    assert breakdown.shipping_cost == SHIPPING_COST
+    assert breakdown.total_cost == pytest.approx(10.0 + 10.5 + 3.0 + breakdown.seed_cost + SHIPPING_COST)
+    assert breakdown.profit_loss == pytest.approx(breakdown.expected_market_value - breakdown.total_cost)
+    # Keeping the harvest: the customer pays every cost
+    assert breakdown.payment_amount == breakdown.total_cost
+
+
+def test_selling_to_the_farmer_pays_only_the_net_loss():
+    breakdown = quote(10.0, 40, CropType.WINTERWEIZEN, 3.0, MACHINES, HarvestOption.SELL_TO_FARMER)
+    assert breakdown.shipping_cost == 0
+    assert breakdown.payment_amount == pytest.approx(max(0.0, -breakdown.profit_loss))
+
+
+def test_unsown_years_have_no_seed_cost():
+    sown = quote(10.0, 40, CropType.GRAS, 0.0, MACHINES, HarvestOption.SELL_TO_FARMER)
+    stand = quote(10.0, 40, CropType.GRAS, 0.0, MACHINES, HarvestOption.SELL_TO_FARMER, sown=False)
+    assert stand.seed_cost == 0
+    assert sown.total_cost - stand.total_cost == pytest.approx(SEED_COSTS[CropType.GRAS])
+
+
+def test_quote_matches_the_order_it_prices(client):
+    plot = client.get("/api/plots").json()[0]
+    machines = client.get("/api/machines").json()
+    sowing = next(machine for machine in machines if machine["working_step"] == "aussaat")
+    decision = {
+        "cultivation_method": "konventionell",
+        "crop_type": "winterweizen",
+        "expected_yield_kg": 1,
+        "fertilizer_choice": FERTILIZER_CHOICE,
+        "machines": {"aussaat": [sowing["id"]]},
+        "harvest_option": "sell_to_farmer"
+    }
+
+    response = client.post("/api/quote", json={
+        "plot_id": plot["id"],
+        "crop_type": decision["crop_type"],
+        "fertilizer_choice": FERTILIZER_CHOICE,
+        "machines": decision["machines"],
+        "harvest_option": decision["harvest_option"]
+    })
+    assert response.status_code == 200
+    breakdown = response.json()
+    assert breakdown["machine_cost"] == sowing["price_per_use"]
+    assert breakdown["plot_cost"] == plot["price_per_plot"]
+
+    order = client.post("/api/orders", json={
+        "user_name": "Kunde",
+        "user_email": "kunde@example.com",
+        "plot_id": plot["id"],
+        "farming_decision": decision
+    }).json()
+    assert order["total_cost"] == pytest.approx(breakdown["payment_amount"])
+    assert order["profit_loss"] == pytest.approx(breakdown["profit_loss"])
+
+    # Quoting writes nothing
+    assert len(client.get("/api/orders").json()) == 1
+
+
+def test_quote_for_unknown_plot(client):
+    response = client.post("/api/quote", json={
+        "plot_id": "unknown", "crop_type": "winterweizen", "harvest_option": "sell_to_farmer"
+    })
+    assert response.status_code == 404
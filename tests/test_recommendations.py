@@ -0,0 +1,96 @@
+import pytest
+import recommendations
+from recommendations import CropRecommendationCache
+from reference_data import CropType
+from seeding import load_fixtures
+from tests.test_advisories import place_order
+
+
+@pytest.fixture
+def catalog():
+    fixtures = load_fixtures()
+    return fixtures["plots"], fixtures["machines"]
+
+
+@pytest.fixture
+def sweeps(monkeypatch):
+    """Plot counts of the sweeps the recommendations run"""
+    calls = []
+    sweep = recommendations.sweep
+
+    def counting_sweep(tables, plot_prices, soil_points, cultivation_method=None):
+        calls.append(len(plot_prices))
+        return sweep(tables, plot_prices, soil_points, cultivation_method)
+
+    monkeypatch.setattr(recommendations, "sweep", counting_sweep)
+    return calls
+
+
+def test_only_changed_inputs_are_recomputed(catalog, sweeps):
+    plots, machines = catalog
+    cache = CropRecommendationCache()
+    assert cache.refresh(plots, machines) == len(plots)
+    assert cache.refresh(plots, machines) == 0
+    assert sweeps == [len(plots)]
+
+    # Availability does not change a ranking
+    reserved = [{**plot, "available": False} for plot in plots]
+    assert cache.update_plots(reserved[:2]) == 0
+
+    before = cache.get(plots[0]["id"])
+    cheaper = {**plots[0], "price_per_plot": plots[0]["price_per_plot"] - 5}
+    assert cache.update_plots([cheaper]) == 1
+    assert sweeps[-1] == 1
+    assert cache.get(cheaper["id"])[0]["profit_loss"] == pytest.approx(before[0]["profit_loss"] + 5)
+
+    assert cache.update_plots([], removed=[plots[1]["id"]]) == 0
+    assert cache.get(plots[1]["id"]) == []
+
+    # New machine prices change every ranking
+    machines = [{**machine, "price_per_use": machine["price_per_use"] + 1} for machine in machines]
+    assert cache.refresh(plots, machines) == len(plots)
+
+
+def test_hints_are_feasible_and_best_first(catalog):
+    plots, machines = catalog
+    cache = CropRecommendationCache()
+    cache.refresh(plots, machines)
+    for plot in plots:
+        hints = cache.get(plot["id"])
+        assert len(hints) == recommendations.TOP_CROPS
+        profits = [hint["profit_loss"] for hint in hints]
+        assert profits == sorted(profits, reverse=True)
+        # Neither has machines or a seed cost in the fixtures
+        assert not {CropType.WINTERRAPS, CropType.LUZERNE} & {hint["crop_type"] for hint in hints}
+
+
+def wait_for_refresh(client, server):
+    async def wait():
+        if server.recommendation_refresh_task is not None:
+            await server.recommendation_refresh_task
+    client.portal.call(wait)
+
+
+def test_orders_do_not_trigger_sweeps(client, server, sweeps, monkeypatch):
+    wait_for_refresh(client, server)
+    sweeps.clear()
+    full_refreshes = []
+    refresh = server.crop_recommendations.refresh
+    monkeypatch.setattr(server.crop_recommendations, "refresh", lambda *args: full_refreshes.append(1) or refresh(*args))
+    plots = client.get("/api/plots").json()
+    assert all(plot["best_crops"] for plot in plots)
+
+    # Reserving the plot re-checks only that plot, without reloading the catalog
+    place_order(client, plots[0]["id"])
+    wait_for_refresh(client, server)
+    assert sweeps == []
+    assert full_refreshes == []
+
+    response = client.post("/api/plots", json={
+        "name": "Neu", "soil_type": plots[0]["soil_type"], "soil_points": 40,
+        "location": "39291 Grabow", "description": "Neue Parzelle", "price_per_plot": 9.5
+    })
+    wait_for_refresh(client, server)
+    assert sweeps == [1]
+    new_plot = next(plot for plot in client.get("/api/plots").json() if plot["id"] == response.json()["id"])
+    assert new_plot["best_crops"]
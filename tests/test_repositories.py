@@ -0,0 +1,101 @@
+import asyncio
+import pytest
+from repositories import MemoryRepository
+
+
+def test_crud():
+    async def scenario():
+        repository = MemoryRepository()
+        await repository.insert({"id": "a", "name": "Acker", "size": 250, "tags": ["x"]})
+        await repository.insert_many([{"id": "b", "name": "Brache", "size": 100}, {"id": "c", "name": "Coppel", "size": 300}])
+
+        assert await repository.get("a", {"name": 1}) == {"name": "Acker"}
+        assert await repository.get("missing") is None
+        assert sorted(document["id"] for document in await repository.get_many(["c", "a", "missing"])) == ["a", "c"]
+        assert await repository.count({"size": {"$gte": 250}}) == 2
+        assert [document["id"] for document in await repository.find(sort=[("size", -1)], limit=2)] == ["c", "a"]
+        assert sorted(await repository.distinct("name", {"id": {"$in": ["a", "b"]}})) == ["Acker", "Brache"]
+
+        assert await repository.update("a", {"size": 260}, unset=["tags"])
+        assert await repository.get("a") == {"id": "a", "name": "Acker", "size": 260}
+        assert await repository.update("missing", {"size": 1}) is False
+        updated = await repository.update("b", {"name": "Brachland"}, return_document=True)
+        assert updated["name"] == "Brachland"
+
+        assert await repository.delete("b")
+        assert not await repository.delete("b")
+        assert await repository.count() == 2
+    asyncio.run(scenario())
+
+
+def test_update_where_counts_only_modified_documents():
+    async def scenario():
+        repository = MemoryRepository()
+        await repository.insert_many([
+            {"id": "1", "status": "pending"},
+            {"id": "2", "status": "pending"},
+            {"id": "3", "status": "confirmed"}
+        ])
+        assert await repository.update_where({"status": "pending"}, {"status": "confirmed"}) == 2
+        # Already at the value: matched but not modified
+        assert await repository.update_where({"id": {"$in": ["1", "3"]}}, {"status": "confirmed"}) == 0
+        assert await repository.update_where({"status": "growing"}, {"status": "completed"}) == 0
+        assert await repository.count({"status": "confirmed"}) == 3
+        assert await repository.delete_where({"id": {"$ne": "1"}}) == 2
+    asyncio.run(scenario())
+
+
+def test_insert_many_ignores_duplicates_on_request():
+    async def scenario():
+        repository = MemoryRepository()
+        await repository.insert({"id": "a", "message": "old"})
+        skipped = await repository.insert_many([{"id": "a", "message": "new"}, {"id": "b"}], ignore_duplicates=True)
+        assert skipped == {"a"}
+        assert (await repository.get("a"))["message"] == "old"
+        assert await repository.count() == 2
+        with pytest.raises(ValueError):
+            await repository.insert_many([{"id": "a"}])
+    asyncio.run(scenario())
+
+
+def test_unique_keys_like_a_partial_index():
+    async def scenario():
+        repository = MemoryRepository([("rule_id", "rule_window", "order_id")])
+        await repository.insert({"id": "a", "rule_id": "r", "rule_window": 1, "order_id": "o"})
+        with pytest.raises(ValueError):
+            await repository.insert({"id": "b", "rule_id": "r", "rule_window": 1, "order_id": "o"})
+        skipped = await repository.insert_many([
+            {"id": "b", "rule_id": "r", "rule_window": 1, "order_id": "o"},
+            {"id": "c", "rule_id": "r", "rule_window": 2, "order_id": "o"},
+            # Without a rule the key does not apply
+            {"id": "d", "order_id": "o"},
+            {"id": "e", "order_id": "o"}
+        ], ignore_duplicates=True)
+        assert skipped == {"b"}
+        with pytest.raises(ValueError):
+            await repository.update("c", {"rule_window": 1})
+        assert (await repository.get("c"))["rule_window"] == 2
+        # Deleting frees the key
+        assert await repository.delete("a")
+        await repository.insert({"id": "b", "rule_id": "r", "rule_window": 1, "order_id": "o"})
+    asyncio.run(scenario())
+
+
+def test_missing_and_null_values_compare_like_mongo():
+    async def scenario():
+        repository = MemoryRepository()
+        await repository.insert_many([
+            {"id": "a", "size": 3}, {"id": "b", "size": None}, {"id": "c"}, {"id": "d", "size": "gross"}, {"id": "e", "size": 1}
+        ])
+        # Range queries only match values of the operand's type
+        assert sorted(document["id"] for document in await repository.find({"size": {"$gte": 0}})) == ["a", "e"]
+        assert sorted(document["id"] for document in await repository.find({"size": {"$lt": "z"}})) == ["d"]
+        assert sorted(document["id"] for document in await repository.find({"size": {"$lte": None}})) == ["b", "c"]
+        assert await repository.count({"size": {"$gt": None}}) == 0
+
+        # Null and missing sort before numbers, numbers before strings
+        ascending = [document["id"] for document in await repository.find(sort=[("size", 1)])]
+        assert ascending[2:] == ["e", "a", "d"] and set(ascending[:2]) == {"b", "c"}
+        descending = [document["id"] for document in await repository.find(sort=[("size", -1)])]
+        assert descending[:3] == ["d", "a", "e"]
+    asyncio.run(scenario())
@@ -0,0 +1,32 @@
+import numpy as np
+from reference_data import CropType
+from risk import simulate_profit
+
+CROPS = [CropType.WINTERWEIZEN, CropType.SILOMAIS, CropType.ZUCKERRUEBEN, CropType.ERBSEN, CropType.WINTERWEIZEN]
+YIELDS = [130.0, 1270.0, 1600.0, 90.0, 0.0]
+COSTS = [25.0, 40.0, 50.0, 20.0, 10.0]
+
+
+def test_quantiles_are_ordered():
+    result = simulate_profit(CROPS, YIELDS, COSTS, samples=2000, seed=1)
+    assert np.all(result["p10"] <= result["p50"])
+    assert np.all(result["p50"] <= result["p90"])
+    assert np.all(result["p10"] <= result["mean"]) and np.all(result["mean"] <= result["p90"])
+    book = result["book"]
+    assert book["p10"] <= book["p50"] <= book["p90"]
+    assert abs(book["mean"] - result["mean"].sum()) < 1e-6 * max(1.0, abs(book["mean"]))
+
+
+def test_probability_of_loss():
+    result = simulate_profit(CROPS, YIELDS, COSTS, samples=2000, seed=1)
+    assert np.all((result["probability_of_loss"] >= 0) & (result["probability_of_loss"] <= 1))
+    # Nothing harvested: the cost is always lost
+    assert result["probability_of_loss"][-1] == 1.0
+    assert result["p10"][-1] == result["p90"][-1] == -COSTS[-1]
+
+
+def test_seed_reproduces_the_simulation():
+    first = simulate_profit(CROPS, YIELDS, COSTS, samples=500, seed=7)
+    second = simulate_profit(CROPS, YIELDS, COSTS, samples=500, seed=7)
+    assert np.array_equal(first["p50"], second["p50"])
+    assert first["book"] == second["book"]
@@ -0,0 +1,94 @@
+import pytest
+from reference_data import (
+    CropType, CEREAL_CROPS, MAX_CONSECUTIVE_CEREALS, MAX_STAND_YEARS, ROTATION_BREAK_YEARS
+)
+from rotation import plan_rotation
+from seeding import load_fixtures
+
+PLOT = {"soil_points": 40, "price_per_plot": 10.0}
+
+
+@pytest.fixture(scope="module")
+def machines():
+    """Fixture machines made suitable for every crop, so every crop with a seed cost can be planned"""
+    machines = load_fixtures()["machines"]
+    for machine in machines:
+        machine["suitable_for"] = [crop.value for crop in CropType]
+    return machines
+
+
+def crops_of(plan):
+    return [season["crop_type"] for season in plan["seasons"]]
+
+
+def assert_rules_hold(history):
+    """Check the rotation rules on a full crop history (oldest first)"""
+    for year, crop in enumerate(history):
+        previous = history[year - 1] if year else None
+        if crop == previous and crop in MAX_STAND_YEARS:
+            stand = 1
+            while year - stand >= 0 and history[year - stand] == crop:
+                stand += 1
+            assert stand <= MAX_STAND_YEARS[crop], history
+        elif crop in ROTATION_BREAK_YEARS:
+            earlier = [position for position in range(year) if history[position] == crop]
+            if earlier:
+                assert year - earlier[-1] > ROTATION_BREAK_YEARS[crop], history
+        run = 0
+        while year - run >= 0 and history[year - run] in CEREAL_CROPS:
+            run += 1
+        assert run <= MAX_CONSECUTIVE_CEREALS, history
+
+
+@pytest.mark.parametrize("previous_crops", [
+    (),
+    (CropType.WINTERWEIZEN,),
+    (CropType.WINTERWEIZEN, CropType.WINTERGERSTE),
+    (CropType.ZUCKERRUEBEN, CropType.WINTERWEIZEN),
+    (CropType.LUZERNE, CropType.LUZERNE),
+    (CropType.ERBSEN, CropType.SILOMAIS)
+])
+@pytest.mark.parametrize("allowed_crops", [
+    None,
+    {CropType.WINTERWEIZEN, CropType.WINTERGERSTE, CropType.ERBSEN, CropType.SILOMAIS},
+    {CropType.WINTERWEIZEN, CropType.LUZERNE, CropType.ZUCKERRUEBEN, CropType.GRAS}
+])
+def test_plans_respect_the_rotation_rules(machines, previous_crops, allowed_crops):
+    plan = plan_rotation(PLOT, machines, 6, previous_crops=previous_crops, allowed_crops=allowed_crops)
+    assert plan is not None
+    crops = crops_of(plan)
+    assert len(crops) == 6
+    assert allowed_crops is None or set(crops) <= allowed_crops
+    assert_rules_hold(list(previous_crops) + crops)
+
+
+def test_break_years(machines):
+    # Erbsen need five years of other crops before they return
+    assert plan_rotation(PLOT, machines, 1, previous_crops=(CropType.ERBSEN,), fixed_crops=(CropType.ERBSEN,)) is None
+    plan = plan_rotation(
+        PLOT, machines, 6, allowed_crops={CropType.ERBSEN, CropType.SILOMAIS}, fixed_crops=(CropType.ERBSEN,)
+    )
+    assert crops_of(plan) == [CropType.ERBSEN] + [CropType.SILOMAIS] * 5
+    plan = plan_rotation(
+        PLOT, machines, 7, allowed_crops={CropType.ERBSEN, CropType.SILOMAIS},
+        fixed_crops=(CropType.ERBSEN,) + (None,) * 5 + (CropType.ERBSEN,)
+    )
+    assert crops_of(plan) == [CropType.ERBSEN] + [CropType.SILOMAIS] * 5 + [CropType.ERBSEN]
+
+
+def test_stand_years(machines):
+    # A perennial stand lasts at most MAX_STAND_YEARS seasons in a row
+    assert crops_of(plan_rotation(PLOT, machines, 3, allowed_crops={CropType.GRAS})) == [CropType.GRAS] * 3
+    assert plan_rotation(PLOT, machines, 4, allowed_crops={CropType.GRAS}) is None
+    assert plan_rotation(PLOT, machines, 1, previous_crops=(CropType.GRAS,) * 3, allowed_crops={CropType.GRAS}) is None
+
+    # Only the first year of a stand is sown
+    plan = plan_rotation(PLOT, machines, 3, allowed_crops={CropType.GRAS})
+    assert [season["seed_cost"] > 0 for season in plan["seasons"]] == [True, False, False]
+
+
+def test_crops_without_machines_are_not_planned():
+    plan = plan_rotation(PLOT, load_fixtures()["machines"], 4, previous_crops=(CropType.WINTERWEIZEN,))
+    # Luzerne has no machines in the fixtures, winterraps no seed cost
+    assert not {CropType.LUZERNE, CropType.WINTERRAPS} & set(crops_of(plan))
+    assert plan_rotation(PLOT, load_fixtures()["machines"], 1, fixed_crops=(CropType.LUZERNE,)) is None
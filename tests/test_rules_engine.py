@@ -0,0 +1,107 @@
+import asyncio
+from datetime import datetime, timedelta
+import numpy as np
+from rules_engine import (
+    OrderColumns, advisory_window, compile_rules, earlier_advisories_query, evaluate_rules, suppress_duplicates
+)
+from tests.test_advisories import place_order
+
+
+def test_advisory_window():
+    now = datetime(2026, 5, 4, 12, 0)
+    assert advisory_window({}, now) == advisory_window({}, now + timedelta(days=400)) == 0
+
+    rule = {"cooldown_days": 7}
+    window = advisory_window(rule, now)
+    # Every day of a window maps to it, the next cooldown period to the next one
+    start = datetime(1970, 1, 1) + timedelta(days=window * 7)
+    assert advisory_window(rule, start) == advisory_window(rule, start + timedelta(days=6, hours=23)) == window
+    assert advisory_window(rule, start + timedelta(days=7)) == window + 1
+
+
+ORDERS = [
+    {"id": "o1", "crop_type": "winterweizen", "cultivation_method": "konventionell", "fertilizer_type": "kas", "location": "Grabow"},
+    {"id": "o2", "crop_type": "silomais", "cultivation_method": "biologisch", "fertilizer_type": "rindermist", "location": "Grabow"},
+    {"id": "o3", "crop_type": "winterweizen", "cultivation_method": "biologisch", "fertilizer_type": None, "location": "Ludwigslust"},
+    {"id": "o4", "crop_type": "unbekannt", "cultivation_method": "konventionell", "fertilizer_type": "kas", "location": None}
+]
+
+
+def evaluate(rule, month=5, weather=None):
+    columns = OrderColumns(ORDERS, ["winterweizen", "silomais"], ["konventionell", "biologisch"], ["kas", "rindermist"])
+    matches = evaluate_rules(compile_rules([{"id": "r", **rule}], columns), columns, month, weather)
+    return [columns.order_ids[index] for index in matches.get("r", [])]
+
+
+def test_rule_conditions():
+    assert evaluate({}) == ["o1", "o2", "o3", "o4"]
+    assert evaluate({"crop_types": ["winterweizen"]}) == ["o1", "o3"]
+    assert evaluate({"crop_types": ["winterweizen"], "cultivation_methods": ["biologisch"]}) == ["o3"]
+    # Unknown values only match rules without a condition on them
+    assert evaluate({"fertilizer_types": ["kas", "rindermist"]}) == ["o1", "o2", "o4"]
+    assert evaluate({"seasons": ["herbst"]}) == []
+    assert evaluate({"seasons": ["herbst", "fruejahr"]}, month=5) == ["o1", "o2", "o3", "o4"]
+
+
+def test_weather_conditions():
+    weather = {"Grabow": {"temperature": -2.0, "humidity": 80.0}, "Ludwigslust": {"temperature": 4.0}}
+    assert evaluate({"weather": {"max_temperature": 0.0}}, weather=weather) == ["o1", "o2"]
+    assert evaluate({"weather": {"max_temperature": 5.0}}, weather=weather) == ["o1", "o2", "o3"]
+    # Locations without the observed value never match
+    assert evaluate({"weather": {"min_humidity": 50.0}}, weather=weather) == ["o1", "o2"]
+    assert evaluate({"weather": {"max_temperature": 0.0}}) == []
+
+
+def test_suppress_duplicates_honours_the_cooldown():
+    now = datetime(2026, 5, 4)
+    columns = OrderColumns(ORDERS, ["winterweizen"], [], [])
+    rules = [{"id": "once"}, {"id": "weekly", "cooldown_days": 7}]
+    compiled = compile_rules(rules, columns)
+    matches = {"once": np.array([0, 1]), "weekly": np.array([0, 1])}
+    existing = [
+        {"rule_id": "once", "order_id": "o1", "created_at": now - timedelta(days=400)},
+        {"rule_id": "weekly", "order_id": "o1", "created_at": now - timedelta(days=3)},
+        {"rule_id": "weekly", "order_id": "o2", "created_at": now - timedelta(days=8)}
+    ]
+    fresh, suppressed = suppress_duplicates(matches, compiled, columns, existing, now)
+    assert fresh == {"once": ["o2"], "weekly": ["o2"]}
+    assert suppressed == 2
+
+
+def test_earlier_advisories_query_is_bounded_by_the_cooldown():
+    now = datetime(2026, 5, 4)
+    assert "created_at" not in earlier_advisories_query({"id": "once"}, now)
+
+    rule = {"id": "weekly", "cooldown_days": 7}
+    query = earlier_advisories_query(rule, now)
+    assert query["created_at"] == {"$gte": now - timedelta(days=7)}
+    assert query["rule_window"]["$gte"] == advisory_window(rule, now) - 1
+
+
+def test_run_advisory_rules(client, server):
+    plots = [plot["id"] for plot in client.get("/api/plots").json()[:2]]
+    order_ids = [place_order(client, plot_id) for plot_id in plots]
+    client.post("/api/orders/bulk-status", json={"status": "confirmed", "order_ids": order_ids[:1]})
+    rule = client.post("/api/advisory-rules", json={
+        "name": "Frost", "message": "Frostschutz prüfen", "advisory_type": "weather",
+        "crop_types": ["winterweizen"], "weather": {"max_temperature": 0.0}, "cooldown_days": 7
+    }).json()
+    frost = {"weather": {"39291 Grabow": {"temperature": -3.0}}}
+
+    assert client.post("/api/advisory-rules/evaluate", json={"weather": {}}).json()["advisories_created"] == 0
+    result = client.post("/api/advisory-rules/evaluate", json=frost).json()
+    # Only the confirmed order is active
+    assert result["orders_evaluated"] == 1
+    assert result["advisories_created"] == 1
+    advisories = client.get(f"/api/orders/{order_ids[0]}/advisories").json()
+    assert [advisory["rule_id"] for advisory in advisories] == [rule["id"]]
+
+    result = client.post("/api/advisory-rules/evaluate", json=frost).json()
+    assert (result["advisories_created"], result["duplicates_suppressed"]) == (0, 1)
+
+    # Once the cooldown is over the rule fires again
+    asyncio.run(server.repos.advisories.update_where(
+        {"rule_id": rule["id"]},
+        {"created_at": datetime.utcnow() - timedelta(days=8), "rule_window": advisory_window(rule, datetime.utcnow()) - 2}
+    ))
+    assert client.post("/api/advisory-rules/evaluate", json=frost).json()["advisories_created"] == 1
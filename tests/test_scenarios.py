@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+from pricing import quote
+from reference_data import CropType, CultivationMethod, FertilizerType, HarvestOption, WorkingStep, soil_quality_factor
+from scenarios import (
+    BASE_STEPS, CROPS, FERTILIZERS, HARVEST_OPTIONS, SweepTables, fertilizer_application, rank, soil_quality_factors,
+    sweep
+)
+from seeding import load_fixtures
+
+PLOT_PRICES = [7.5, 12.5]
+SOIL_POINTS = [28, 48]
+
+
+@pytest.fixture(scope="module")
+def machines():
+    return load_fixtures()["machines"]
+
+
+@pytest.fixture(scope="module")
+def result(machines):
+    return sweep(SweepTables(machines), PLOT_PRICES, SOIL_POINTS)
+
+
+def test_soil_quality_factors_match_the_reference():
+    soil_points = np.arange(15, 70)
+    assert soil_quality_factors(soil_points).tolist() == [soil_quality_factor(points) for points in soil_points]
+
+
+def cheapest(machines, crop, step, fertilizer_type=None):
+    candidates = [
+        machine for machine in machines
+        if machine["working_step"] == step and crop in machine["suitable_for"]
+        and (fertilizer_type is None or machine.get("fertilizer_type") == fertilizer_type)
+    ]
+    return min(candidates, key=lambda machine: machine["price_per_use"])
+
+
+@pytest.mark.parametrize("crop", [CropType.WINTERWEIZEN, CropType.SILOMAIS])
+@pytest.mark.parametrize("fertilizer", [FertilizerType.KAS, FertilizerType.RINDERGUELLE])
+@pytest.mark.parametrize("harvest", HARVEST_OPTIONS)
+def test_sweep_agrees_with_the_pricing_engine(machines, result, crop, fertilizer, harvest):
+    """The sweep prices the standard machine set exactly like an order with those machines"""
+    selected = [cheapest(machines, crop, step) for step in BASE_STEPS]
+    selected.append(cheapest(machines, crop, WorkingStep.DUENGUNG, fertilizer_application(fertilizer)))
+    crop_index, fertilizer_index, harvest_index = CROPS.index(crop), FERTILIZERS.index(fertilizer), HARVEST_OPTIONS.index(harvest)
+
+    for plot in range(len(PLOT_PRICES)):
+        fertilizer_cost = float(result["fertilizer_cost"][plot, crop_index, fertilizer_index])
+        breakdown = quote(
+            PLOT_PRICES[plot], SOIL_POINTS[plot], crop, fertilizer_cost,
+            tuple(sorted((machine["id"], machine["price_per_use"]) for machine in selected)), harvest
+        )
+        cell = (plot, crop_index, fertilizer_index, harvest_index)
+        assert result["feasible"][cell]
+        assert result["total_cost"][cell] == pytest.approx(breakdown.total_cost)
+        assert result["profit_loss"][cell] == pytest.approx(breakdown.profit_loss)
+        assert result["payment_amount"][cell] == pytest.approx(breakdown.payment_amount)
+
+
+def test_crops_that_cannot_be_ordered_are_infeasible(machines, result):
+    tables = SweepTables(machines)
+    # Winterraps has no seed cost and no sowing machine, luzerne no machines at all in the fixtures
+    for crop in (CropType.WINTERRAPS, CropType.LUZERNE):
+        assert not tables.crop_feasible[CROPS.index(crop)]
+        assert not result["feasible"][:, CROPS.index(crop)].any()
+    for plot in range(len(PLOT_PRICES)):
+        assert not {CropType.WINTERRAPS, CropType.LUZERNE} & {scenario["crop_type"] for scenario in rank(result, plot)}
+
+
+def test_organic_sweep_allows_no_mineral_fertilizer(machines):
+    organic = sweep(SweepTables(machines), PLOT_PRICES, SOIL_POINTS, CultivationMethod.BIOLOGISCH)
+    assert not organic["feasible"][:, :, FERTILIZERS.index(FertilizerType.KAS)].any()
+    assert organic["feasible"][:, CROPS.index(CropType.WINTERWEIZEN), FERTILIZERS.index(FertilizerType.RINDERGUELLE)].all()
+
+
+def test_rank_orders_by_profit(result):
+    ranked = rank(result, 0)
+    profits = [scenario["profit_loss"] for scenario in ranked]
+    assert profits == sorted(profits, reverse=True)
+    assert len(ranked) == result["feasible"][0].sum()
+    assert rank(result, 0, limit=3) == ranked[:3]
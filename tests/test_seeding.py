@@ -0,0 +1,55 @@
+import json
+import pytest
+from pymongo import DeleteMany, UpdateOne
+from seeding import load_fixtures, upsert_operations
+from tests.test_advisories import place_order
+
+
+def test_upsert_operations():
+    documents = [{"id": "a", "name": "A", "created_at": 1}, {"id": "b", "name": "B"}]
+    assert upsert_operations(documents, insert_only=("created_at",)) == [
+        DeleteMany({"id": {"$nin": ["a", "b"]}}),
+        UpdateOne({"id": "a"}, {"$set": {"id": "a", "name": "A"}, "$setOnInsert": {"created_at": 1}}, upsert=True),
+        UpdateOne({"id": "b"}, {"$set": {"id": "b", "name": "B"}}, upsert=True)
+    ]
+    assert upsert_operations(documents, prune=False)[0] == UpdateOne(
+        {"id": "a"}, {"$set": documents[0]}, upsert=True
+    )
+
+
+def test_fixtures_with_duplicate_ids_are_rejected(tmp_path):
+    fixtures = load_fixtures()
+    fixtures["machines"].append(dict(fixtures["machines"][0]))
+    path = tmp_path / "fixtures.json"
+    path.write_text(json.dumps(fixtures), encoding="utf-8")
+    with pytest.raises(ValueError, match="duplicate ids in machines"):
+        load_fixtures(path)
+
+
+def test_seeding_is_idempotent(client):
+    fixtures = load_fixtures()
+    report = client.post("/api/initialize-data").json()
+    assert report["plots"]["documents"] == len(fixtures["plots"])
+    assert (report["plots"]["inserted"], report["plots"]["modified"], report["plots"]["deleted"]) == (0, 0, 0)
+    assert (report["machines"]["inserted"], report["machines"]["modified"]) == (0, 0)
+
+
+def test_merge_keeps_availability_and_reset_prunes(client):
+    plot_id = client.get("/api/plots").json()[0]["id"]
+    place_order(client, plot_id)
+    extra = client.post("/api/plots", json={
+        "name": "Extra", "soil_type": "sandy_loam", "soil_points": 40, "location": "39291 Grabow",
+        "description": "Nicht in den Fixtures", "price_per_plot": 9.0
+    })
+    assert extra.status_code == 200
+
+    merged = client.post("/api/initialize-data", params={"reset": False}).json()
+    assert merged["plots"]["deleted"] == 0
+    available = {plot["id"] for plot in client.get("/api/plots").json()}
+    assert plot_id not in available
+    assert len(client.get("/api/orders").json()) == 1
+
+    reset = client.post("/api/initialize-data").json()
+    assert reset["plots"]["deleted"] == 1
+    assert {plot["id"] for plot in client.get("/api/plots").json()} == {plot["id"] for plot in load_fixtures()["plots"]}
+    assert client.get("/api/orders").json() == []
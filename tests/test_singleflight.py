@@ -0,0 +1,75 @@
+import asyncio
+import pytest
+from singleflight import SingleFlight
+
+
+class Loader:
+    """Counts loads; each one waits until released"""
+    def __init__(self):
+        self.loads = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.loads += 1
+        number = self.loads
+        await self.release.wait()
+        return number
+
+
+def test_concurrent_calls_share_one_load():
+    async def scenario():
+        flight, load = SingleFlight(), Loader()
+        callers = [asyncio.create_task(flight.do("plots", load)) for _ in range(5)]
+        await asyncio.sleep(0)
+        load.release.set()
+        assert await asyncio.gather(*callers) == [1] * 5
+        # Once finished, the next call loads again
+        assert await flight.do("plots", load) == 2
+        assert flight.in_flight == {}
+        assert flight.metrics() == {"plots": {"calls": 6, "loads": 2, "coalesced": 4, "coalescing_ratio": 0.6667}}
+    asyncio.run(scenario())
+
+
+def test_forget_detaches_the_load_in_flight():
+    async def scenario():
+        flight, load = SingleFlight(), Loader()
+        before = asyncio.create_task(flight.do("plots", load))
+        await asyncio.sleep(0)
+        flight.forget("plots")
+        after = asyncio.create_task(flight.do("plots", load))
+        await asyncio.sleep(0)
+        load.release.set()
+        assert (await before, await after) == (1, 2)
+    asyncio.run(scenario())
+
+
+def test_a_cancelled_caller_does_not_cancel_the_load():
+    async def scenario():
+        flight, load = SingleFlight(), Loader()
+        leaving = asyncio.create_task(flight.do("plots", load))
+        staying = asyncio.create_task(flight.do("plots", load))
+        await asyncio.sleep(0)
+        leaving.cancel()
+        await asyncio.sleep(0)
+        load.release.set()
+        assert await staying == 1
+        assert leaving.cancelled()
+    asyncio.run(scenario())
+
+
+def test_errors_reach_every_caller_and_are_not_cached():
+    async def scenario():
+        flight = SingleFlight()
+        attempts = []
+
+        async def failing():
+            attempts.append(1)
+            await asyncio.sleep(0)
+            raise RuntimeError("Datenbank nicht erreichbar")
+
+        results = await asyncio.gather(*(flight.do("plots", failing) for _ in range(3)), return_exceptions=True)
+        assert [type(result) for result in results] == [RuntimeError] * 3
+        with pytest.raises(RuntimeError):
+            await flight.do("plots", failing)
+        assert len(attempts) == 2
+    asyncio.run(scenario())
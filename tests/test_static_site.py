@@ -0,0 +1,87 @@
+import gzip
+import os
+import pytest
+from fastapi.testclient import TestClient
+from compression import ENCODINGS
+from static_site import IMMUTABLE, REVALIDATE, StaticSite, write_precompressed
+
+INDEX = "<!doctype html><title>Acker</title>" + "<div></div>" * 50
+SCRIPT = "console.log('acker');" * 50
+
+
+@pytest.fixture
+def build(tmp_path):
+    (tmp_path / "static" / "js").mkdir(parents=True)
+    (tmp_path / "index.html").write_text(INDEX, encoding="utf-8")
+    (tmp_path / "static" / "js" / "main.32e3d3de.js").write_text(SCRIPT, encoding="utf-8")
+    (tmp_path / "favicon.ico").write_bytes(b"\x00" * 300)
+    (tmp_path / "robots.txt").write_text("User-agent: *\n", encoding="utf-8")
+    return tmp_path
+
+
+def get(site, path, **headers):
+    return TestClient(site).get(path, headers={"Accept-Encoding": "identity", **headers})
+
+
+def test_files_routes_and_cache_headers(build):
+    site = StaticSite(build)
+    index = get(site, "/")
+    assert index.text == INDEX
+    assert index.headers["content-type"] == "text/html; charset=utf-8"
+    assert index.headers["cache-control"] == REVALIDATE
+
+    script = get(site, "/static/js/main.32e3d3de.js")
+    assert script.text == SCRIPT
+    assert script.headers["cache-control"] == IMMUTABLE
+
+    # Client-side routes get the app; missing assets and API paths do not
+    assert get(site, "/bestellungen/123").text == INDEX
+    assert get(site, "/static/js/missing.js").status_code == 404
+    assert get(site, "/api/unknown").status_code == 404
+    assert TestClient(site).post("/").status_code == 405
+
+
+def test_compressed_variants_and_revalidation(build):
+    site = StaticSite(build)
+    compressed = get(site, "/", **{"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["vary"] == "Accept-Encoding"
+    assert compressed.text == INDEX
+
+    # Too small to compress: one variant, so no Vary
+    robots = get(site, "/robots.txt", **{"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in robots.headers and "vary" not in robots.headers
+    # Not a compressible type
+    assert "content-encoding" not in get(site, "/favicon.ico", **{"Accept-Encoding": "gzip"}).headers
+
+    cached = get(site, "/", **{"If-None-Match": compressed.headers["etag"]})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    head = TestClient(site).head("/", headers={"Accept-Encoding": "identity"})
+    assert head.content == b""
+    assert head.headers["content-length"] == str(len(INDEX.encode("utf-8")))
+
+
+def test_precompressed_siblings(build):
+    # index.html and the script; the other files are too small or not compressible
+    assert write_precompressed(build) == 2 * len(ENCODINGS)
+    index_gz = build / "index.html.gz"
+    assert gzip.decompress(index_gz.read_bytes()).decode("utf-8") == INDEX
+
+    # A fresh sibling is served as is and not as a file of its own
+    index_gz.write_bytes(gzip.compress(b"vorkomprimiert"))
+    site = StaticSite(build)
+    assert "/index.html.gz" not in site.files
+    assert get(site, "/", **{"Accept-Encoding": "gzip"}).text == "vorkomprimiert"
+
+    # A sibling older than its file is ignored
+    stat = (build / "index.html").stat()
+    os.utime(index_gz, (stat.st_atime, stat.st_mtime - 10))
+    assert get(StaticSite(build), "/", **{"Accept-Encoding": "gzip"}).text == INDEX
+
+
+def test_a_build_without_index_is_rejected(tmp_path):
+    (tmp_path / "app.js").write_text(SCRIPT, encoding="utf-8")
+    with pytest.raises(FileNotFoundError):
+        StaticSite(tmp_path)